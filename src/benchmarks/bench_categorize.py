@@ -0,0 +1,110 @@
+"""
+Benchmark: category prediction for /add from the in-memory index vs SQL.
+
+Fills a scratch database (schema from db/db.py) with one user's expenses over
+a few hundred payees and times predicting the category of a known payee, of a
+new variant of a known payee (matched by its words) and of an unknown name two
+ways: predict_category (dict lookups in the user's CategoryIndex) and one
+grouped query per prediction for the payee's most used category. Building the
+index from the database is timed too, and after more inserts the
+incrementally updated index is checked against a fresh build.
+
+Run from src/:
+    python -m benchmarks.bench_categorize [expenses]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+# The db module binds its connection pool to DB_PATH on import
+os.environ["DB_PATH"] = os.path.join(tempfile.mkdtemp(), "bench_categorize.db")
+
+from db.db import db, init_db  # noqa: E402
+from db.payees import payee_key  # noqa: E402
+from db.services import insert_expenses_bulk, month_key  # noqa: E402
+from utils import categorize  # noqa: E402
+
+USER_ID = 1
+CATEGORIES = [f"Category {i}" for i in range(30)]
+MERCHANTS = [f"Merchant{i}" for i in range(300)]  # payees stay under the index cap
+CITIES = ["Zurich", "Basel", "Bern", "Geneva", "Online"]
+RUNS = 20_000
+
+
+def _populate(n: int, seed: int = 42) -> None:
+    rnd = random.Random(seed)
+    home = {m: rnd.choice(CATEGORIES) for m in MERCHANTS}
+    rows = []
+    for _ in range(n):
+        merchant = rnd.choice(MERCHANTS)
+        # Mostly the merchant's usual category, sometimes another one
+        category = home[merchant] if rnd.random() < 0.9 else rnd.choice(CATEGORIES)
+        name = merchant if rnd.random() < 0.5 else f"{merchant} {rnd.choice(CITIES)}"
+        rows.append((category, name, 10.0, "CHF", 10.0, 1.0, "2025-01-01"))
+    for i in range(0, len(rows), 5000):
+        insert_expenses_bulk(USER_ID, month_key(), rows[i : i + 5000])
+
+
+def _predict_sql(name: str) -> str | None:
+    """The payee's most used category, one query per prediction."""
+    row = (
+        db()
+        .execute(
+            """
+            SELECT c.name FROM expenses e
+            JOIN categories c ON c.id = e.category_id
+            WHERE e.user_id=?
+              AND e.payee_id=(SELECT id FROM payees WHERE user_id=? AND key=?)
+            GROUP BY e.category_id ORDER BY COUNT(*) DESC LIMIT 1
+            """,
+            (USER_ID, USER_ID, payee_key(name)),
+        )
+        .fetchone()
+    )
+    return row[0] if row else None
+
+
+def _timed(fn, runs: int = RUNS) -> float:
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - start) / runs
+
+
+def main(n: int) -> None:
+    init_db()
+    _populate(n)
+
+    categorize.forget_category_index(USER_ID)
+    build = _timed(lambda: categorize._load_index(USER_ID), runs=5)
+    categorize.predict_category(USER_ID, "warm-up")  # loads the index
+
+    names = {
+        "known payee": "Merchant7 Zurich",
+        "new variant": "MERCHANT7 airport",
+        "unknown name": "Dentist",
+    }
+    print(f"{n} expenses, {len(MERCHANTS) * (len(CITIES) + 1)} possible payees")
+    print(f"index build: {build * 1000:.2f} ms")
+    print(f"{'':16}{'index (us)':>12}{'SQL (us)':>12}  prediction")
+    for label, name in names.items():
+        t_index = _timed(lambda: categorize.predict_category(USER_ID, name))
+        t_sql = _timed(lambda: _predict_sql(name), runs=RUNS // 20)
+        print(
+            f"{label:16}{t_index * 1e6:>12.2f}{t_sql * 1e6:>12.2f}"
+            f"  {categorize.predict_category(USER_ID, name)}"
+        )
+
+    # Inserts are counted into the loaded index: below the payee cap it must
+    # match a rebuild
+    _populate(n // 10, seed=7)
+    loaded = categorize._INDEXES.get(USER_ID)
+    fresh = categorize._load_index(USER_ID)
+    assert loaded.payees == fresh.payees and loaded.tokens == fresh.tokens
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
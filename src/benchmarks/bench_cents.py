@@ -0,0 +1,248 @@
+"""
+Benchmark: legacy REAL amount columns vs integer-cents storage.
+
+Builds the same synthetic expenses twice, once in the legacy layout
+(amount/chf_amount/original_amount REAL, nullable, COALESCE in every query,
+category names as TEXT) and once in the current layout of db/db.py (integer
+cents, integer category ids) with its covering indexes.
+Reports file size, the hot aggregation queries (spent by category for a
+month, /expenses summary, spent over a date range) and the rounding error of
+the REAL sums.
+
+Run from src/:
+    python -m benchmarks.bench_cents [rows]
+"""
+
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+from db.db import _EXPENSES_DDL
+
+USERS = 200
+MONTHS = [f"{y}-{m:02d}" for y in (2024, 2025) for m in range(1, 13)]
+CATEGORIES = [f"Category {i}" for i in range(40)]
+QUERIES = 200  # random (user, month) probes per query kind
+
+LEGACY_DDL = """
+    CREATE TABLE expenses (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        month TEXT NOT NULL,
+        category TEXT NOT NULL,
+        name TEXT NOT NULL,
+        amount REAL NOT NULL,
+        created_at TEXT NOT NULL,
+        currency TEXT,
+        original_amount REAL,
+        chf_amount REAL,
+        fx_rate REAL,
+        fx_date TEXT,
+        ts INTEGER
+    )
+"""
+LEGACY_INDEXES = [
+    "CREATE INDEX idx_expenses_user_month ON expenses(user_id, month)",
+    "CREATE INDEX idx_expenses_user_month_cat ON expenses(user_id, month, category)",
+    "CREATE INDEX idx_expenses_user_ts ON expenses(user_id, ts)",
+]
+CENTS_INDEXES = [
+    "CREATE INDEX idx_expenses_user_month ON expenses(user_id, month)",
+    "CREATE INDEX idx_expenses_user_month_cat_cents ON expenses(user_id, month, category_id, base_cents)",
+    "CREATE INDEX idx_expenses_user_ts_cat_cents ON expenses(user_id, ts, category_id, base_cents)",
+]
+
+LEGACY_SQL = {
+    "spent by category": """
+        SELECT category, SUM(COALESCE(chf_amount, amount)) FROM expenses
+        WHERE user_id=? AND month=? GROUP BY category
+    """,
+    "summary (count, total)": """
+        SELECT COUNT(*), SUM(COALESCE(chf_amount, amount)) FROM expenses
+        WHERE user_id=? AND month=? AND category=?
+    """,
+    "spent over ts range": """
+        SELECT category, SUM(COALESCE(chf_amount, amount)) FROM expenses
+        WHERE user_id=? AND ts>=? AND ts<? GROUP BY category
+    """,
+}
+CENTS_SQL = {
+    "spent by category": """
+        SELECT category_id, SUM(base_cents) FROM expenses
+        WHERE user_id=? AND month=? GROUP BY category_id
+    """,
+    "summary (count, total)": """
+        SELECT COUNT(*), SUM(base_cents) FROM expenses
+        WHERE user_id=? AND month=? AND category_id=?
+    """,
+    "spent over ts range": """
+        SELECT category_id, SUM(base_cents) FROM expenses
+        WHERE user_id=? AND ts>=? AND ts<? GROUP BY category_id
+    """,
+}
+
+
+def _synthetic_rows(n: int):
+    """(user_id, month, category, name, created_at, ts, currency, cents, base_cents)"""
+    rnd = random.Random(42)
+    base_ts = 1704067200  # 2024-01-01
+    for i in range(n):
+        month = rnd.choice(MONTHS)
+        day = rnd.randint(1, 28)
+        ts = base_ts + (MONTHS.index(month) * 30 + day) * 86400
+        cents = rnd.randint(5, 50000)
+        foreign = rnd.random() < 0.2
+        base_cents = round(cents * 0.94) if foreign else cents
+        yield (
+            rnd.randint(1, USERS),
+            month,
+            rnd.choice(CATEGORIES),
+            f"Expense {i}",
+            f"{month}-{day:02d}T12:00:00",
+            ts,
+            "EUR" if foreign else "CHF",
+            cents,
+            base_cents,
+        )
+
+
+def _category_id(category: str) -> int:
+    """Id of `category` in the categories dictionary (not materialized here)."""
+    return CATEGORIES.index(category) + 1
+
+
+def _build(path: str, n: int, legacy: bool) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    if legacy:
+        conn.execute(LEGACY_DDL)
+        conn.executemany(
+            """
+            INSERT INTO expenses(user_id, month, category, name, amount, created_at,
+                                 ts, currency, original_amount, chf_amount, fx_rate, fx_date)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1.0, substr(?, 1, 10))
+            """,
+            (
+                (u, m, c, name, b / 100, created, ts, cur, o / 100, b / 100, created)
+                for u, m, c, name, created, ts, cur, o, b in _synthetic_rows(n)
+            ),
+        )
+        indexes = LEGACY_INDEXES
+    else:
+        conn.execute(_EXPENSES_DDL.format(table="expenses"))
+        conn.executemany(
+            """
+            INSERT INTO expenses(user_id, month, category_id, name, created_at, ts,
+                                 currency, original_cents, base_cents, fx_rate, fx_date)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 1.0, substr(?, 1, 10))
+            """,
+            (
+                (u, m, _category_id(c), name, created, ts, cur, o, b, created)
+                for u, m, c, name, created, ts, cur, o, b in _synthetic_rows(n)
+            ),
+        )
+        indexes = CENTS_INDEXES
+    for ddl in indexes:
+        conn.execute(ddl)
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.execute("ANALYZE")
+    return conn
+
+
+def _probes():
+    rnd = random.Random(7)
+    base_ts = 1704067200
+    out = []
+    for _ in range(QUERIES):
+        start = base_ts + rnd.randint(0, 600) * 86400
+        out.append(
+            (
+                rnd.randint(1, USERS),
+                rnd.choice(MONTHS),
+                rnd.choice(CATEGORIES),
+                start,
+                start + 90 * 86400,
+            )
+        )
+    return out
+
+
+def _run(conn: sqlite3.Connection, queries: dict, category_ids: bool) -> dict:
+    probes = _probes()
+    key = _category_id if category_ids else str
+    params = {
+        "spent by category": [(u, m) for u, m, _, _, _ in probes],
+        "summary (count, total)": [(u, m, key(c)) for u, m, c, _, _ in probes],
+        "spent over ts range": [(u, a, b) for u, _, _, a, b in probes],
+    }
+    timings = {}
+    for name, sql in queries.items():
+        start = time.perf_counter()
+        for p in params[name]:
+            conn.execute(sql, p).fetchall()
+        timings[name] = time.perf_counter() - start
+    return timings
+
+
+def _plan(conn: sqlite3.Connection, sql: str, params) -> str:
+    return "; ".join(r[3] for r in conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+
+
+def main(n: int) -> None:
+    tmp = tempfile.mkdtemp()
+    legacy_path = os.path.join(tmp, "legacy.db")
+    cents_path = os.path.join(tmp, "cents.db")
+
+    legacy = _build(legacy_path, n, legacy=True)
+    cents = _build(cents_path, n, legacy=False)
+
+    t_legacy = _run(legacy, LEGACY_SQL, category_ids=False)
+    t_cents = _run(cents, CENTS_SQL, category_ids=True)
+
+    # Exactness: REAL sums drift away from the exact cent totals
+    legacy_total = legacy.execute(
+        "SELECT SUM(COALESCE(chf_amount, amount)) FROM expenses"
+    ).fetchone()[0]
+    exact_total = cents.execute("SELECT SUM(base_cents) FROM expenses").fetchone()[0]
+    legacy_months = legacy.execute(
+        "SELECT user_id, month, SUM(COALESCE(chf_amount, amount)) FROM expenses "
+        "GROUP BY user_id, month ORDER BY user_id, month"
+    ).fetchall()
+    exact_months = cents.execute(
+        "SELECT user_id, month, SUM(base_cents) FROM expenses "
+        "GROUP BY user_id, month ORDER BY user_id, month"
+    ).fetchall()
+    # A REAL total is "exact" only if it is the double nearest to the cent value
+    inexact = sum(1 for a, b in zip(legacy_months, exact_months) if a[2] != b[2] / 100)
+
+    print(f"{n} rows, {USERS} users, {len(MONTHS)} months")
+    print(f"{'':34}{'REAL':>14}{'int cents':>14}")
+    print(
+        f"{'file size (MiB)':34}"
+        f"{os.path.getsize(legacy_path) / 2**20:>14.1f}"
+        f"{os.path.getsize(cents_path) / 2**20:>14.1f}"
+    )
+    for name in LEGACY_SQL:
+        print(
+            f"{name + f' x{QUERIES} (s)':34}{t_legacy[name]:>14.4f}{t_cents[name]:>14.4f}"
+        )
+    print()
+    print(f"grand total REAL      : {legacy_total!r}")
+    print(f"grand total int cents : {exact_total / 100:.2f}")
+    print(f"(user, month) totals not exact in REAL: {inexact}/{len(exact_months)}")
+    print()
+    probe = (1, MONTHS[0])
+    print("plan REAL :", _plan(legacy, LEGACY_SQL["spent by category"], probe))
+    print("plan cents:", _plan(cents, CENTS_SQL["spent by category"], probe))
+
+    legacy.close()
+    cents.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000)
@@ -0,0 +1,205 @@
+"""
+Benchmark: sqlite3.Row vs slotted records (db/records.py) on hot paths.
+
+Measures fetch time, retained memory, formatting time (the /expenses and
+/rules page loops) and aggregation time (spent by category, planned from
+rules) over a synthetic table.
+
+Run from src/:
+    python -m benchmarks.bench_records [rows]
+"""
+
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from db.records import Expense, RuleSnapshot, fetch_records
+
+EXPENSES_SQL = """
+    SELECT id, month, category, name, created_at, currency,
+           original_cents, base_cents
+    FROM expenses
+    ORDER BY id DESC
+"""
+RULES_SQL = "SELECT category, name, period, amount FROM rules"
+
+CATEGORIES = [f"Category {i}" for i in range(40)]
+PERIODS = ["daily", "weekly", "monthly", "yearly"]
+
+
+def _populate(conn: sqlite3.Connection, n: int) -> None:
+    conn.execute(
+        """
+        CREATE TABLE expenses (
+            id INTEGER PRIMARY KEY, month TEXT, category TEXT, name TEXT,
+            created_at TEXT, currency TEXT, original_cents INTEGER, base_cents INTEGER
+        )
+        """
+    )
+    conn.execute(
+        "CREATE TABLE rules (category TEXT, name TEXT, period TEXT, amount REAL)"
+    )
+    rnd = random.Random(42)
+    conn.executemany(
+        "INSERT INTO expenses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            (
+                i,
+                "2025-12",
+                rnd.choice(CATEGORIES),
+                f"Expense {i}",
+                "2025-12-01T12:00:00",
+                rnd.choice(["CHF", "EUR"]),
+                rnd.randint(100, 20000),
+                rnd.randint(100, 20000),
+            )
+            for i in range(1, n + 1)
+        ),
+    )
+    conn.executemany(
+        "INSERT INTO rules VALUES (?, ?, ?, ?)",
+        (
+            (
+                rnd.choice(CATEGORIES),
+                f"Rule {i}",
+                rnd.choice(PERIODS),
+                round(rnd.uniform(1, 200), 2),
+            )
+            for i in range(n)
+        ),
+    )
+    conn.commit()
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def _retained(fn):
+    tracemalloc.start()
+    result = fn()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+
+def _format_rows_by_key(rows) -> list[str]:
+    out = []
+    for r in rows:
+        cur = r["currency"]
+        created = (r["created_at"] or "")[:19].replace("T", " ")
+        if cur == "CHF":
+            out.append(
+                f"[{r['id']:4d}] [{r['category']}] {r['name']:<30} {r['base_cents'] / 100:>8.2f} CHF ({created})"
+            )
+        else:
+            out.append(
+                f"[{r['id']:4d}] [{r['category']}] {r['name']:<30} {r['original_cents'] / 100:>8.2f} {cur} → {r['base_cents'] / 100:>8.2f} CHF ({created})"
+            )
+    return out
+
+
+def _format_records(rows) -> list[str]:
+    out = []
+    for r in rows:
+        cur = r.currency
+        created = (r.created_at or "")[:19].replace("T", " ")
+        if cur == "CHF":
+            out.append(
+                f"[{r.id:4d}] [{r.category}] {r.name:<30} {r.chf_amount:>8.2f} CHF ({created})"
+            )
+        else:
+            out.append(
+                f"[{r.id:4d}] [{r.category}] {r.name:<30} {r.original_amount:>8.2f} {cur} → {r.chf_amount:>8.2f} CHF ({created})"
+            )
+    return out
+
+
+def _spent_by_key(rows) -> dict:
+    out = {}
+    for r in rows:
+        out[r["category"]] = out.get(r["category"], 0.0) + r["base_cents"] / 100
+    return out
+
+
+def _spent_records(rows) -> dict:
+    out = {}
+    for r in rows:
+        out[r.category] = out.get(r.category, 0.0) + r.chf_amount
+    return out
+
+
+def _planned(rows, get) -> dict:
+    # Same arithmetic as compute_planned_monthly_from_rules for a 31-day month
+    out = {}
+    for r in rows:
+        cat, period, amt = get(r)
+        if period == "daily":
+            monthly = amt * 31
+        elif period == "weekly":
+            monthly = amt * 4.33
+        elif period == "monthly":
+            monthly = amt
+        else:
+            monthly = amt / 12.0
+        out[cat] = out.get(cat, 0.0) + monthly
+    return out
+
+
+def main(n: int) -> None:
+    path = os.path.join(tempfile.mkdtemp(), "bench_records.db")
+    conn = sqlite3.connect(path)
+    _populate(conn, n)
+
+    def fetch_rows():
+        cur = conn.cursor()
+        cur.row_factory = sqlite3.Row
+        return cur.execute(EXPENSES_SQL).fetchall()
+
+    rows, t_rows = _timed(fetch_rows)
+    records, t_records = _timed(lambda: fetch_records(conn, Expense, EXPENSES_SQL))
+    _, m_rows = _retained(fetch_rows)
+    _, m_records = _retained(lambda: fetch_records(conn, Expense, EXPENSES_SQL))
+
+    _, f_rows = _timed(lambda: _format_rows_by_key(rows))
+    _, f_records = _timed(lambda: _format_records(records))
+    _, a_rows = _timed(lambda: _spent_by_key(rows))
+    _, a_records = _timed(lambda: _spent_records(records))
+
+    def fetch_rule_rows():
+        cur = conn.cursor()
+        cur.row_factory = sqlite3.Row
+        return cur.execute(RULES_SQL).fetchall()
+
+    rule_rows = fetch_rule_rows()
+    rule_records = fetch_records(conn, RuleSnapshot, RULES_SQL)
+    _, p_rows = _timed(
+        lambda: _planned(
+            rule_rows, lambda r: (r["category"], r["period"], float(r["amount"]))
+        )
+    )
+    _, p_records = _timed(
+        lambda: _planned(rule_records, lambda r: (r.category, r.period, r.amount))
+    )
+
+    print(f"{n} rows")
+    print(f"{'':28}{'sqlite3.Row':>14}{'records':>14}")
+    print(f"{'fetch (s)':28}{t_rows:>14.4f}{t_records:>14.4f}")
+    print(
+        f"{'retained memory (MiB)':28}{m_rows / 2**20:>14.2f}{m_records / 2**20:>14.2f}"
+    )
+    print(f"{'format expenses (s)':28}{f_rows:>14.4f}{f_records:>14.4f}")
+    print(f"{'spent by category (s)':28}{a_rows:>14.4f}{a_records:>14.4f}")
+    print(f"{'planned from rules (s)':28}{p_rows:>14.4f}{p_records:>14.4f}")
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,140 @@
+"""
+Benchmark: the single-pass budget report engine vs the repeated category walks.
+
+Builds planned and spent maps for users with hundreds of categories and times
+what /status (top categories or full) plus the /add alerts need from them two
+ways: summarize_budget (per-category arrays built once, one sort, lines only
+for the categories shown) and the previous approach, which walked every
+category once to compute the metrics, again to sort them (which recomputed the
+metrics), again to split and render the lines, and twice more in the alerts
+for the overspend before and after the add. The rendered lines and the
+remaining balances are checked to match.
+
+Run from src/:
+    python -m benchmarks.bench_report [categories ...]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+# The db module binds its connection pool to DB_PATH on import
+os.environ["DB_PATH"] = os.path.join(tempfile.mkdtemp(), "bench_report.db")
+
+from config import BASE_CURRENCY  # noqa: E402
+from handlers.commands.report import MESSAGES, TOP_N, BudgetReport  # noqa: E402
+from utils.budget import summarize_budget  # noqa: E402
+
+RUNS = 200
+
+
+def _maps(n: int, seed: int = 42):
+    """About two thirds of the categories planned, most of them with spend."""
+    rnd = random.Random(seed)
+    planned, spent = {}, {}
+    for i in range(n):
+        c = f"Category {i:04d}"
+        if rnd.random() < 0.66:
+            planned[c] = rnd.randint(50, 2000) * 1.0
+        if rnd.random() < 0.8:
+            spent[c] = rnd.randint(100, 250000) / 100
+    return planned, spent
+
+
+def _walks(planned_by_cat, spent_by_cat, budget, added_category, added, limit):
+    """The previous report and alerts code, one walk per step."""
+    all_cats = set(planned_by_cat) | set(spent_by_cat)
+
+    def metrics():
+        planned_total = sum(planned_by_cat.values())
+        overspend_by_cat, overspend_total = {}, 0.0
+        for c in all_cats:
+            over = max(0.0, spent_by_cat.get(c, 0.0) - planned_by_cat.get(c, 0.0))
+            overspend_by_cat[c] = over
+            overspend_total += over
+        unplanned = sum(
+            s for c, s in spent_by_cat.items() if planned_by_cat.get(c, 0.0) == 0.0
+        )
+        return planned_total, overspend_total, unplanned, overspend_by_cat
+
+    def overspend_total(spent):
+        total = 0.0
+        for c in set(planned_by_cat) | set(spent):
+            total += max(0.0, spent.get(c, 0.0) - planned_by_cat.get(c, 0.0))
+        return total
+
+    _, _, _, overspend_by_cat = metrics()
+    # sort_categories recomputed the metrics
+    _, _, _, sort_over = metrics()
+    cats = sorted(
+        all_cats,
+        key=lambda c: (-sort_over.get(c, 0.0), -spent_by_cat.get(c, 0.0), c.lower()),
+    )[:limit]
+    planned_cats = [c for c in cats if planned_by_cat.get(c, 0.0) > 0.0]
+    unplanned_cats = [c for c in cats if planned_by_cat.get(c, 0.0) == 0.0]
+    lines = []
+    for c in planned_cats:
+        p, s = planned_by_cat.get(c, 0.0), spent_by_cat.get(c, 0.0)
+        r = p - s
+        over = overspend_by_cat.get(c, 0.0)
+        over_str = f"  (+{over:.2f} over)" if over > 0 else ""
+        lines.append(
+            f"- {c}: {p:.2f} | {s:.2f} | {'✅' if r >= 0 else '⚠️'} {r:.2f} "
+            f"{BASE_CURRENCY}{over_str}"
+        )
+    for c in unplanned_cats:
+        lines.append(f"- {c}: {spent_by_cat.get(c, 0.0):.2f} {BASE_CURRENCY}")
+
+    new_spent = dict(spent_by_cat)
+    new_spent[added_category] = new_spent.get(added_category, 0.0) + added
+    planned_total = sum(planned_by_cat.values())
+    prev_overall = budget - planned_total - overspend_total(spent_by_cat)
+    new_overall = budget - planned_total - overspend_total(new_spent)
+    return lines, prev_overall, new_overall
+
+
+def _engine(planned_by_cat, spent_by_cat, budget, added_category, added, limit):
+    report = BudgetReport(planned_by_cat, spent_by_cat, budget)
+    lines = report.get_category_summary_lines(
+        report.summary.lines(limit), separate_planned=True
+    )
+
+    new_spent = dict(spent_by_cat)
+    new_spent[added_category] = new_spent.get(added_category, 0.0) + added
+    prev_overall = report.metrics.remaining_overall
+    new_overall = summarize_budget(planned_by_cat, new_spent, budget).metrics
+    return lines, prev_overall, new_overall.remaining_overall
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    for _ in range(RUNS):
+        result = fn(*args)
+    return result, (time.perf_counter() - start) / RUNS
+
+
+def main(sizes: list[int]) -> None:
+    # The engine's lines carry the section headers
+    headers = {
+        MESSAGES["status_by_category_planned"],
+        MESSAGES["status_by_category_unplanned"],
+        "",
+    }
+    print(f"{'categories':>12}{'lines':>8}{'single pass (ms)':>20}{'walks (ms)':>14}")
+    for n in sizes:
+        planned, spent = _maps(n)
+        for limit in (TOP_N, None):
+            args = (planned, spent, sum(planned.values()) * 1.1, "Category 0000", 42.5)
+            (e_lines, e_prev, e_new), t_engine = _timed(_engine, *args, limit)
+            (w_lines, w_prev, w_new), t_walks = _timed(_walks, *args, limit)
+            assert [x for x in e_lines if x not in headers] == w_lines
+            assert abs(e_prev - w_prev) < 1e-6 and abs(e_new - w_new) < 1e-6
+
+            shown = "all" if limit is None else limit
+            print(f"{n:>12}{shown:>8}{t_engine * 1000:>20.3f}{t_walks * 1000:>14.3f}")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [100, 300, 1000])
@@ -0,0 +1,146 @@
+"""
+Benchmark: /year from one window-function statement vs month-scoped services.
+
+Fills a scratch database (schema from db/db.py) with one user's expenses over
+a year and times building the /year rows and rendering the reply two ways:
+year_review (one GROUP BY plus running sums and LAG in SQL) and a loop of
+compute_spent_this_month per month with the totals, deltas and ranking done
+in Python. Both produce the same rows; the rendered text is checked to match.
+
+Run from src/:
+    python -m benchmarks.bench_year [expenses]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date
+
+# The db module binds its connection pool to DB_PATH on import
+os.environ["DB_PATH"] = os.path.join(tempfile.mkdtemp(), "bench_year.db")
+
+from db.db import db, init_db  # noqa: E402
+from db.records import YearRow  # noqa: E402
+from db.services import (  # noqa: E402
+    compute_spent_this_month,
+    day_start_ts,
+    months_ending,
+    to_cents,
+    year_review,
+)
+from handlers.commands.report import _format_year  # noqa: E402
+
+USER_ID = 1
+OTHER_USERS = 50  # rows from other users share the table and indexes
+YEAR = "2025"
+MONTHS = months_ending(f"{YEAR}-12", 12)
+CATEGORIES = [f"Category {i}" for i in range(40)]
+RUNS = 20
+
+
+def _populate(n: int) -> None:
+    conn = db()
+    rnd = random.Random(42)
+    users = [USER_ID] + list(range(2, OTHER_USERS + 2))
+    conn.executemany(
+        "INSERT INTO categories(user_id, name) VALUES (?, ?)",
+        [(u, c) for u in users for c in CATEGORIES],
+    )
+    ids = {
+        (r["user_id"], r["name"]): r["id"]
+        for r in conn.execute("SELECT id, user_id, name FROM categories")
+    }
+
+    def rows():
+        for i in range(n * 2):
+            # Half the rows are the benchmarked user's
+            user = USER_ID if i % 2 == 0 else rnd.choice(users[1:])
+            month = rnd.choice(MONTHS)
+            day = rnd.randint(1, 28)
+            cents = rnd.randint(100, 20000)
+            yield (
+                user,
+                month,
+                ids[(user, rnd.choice(CATEGORIES))],
+                f"Expense {i}",
+                f"{month}-{day:02d}T12:00:00",
+                day_start_ts(date(int(month[:4]), int(month[5:]), day)),
+                cents,
+                cents,
+                f"{month}-{day:02d}",
+            )
+
+    conn.executemany(
+        """
+        INSERT INTO expenses(user_id, month, category_id, name, created_at, ts,
+                             currency, original_cents, base_cents, fx_rate, fx_date)
+        VALUES (?, ?, ?, ?, ?, ?, 'CHF', ?, ?, 1.0, ?)
+        """,
+        rows(),
+    )
+    conn.execute("ANALYZE")
+    conn.commit()
+
+
+def _rows_by_month_loop(user_id: int) -> list[YearRow]:
+    """The same rows as year_review, from one month-scoped query per month."""
+    month_rows, by_cat = [], {}
+    running, previous = 0, None
+    for m in MONTHS:
+        spent_by_cat, _ = compute_spent_this_month(user_id, m)
+        cents = 0
+        for cat, spent in spent_by_cat.items():
+            c = to_cents(spent)
+            cents += c
+            by_cat[cat] = by_cat.get(cat, 0) + c
+        n = (
+            db()
+            .execute(
+                "SELECT COUNT(*) FROM expenses WHERE user_id=? AND month=?",
+                (user_id, m),
+            )
+            .fetchone()[0]
+        )
+        running += cents
+        delta = None if previous is None else cents - previous
+        month_rows.append(YearRow("month", m, cents, n, running, delta))
+        previous = cents
+
+    cat_rows, running = [], 0
+    for cat, cents in sorted(by_cat.items(), key=lambda kv: (-kv[1], kv[0])):
+        running += cents
+        cat_rows.append(YearRow("category", cat, cents, 0, running, None))
+    return month_rows + cat_rows
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    for _ in range(RUNS):
+        result = fn()
+    return result, (time.perf_counter() - start) / RUNS
+
+
+def main(n: int) -> None:
+    init_db()
+    _populate(n)
+
+    window_rows, t_window = _timed(lambda: year_review(USER_ID, MONTHS[0], MONTHS[-1]))
+    loop_rows, t_loop = _timed(lambda: _rows_by_month_loop(USER_ID))
+    window_text, r_window = _timed(lambda: _format_year(YEAR, window_rows, {}))
+    loop_text, r_loop = _timed(lambda: _format_year(YEAR, loop_rows, {}))
+    assert window_text == loop_text
+
+    print(f"{n} expenses for the user ({n * 2} in the table), {len(MONTHS)} months")
+    print(f"{'':24}{'window SQL':>14}{'month loop':>14}")
+    print(f"{'rows (ms)':24}{t_window * 1000:>14.2f}{t_loop * 1000:>14.2f}")
+    print(f"{'render (ms)':24}{r_window * 1000:>14.2f}{r_loop * 1000:>14.2f}")
+    print(
+        f"{'total (ms)':24}"
+        f"{(t_window + r_window) * 1000:>14.2f}{(t_loop + r_loop) * 1000:>14.2f}"
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
@@ -1,7 +1,9 @@
 import sqlite3
 import threading
 from contextlib import contextmanager
-from config import DB_PATH
+from config import BASE_CURRENCY, DB_PATH
+from db.payees import link_pending_payees
+from db.rule_sets import store_rule_set
 
 
 class DatabasePool:
@@ -77,10 +79,320 @@ def shutdown_db_pool():
     _pool.shutdown()
 
 
-def ensure_column(conn, table: str, col: str, coltype: str):
+def ensure_column(conn, table: str, col: str, coltype: str) -> bool:
+    """Adds the column if missing. Returns True if it was added."""
     cols = [r["name"] for r in conn.execute(f"PRAGMA table_info({table})").fetchall()]
     if col not in cols:
         conn.execute(f"ALTER TABLE {table} ADD COLUMN {col} {coltype}")
+        return True
+    return False
+
+
+# Amounts are integer hundredths ("cents"): original_cents in `currency`,
+# base_cents in BASE_CURRENCY. Every column is NOT NULL so sums need no COALESCE.
+# Categories are per-user ids into `categories` (see _CATEGORY_TABLES).
+_EXPENSES_DDL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        month TEXT NOT NULL,
+        category_id INTEGER NOT NULL REFERENCES categories(id),
+        name TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        ts INTEGER NOT NULL,
+        currency TEXT NOT NULL,
+        original_cents INTEGER NOT NULL,
+        base_cents INTEGER NOT NULL,
+        fx_rate REAL NOT NULL,
+        fx_date TEXT NOT NULL,
+        import_hash TEXT,
+        recurring_id INTEGER,
+        occurs_on TEXT,
+        payee_id INTEGER REFERENCES payees(id)
+    )
+"""
+
+_RULES_DDL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        category_id INTEGER NOT NULL REFERENCES categories(id),
+        name TEXT NOT NULL,
+        period TEXT NOT NULL CHECK(period IN ('daily','weekly','monthly','yearly')),
+        amount REAL NOT NULL
+    )
+"""
+
+# Recurring expenses: materialized into expenses by the scheduled job
+_RECURRING_DDL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        category_id INTEGER NOT NULL REFERENCES categories(id),
+        name TEXT NOT NULL,
+        period TEXT NOT NULL CHECK(period IN ('daily','weekly','monthly','yearly')),
+        start_date TEXT NOT NULL,
+        currency TEXT NOT NULL,
+        original_amount REAL NOT NULL,
+        chf_amount REAL NOT NULL,
+        fx_rate REAL NOT NULL,
+        fx_date TEXT NOT NULL,
+        materialized_until TEXT
+    )
+"""
+
+# Tables that reference a category, with their DDL
+_CATEGORY_TABLES = {
+    "expenses": _EXPENSES_DDL,
+    "rules": _RULES_DDL,
+    "recurring_expenses": _RECURRING_DDL,
+}
+
+# Legacy expense amounts (REAL, nullable) -> integer cents
+_LEGACY_CENTS_EXPRS = {
+    "ts": "COALESCE(ts, CAST(strftime('%s', created_at, 'utc') AS INTEGER))",
+    "currency": "COALESCE(currency, :base_currency)",
+    "original_cents": "CAST(ROUND(COALESCE(original_amount, chf_amount, amount) * 100) AS INTEGER)",
+    "base_cents": "CAST(ROUND(COALESCE(chf_amount, amount) * 100) AS INTEGER)",
+    "fx_rate": "COALESCE(fx_rate, 1.0)",
+    "fx_date": "COALESCE(fx_date, substr(created_at, 1, 10))",
+}
+
+
+# Trigger bodies keeping daily_spend in step with one expense row ({row} is
+# NEW or OLD); a day/category row is dropped when its last expense goes
+_DAILY_SPEND_ADD = """
+            INSERT INTO daily_spend(user_id, day, category_id, cents, n)
+            VALUES ({row}.user_id, substr({row}.created_at, 1, 10),
+                    {row}.category_id, {row}.base_cents, 1)
+            ON CONFLICT(user_id, day, category_id)
+            DO UPDATE SET cents = cents + excluded.cents, n = n + 1;
+"""
+_DAILY_SPEND_REMOVE = """
+            UPDATE daily_spend SET cents = cents - {row}.base_cents, n = n - 1
+            WHERE user_id = {row}.user_id AND day = substr({row}.created_at, 1, 10)
+              AND category_id = {row}.category_id;
+            DELETE FROM daily_spend
+            WHERE user_id = {row}.user_id AND day = substr({row}.created_at, 1, 10)
+              AND category_id = {row}.category_id AND n <= 0;
+"""
+
+# Welford running statistics of expense amounts (BASE_CURRENCY units) per
+# category: adding x gives n+1, mean + d/(n+1), m2 + d*(x - new mean) with
+# d = x - mean; removing reverses it. UPDATE ... SET reads the old values.
+_CATEGORY_STATS_ADD = """
+            INSERT INTO category_stats(user_id, category_id, n, mean, m2)
+            VALUES ({row}.user_id, {row}.category_id, 1, {row}.base_cents / 100.0, 0.0)
+            ON CONFLICT(user_id, category_id) DO UPDATE SET
+                n = n + 1,
+                mean = mean + (excluded.mean - mean) / (n + 1),
+                m2 = m2 + (excluded.mean - mean)
+                          * (excluded.mean - mean - (excluded.mean - mean) / (n + 1));
+"""
+_CATEGORY_STATS_REMOVE = """
+            UPDATE category_stats SET
+                n = n - 1,
+                mean = CASE WHEN n > 1
+                    THEN (n * mean - {row}.base_cents / 100.0) / (n - 1) ELSE 0.0 END,
+                m2 = CASE WHEN n > 1
+                    THEN max(0.0, m2 - ({row}.base_cents / 100.0 - mean)
+                        * ({row}.base_cents / 100.0
+                           - (n * mean - {row}.base_cents / 100.0) / (n - 1)))
+                    ELSE 0.0 END
+            WHERE user_id = {row}.user_id AND category_id = {row}.category_id;
+            DELETE FROM category_stats
+            WHERE user_id = {row}.user_id AND category_id = {row}.category_id AND n <= 0;
+"""
+
+# Bumps the data version of ({user}, {month}); month '*' covers every month
+# (rules and categories)
+_BUMP_DATA_VERSION = """
+            INSERT INTO data_versions(user_id, month, version)
+            VALUES ({user}, {month}, 1)
+            ON CONFLICT(user_id, month) DO UPDATE SET version = version + 1;
+"""
+
+# (trigger name, event, [(user, month) bumped per row])
+_DATA_VERSION_TRIGGERS = [
+    ("expenses_insert", "INSERT ON expenses", [("NEW.user_id", "NEW.month")]),
+    ("expenses_delete", "DELETE ON expenses", [("OLD.user_id", "OLD.month")]),
+    (
+        "expenses_update",
+        "UPDATE ON expenses",
+        [("OLD.user_id", "OLD.month"), ("NEW.user_id", "NEW.month")],
+    ),
+    ("budgets_insert", "INSERT ON budgets", [("NEW.user_id", "NEW.month")]),
+    ("budgets_delete", "DELETE ON budgets", [("OLD.user_id", "OLD.month")]),
+    ("budgets_update", "UPDATE ON budgets", [("NEW.user_id", "NEW.month")]),
+    ("rules_insert", "INSERT ON rules", [("NEW.user_id", "'*'")]),
+    ("rules_delete", "DELETE ON rules", [("OLD.user_id", "'*'")]),
+    ("rules_update", "UPDATE ON rules", [("NEW.user_id", "'*'")]),
+    ("categories_update", "UPDATE ON categories", [("NEW.user_id", "'*'")]),
+    ("categories_delete", "DELETE ON categories", [("OLD.user_id", "'*'")]),
+    (
+        "month_rule_sets_insert",
+        "INSERT ON month_rule_sets",
+        [("NEW.user_id", "NEW.month")],
+    ),
+    (
+        "month_rule_sets_delete",
+        "DELETE ON month_rule_sets",
+        [("OLD.user_id", "OLD.month")],
+    ),
+    (
+        "month_rule_sets_update",
+        "UPDATE ON month_rule_sets",
+        [("NEW.user_id", "NEW.month")],
+    ),
+    (
+        "rule_set_items_update",
+        "UPDATE ON rule_set_items",
+        [("(SELECT user_id FROM rule_sets WHERE id = NEW.set_id)", "'*'")],
+    ),
+]
+
+
+def _columns(conn, table: str) -> list[str]:
+    return [r["name"] for r in conn.execute(f"PRAGMA table_info({table})").fetchall()]
+
+
+def _rebuild_table(conn, table: str, ddl: str, exprs: dict[str, str], params=()):
+    """
+    Recreates `table` from `ddl`, copying every row. Columns of the new layout
+    are filled from `exprs` (SQL over the old row) or the same-named old column.
+    Ids and the AUTOINCREMENT sequence are kept. Triggers and indexes of the old
+    table are dropped with it and recreated by init_db. Runs inside the
+    caller's transaction.
+    """
+    seq = conn.execute(
+        "SELECT seq FROM sqlite_sequence WHERE name=?", (table,)
+    ).fetchone()
+    conn.execute(f"DROP TABLE IF EXISTS {table}_new")
+    conn.execute(ddl.format(table=f"{table}_new"))
+    cols = _columns(conn, f"{table}_new")
+    select = ", ".join(exprs.get(c, c) for c in cols)
+    conn.execute(
+        f"INSERT INTO {table}_new({', '.join(cols)}) SELECT {select} FROM {table} AS t",
+        params,
+    )
+    conn.execute(f"DROP TABLE {table}")
+    conn.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+    if seq is not None:
+        # Never hand out ids of deleted rows again (delta export cursors)
+        conn.execute(
+            "UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name=?",
+            (int(seq["seq"]), table),
+        )
+
+
+def _migrate_category_tables(conn) -> bool:
+    """
+    Rebuilds tables still storing the category name as TEXT so they reference
+    `categories` by id, creating one category per (user_id, name). Legacy
+    expenses (REAL amount/chf_amount/original_amount, nullable FX columns) are
+    converted to integer cents in the same pass. Returns True if a migration ran.
+    """
+    pending = [
+        t
+        for t in _CATEGORY_TABLES
+        if "category" in (cols := _columns(conn, t)) and "category_id" not in cols
+    ]
+    if not pending:
+        return False
+
+    if "expenses" in pending and "base_cents" not in _columns(conn, "expenses"):
+        # Bring older layouts up to the last REAL one before copying
+        for col, coltype in (
+            ("currency", "TEXT"),
+            ("original_amount", "REAL"),
+            ("chf_amount", "REAL"),
+            ("fx_rate", "REAL"),
+            ("fx_date", "TEXT"),
+            ("ts", "INTEGER"),
+            ("import_hash", "TEXT"),
+            ("recurring_id", "INTEGER"),
+            ("occurs_on", "TEXT"),
+        ):
+            ensure_column(conn, "expenses", col, coltype)
+        conn.commit()
+        legacy_amounts = True
+    else:
+        legacy_amounts = False
+
+    category_id = (
+        "(SELECT c.id FROM categories c "
+        "WHERE c.user_id = t.user_id AND c.name = t.category)"
+    )
+    try:
+        conn.execute("BEGIN")
+        for table in pending:
+            conn.execute(
+                f"INSERT OR IGNORE INTO categories(user_id, name) "
+                f"SELECT DISTINCT user_id, category FROM {table}"
+            )
+            exprs = {"category_id": category_id}
+            if table == "expenses":
+                # Linked to payees by init_db once the table is rebuilt
+                exprs["payee_id"] = "NULL"
+                if legacy_amounts:
+                    exprs.update(_LEGACY_CENTS_EXPRS)
+            _rebuild_table(
+                conn,
+                table,
+                _CATEGORY_TABLES[table],
+                exprs,
+                {"base_currency": BASE_CURRENCY},
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return True
+
+
+def _migrate_rule_snapshots(conn) -> bool:
+    """
+    Replaces the legacy `rule_snapshots` table (a full copy of the rules per
+    user and month) with rule-set versions and month pointers, then drops it.
+    Returns True if a migration ran.
+    """
+    cols = _columns(conn, "rule_snapshots")
+    if not cols:
+        return False
+
+    try:
+        conn.execute("BEGIN")
+        if "category_id" in cols:
+            category_id = "category_id"
+        else:
+            conn.execute(
+                "INSERT OR IGNORE INTO categories(user_id, name) "
+                "SELECT DISTINCT user_id, category FROM rule_snapshots"
+            )
+            category_id = (
+                "(SELECT c.id FROM categories c "
+                "WHERE c.user_id = s.user_id AND c.name = s.category)"
+            )
+        months: dict[tuple[int, str], list] = {}
+        for r in conn.execute(
+            f"SELECT user_id, month, {category_id} AS category_id, name, period, amount "
+            "FROM rule_snapshots AS s"
+        ):
+            months.setdefault((r["user_id"], r["month"]), []).append(
+                (r["category_id"], r["name"], r["period"], r["amount"])
+            )
+        for (user_id, month), items in months.items():
+            conn.execute(
+                "INSERT OR IGNORE INTO month_rule_sets(user_id, month, set_id) "
+                "VALUES (?, ?, ?)",
+                (user_id, month, store_rule_set(conn, user_id, items)),
+            )
+        conn.execute("DROP TABLE rule_snapshots")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return True
 
 
 def init_db():
@@ -98,32 +410,76 @@ def init_db():
     """
     )
 
+    # Per-user category dictionary; expenses, rules, rule-set items and recurring
+    # expenses reference it by id, so a rename is a single-row update
     cur.execute(
         """
-        CREATE TABLE IF NOT EXISTS rules (
+        CREATE TABLE IF NOT EXISTS categories (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             user_id INTEGER NOT NULL,
-            category TEXT NOT NULL,
             name TEXT NOT NULL,
-            period TEXT NOT NULL CHECK(period IN ('daily','weekly','monthly','yearly')),
-            amount REAL NOT NULL
+            UNIQUE (user_id, name)
         )
     """
     )
 
+    # Per-user payee dictionary (see db/payees.py): expenses reference the
+    # normalised expense name by id
     cur.execute(
         """
-        CREATE TABLE IF NOT EXISTS expenses (
+        CREATE TABLE IF NOT EXISTS payees (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             user_id INTEGER NOT NULL,
-            month TEXT NOT NULL,
-            category TEXT NOT NULL,
+            key TEXT NOT NULL,
             name TEXT NOT NULL,
-            amount REAL NOT NULL,
-            created_at TEXT NOT NULL
+            UNIQUE (user_id, key)
+        )
+    """
+    )
+
+    for table, ddl in _CATEGORY_TABLES.items():
+        cur.execute(ddl.format(table=table))
+    _migrate_category_tables(conn)
+    ensure_column(conn, "expenses", "payee_id", "INTEGER REFERENCES payees(id)")
+
+    # Rule-set versions (see db/rule_sets.py): immutable, deduplicated by the
+    # hash of their items; each month points at the version it used
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS rule_sets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            hash TEXT NOT NULL,
+            UNIQUE (user_id, hash)
+        )
+    """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS rule_set_items (
+            set_id INTEGER NOT NULL REFERENCES rule_sets(id),
+            category_id INTEGER NOT NULL REFERENCES categories(id),
+            name TEXT NOT NULL,
+            period TEXT NOT NULL CHECK(period IN ('daily','weekly','monthly','yearly')),
+            amount REAL NOT NULL
+        )
+    """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS month_rule_sets (
+            user_id INTEGER NOT NULL,
+            month TEXT NOT NULL,
+            set_id INTEGER NOT NULL REFERENCES rule_sets(id),
+            created_at TEXT DEFAULT (datetime('now')),
+            PRIMARY KEY (user_id, month)
         )
     """
     )
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_rule_set_items_set ON rule_set_items(set_id)"
+    )
+    _migrate_rule_snapshots(conn)
 
     cur.execute(
         """
@@ -146,17 +502,310 @@ def init_db():
     """
     )
 
+    # Deleted expenses leave a tombstone so delta exports can report them
     cur.execute(
         """
-        CREATE TABLE IF NOT EXISTS rule_snapshots (
+        CREATE TABLE IF NOT EXISTS expense_tombstones (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
             user_id INTEGER NOT NULL,
+            expense_id INTEGER NOT NULL,
             month TEXT NOT NULL,
-            category TEXT NOT NULL,
-            name TEXT NOT NULL,
-            period TEXT NOT NULL CHECK(period IN ('daily','weekly','monthly','yearly')),
-            amount REAL NOT NULL,
-            created_at TEXT DEFAULT (datetime('now')),
-            PRIMARY KEY (user_id, month, category, name, period)
+            deleted_at TEXT DEFAULT (datetime('now'))
+        )
+    """
+    )
+
+    # High-water mark of the last delta export per user
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS export_cursors (
+            user_id INTEGER PRIMARY KEY,
+            last_expense_id INTEGER NOT NULL DEFAULT 0,
+            last_seq INTEGER NOT NULL DEFAULT 0,
+            exported_at TEXT
+        )
+    """
+    )
+
+    # Only rows a delta export already delivered need a tombstone: users who
+    # never exported get everything as inserts on their first delta anyway
+    if cur.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='trigger' "
+        "AND name='trg_expenses_tombstone'"
+    ).fetchone():
+        cur.execute("DROP TRIGGER trg_expenses_tombstone")
+        cur.execute(
+            """
+            DELETE FROM expense_tombstones
+            WHERE expense_id > COALESCE((
+                SELECT c.last_expense_id FROM export_cursors c
+                WHERE c.user_id = expense_tombstones.user_id
+            ), 0)
+        """
+        )
+    cur.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_expenses_tombstone_exported
+        AFTER DELETE ON expenses
+        WHEN EXISTS (
+            SELECT 1 FROM export_cursors
+            WHERE user_id = OLD.user_id AND last_expense_id >= OLD.id
+        )
+        BEGIN
+            INSERT INTO expense_tombstones(user_id, expense_id, month)
+            VALUES (OLD.user_id, OLD.id, OLD.month);
+        END
+    """
+    )
+
+    # Full-text index over expense names and category names. Its external
+    # content is the expenses_search view (expenses joined to categories),
+    # kept in sync by the triggers below.
+    cur.execute(
+        """
+        CREATE VIEW IF NOT EXISTS expenses_search AS
+        SELECT e.id, e.name, c.name AS category
+        FROM expenses e JOIN categories c ON c.id = e.category_id
+    """
+    )
+    fts = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type='table' AND name='expenses_fts'"
+    ).fetchone()
+    if fts and "expenses_search" not in fts["sql"]:
+        # Index built over the old `expenses.category` text column
+        cur.execute("DROP TABLE expenses_fts")
+        fts = None
+    cur.execute(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS expenses_fts USING fts5(
+            name,
+            category,
+            content='expenses_search',
+            content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    """
+    )
+    if not fts:
+        # Index the expenses recorded before the search index existed
+        cur.execute("INSERT INTO expenses_fts(expenses_fts) VALUES ('rebuild')")
+
+    cur.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_expenses_fts_insert
+        AFTER INSERT ON expenses
+        BEGIN
+            INSERT INTO expenses_fts(rowid, name, category)
+            VALUES (
+                NEW.id, NEW.name,
+                (SELECT name FROM categories WHERE id = NEW.category_id)
+            );
+        END
+    """
+    )
+    cur.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_expenses_fts_delete
+        AFTER DELETE ON expenses
+        BEGIN
+            INSERT INTO expenses_fts(expenses_fts, rowid, name, category)
+            VALUES (
+                'delete', OLD.id, OLD.name,
+                (SELECT name FROM categories WHERE id = OLD.category_id)
+            );
+        END
+    """
+    )
+    cur.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_expenses_fts_update
+        AFTER UPDATE OF name, category_id ON expenses
+        BEGIN
+            INSERT INTO expenses_fts(expenses_fts, rowid, name, category)
+            VALUES (
+                'delete', OLD.id, OLD.name,
+                (SELECT name FROM categories WHERE id = OLD.category_id)
+            );
+            INSERT INTO expenses_fts(rowid, name, category)
+            VALUES (
+                NEW.id, NEW.name,
+                (SELECT name FROM categories WHERE id = NEW.category_id)
+            );
+        END
+    """
+    )
+    # A rename only touches the category row; the search index of its
+    # expenses is refreshed here
+    cur.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_categories_fts_rename
+        AFTER UPDATE OF name ON categories
+        BEGIN
+            INSERT INTO expenses_fts(expenses_fts, rowid, name, category)
+            SELECT 'delete', id, name, OLD.name FROM expenses
+            WHERE user_id = OLD.user_id AND category_id = OLD.id;
+            INSERT INTO expenses_fts(rowid, name, category)
+            SELECT id, name, NEW.name FROM expenses
+            WHERE user_id = NEW.user_id AND category_id = NEW.id;
+        END
+    """
+    )
+
+    # Spend per user, day (date of created_at) and category, maintained by
+    # the triggers below so per-day questions never scan expenses
+    daily = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='daily_spend'"
+    ).fetchone()
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS daily_spend (
+            user_id INTEGER NOT NULL,
+            day TEXT NOT NULL,
+            category_id INTEGER NOT NULL REFERENCES categories(id),
+            cents INTEGER NOT NULL,
+            n INTEGER NOT NULL,
+            PRIMARY KEY (user_id, day, category_id)
+        ) WITHOUT ROWID
+    """
+    )
+    if not daily:
+        # Aggregate the expenses recorded before the table existed
+        cur.execute(
+            """
+            INSERT INTO daily_spend(user_id, day, category_id, cents, n)
+            SELECT user_id, substr(created_at, 1, 10), category_id,
+                   SUM(base_cents), COUNT(*)
+            FROM expenses
+            GROUP BY user_id, substr(created_at, 1, 10), category_id
+        """
+        )
+    cur.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_expenses_daily_insert
+        AFTER INSERT ON expenses
+        BEGIN
+            {_DAILY_SPEND_ADD.format(row="NEW")}
+        END
+    """
+    )
+    cur.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_expenses_daily_delete
+        AFTER DELETE ON expenses
+        BEGIN
+            {_DAILY_SPEND_REMOVE.format(row="OLD")}
+        END
+    """
+    )
+    cur.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_expenses_daily_update
+        AFTER UPDATE OF user_id, created_at, category_id, base_cents ON expenses
+        BEGIN
+            {_DAILY_SPEND_REMOVE.format(row="OLD")}
+            {_DAILY_SPEND_ADD.format(row="NEW")}
+        END
+    """
+    )
+
+    # Running amount statistics per category for anomaly alerts, updated in
+    # O(1) per expense by the triggers below; a nightly job recomputes them
+    # exactly (utils/anomalies.py) to remove floating-point drift
+    stats = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='category_stats'"
+    ).fetchone()
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS category_stats (
+            user_id INTEGER NOT NULL,
+            category_id INTEGER NOT NULL REFERENCES categories(id),
+            n INTEGER NOT NULL,
+            mean REAL NOT NULL,
+            m2 REAL NOT NULL,
+            PRIMARY KEY (user_id, category_id)
+        ) WITHOUT ROWID
+    """
+    )
+    if not stats:
+        cur.execute(
+            """
+            INSERT INTO category_stats(user_id, category_id, n, mean, m2)
+            SELECT e.user_id, e.category_id, COUNT(*), a.mean,
+                   SUM((e.base_cents / 100.0 - a.mean) * (e.base_cents / 100.0 - a.mean))
+            FROM expenses e
+            JOIN (
+                SELECT category_id, AVG(base_cents / 100.0) AS mean
+                FROM expenses GROUP BY category_id
+            ) a ON a.category_id = e.category_id
+            GROUP BY e.user_id, e.category_id
+        """
+        )
+    cur.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_expenses_stats_insert
+        AFTER INSERT ON expenses
+        BEGIN
+            {_CATEGORY_STATS_ADD.format(row="NEW")}
+        END
+    """
+    )
+    cur.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_expenses_stats_delete
+        AFTER DELETE ON expenses
+        BEGIN
+            {_CATEGORY_STATS_REMOVE.format(row="OLD")}
+        END
+    """
+    )
+    cur.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_expenses_stats_update
+        AFTER UPDATE OF user_id, category_id, base_cents ON expenses
+        BEGIN
+            {_CATEGORY_STATS_REMOVE.format(row="OLD")}
+            {_CATEGORY_STATS_ADD.format(row="NEW")}
+        END
+    """
+    )
+
+    # Per (user, month) write counters keying the /status cache; rows are
+    # never deleted, so a version is never reused
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS data_versions (
+            user_id INTEGER NOT NULL,
+            month TEXT NOT NULL,
+            version INTEGER NOT NULL,
+            PRIMARY KEY (user_id, month)
+        ) WITHOUT ROWID
+    """
+    )
+    for name, event, bumps in _DATA_VERSION_TRIGGERS:
+        body = "".join(
+            _BUMP_DATA_VERSION.format(user=user, month=month) for user, month in bumps
+        )
+        cur.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{name}_version
+            AFTER {event}
+            BEGIN
+                {body}
+            END
+        """
+        )
+
+    # Searches referenced by pagination buttons (terms don't fit in callback_data)
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS saved_searches (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            terms TEXT NOT NULL,
+            month_from TEXT NOT NULL DEFAULT '',
+            month_to TEXT NOT NULL DEFAULT '',
+            category TEXT NOT NULL DEFAULT '',
+            UNIQUE (user_id, terms, month_from, month_to, category)
         )
     """
     )
@@ -165,18 +814,69 @@ def init_db():
         "CREATE INDEX IF NOT EXISTS idx_expenses_user_month ON expenses(user_id, month)"
     )
     cur.execute(
-        "CREATE INDEX IF NOT EXISTS idx_expenses_user_month_cat ON expenses(user_id, month, category)"
+        "CREATE INDEX IF NOT EXISTS idx_expenses_user_id ON expenses(user_id, id)"
+    )
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_expense_tombstones_user_seq ON expense_tombstones(user_id, seq)"
+    )
+    # Covering indexes: per-category sums by month or by date range never
+    # touch the table rows
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_expenses_user_month_cat_cents
+        ON expenses(user_id, month, category_id, base_cents)
+        """
+    )
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_expenses_user_ts_cat_cents
+        ON expenses(user_id, ts, category_id, base_cents)
+        """
+    )
+    # /heatmap: expenses with a time of day (not stamped at midnight)
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_expenses_user_ts_timed
+        ON expenses(user_id, ts, base_cents, created_at)
+        WHERE substr(created_at, 12) <> '00:00:00'
+        """
+    )
+    # /top: spend per payee over a date range; the partial index finds the
+    # expenses still to be linked to a payee
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_expenses_user_ts_payee_cents
+        ON expenses(user_id, ts, payee_id, base_cents)
+        """
+    )
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_expenses_payee_pending
+        ON expenses(id) WHERE payee_id IS NULL
+        """
     )
     cur.execute("CREATE INDEX IF NOT EXISTS idx_rules_user ON rules(user_id)")
+
+    # dedup of imported rows (re-importing a statement skips duplicates) and
+    # occurrence key of materialized recurring expenses (one row per due date)
+    cur.execute(
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_expenses_user_import_hash
+        ON expenses(user_id, import_hash) WHERE import_hash IS NOT NULL
+        """
+    )
+
+    cur.execute(
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_expenses_recurring_occurrence
+        ON expenses(recurring_id, occurs_on) WHERE recurring_id IS NOT NULL
+        """
+    )
     cur.execute(
-        "CREATE INDEX IF NOT EXISTS idx_rule_snapshots_user_month ON rule_snapshots(user_id, month)"
+        "CREATE INDEX IF NOT EXISTS idx_recurring_user ON recurring_expenses(user_id)"
     )
 
-    # multi-currency expense columns
-    ensure_column(conn, "expenses", "currency", "TEXT")
-    ensure_column(conn, "expenses", "original_amount", "REAL")
-    ensure_column(conn, "expenses", "chf_amount", "REAL")
-    ensure_column(conn, "expenses", "fx_rate", "REAL")
-    ensure_column(conn, "expenses", "fx_date", "TEXT")
+    # Expenses recorded before the payee dictionary existed
+    link_pending_payees(conn)
 
     conn.commit()
@@ -0,0 +1,61 @@
+"""
+Per-user payee dictionary.
+
+Expense names are free text ("Migros", "MIGROS ", "migros"). Each expense
+references a row of `payees` keyed by the normalised name (case-folded,
+whitespace collapsed), so spend per payee is a GROUP BY over an integer column
+of an index instead of string processing over every expense. The payee keeps
+the spelling it was first seen with for display.
+
+Used by the init_db migration and by services; functions take the connection
+and never commit.
+"""
+
+from collections import defaultdict
+from typing import Dict, Iterable
+
+
+def payee_key(name: str) -> str:
+    """'  MIGROS   Zürich ' -> 'migros zürich'."""
+    return " ".join(name.casefold().split())
+
+
+def payee_ids(conn, user_id: int, names: Iterable[str]) -> Dict[str, int]:
+    """Payee ids of the expense `names` for the user, creating the missing payees."""
+    keys = {name: payee_key(name) for name in dict.fromkeys(names)}
+    if not keys:
+        return {}
+    conn.executemany(
+        "INSERT OR IGNORE INTO payees(user_id, key, name) VALUES (?, ?, ?)",
+        [(user_id, key, " ".join(name.split())) for name, key in keys.items()],
+    )
+    unique = list(dict.fromkeys(keys.values()))
+    rows = conn.execute(
+        f"SELECT id, key FROM payees WHERE user_id=? "
+        f"AND key IN ({','.join('?' * len(unique))})",
+        (user_id, *unique),
+    ).fetchall()
+    by_key = {r["key"]: int(r["id"]) for r in rows}
+    return {name: by_key[key] for name, key in keys.items()}
+
+
+def link_pending_payees(conn) -> int:
+    """
+    Sets payee_id on expenses inserted without one (materialized recurring
+    expenses, rows from before the dictionary existed). Returns the count.
+    """
+    pending = defaultdict(list)
+    for r in conn.execute(
+        "SELECT id, user_id, name FROM expenses WHERE payee_id IS NULL"
+    ):
+        pending[r["user_id"]].append((r["id"], r["name"]))
+
+    n = 0
+    for user_id, rows in pending.items():
+        ids = payee_ids(conn, user_id, (name for _, name in rows))
+        conn.executemany(
+            "UPDATE expenses SET payee_id=? WHERE id=?",
+            [(ids[name], expense_id) for expense_id, name in rows],
+        )
+        n += len(rows)
+    return n
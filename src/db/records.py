@@ -0,0 +1,197 @@
+"""
+Compact record types for rows that are read in bulk and formatted in loops.
+
+sqlite3.Row keeps a reference to the cursor description and resolves every
+string key on access. These slotted dataclasses are built directly by a row
+factory, so each row costs a single small object with plain attribute access.
+
+Field order must match the column order of the SELECT that produces them.
+"""
+
+import sqlite3
+from dataclasses import dataclass
+
+
+@dataclass(slots=True)
+class Expense:
+    """
+    An expense row as listed by /expenses. Amounts are integer hundredths:
+    original_cents in `currency`, base_cents in BASE_CURRENCY.
+    """
+
+    id: int
+    month: str
+    category: str
+    name: str
+    created_at: str
+    currency: str
+    original_cents: int
+    base_cents: int
+
+    @property
+    def original_amount(self) -> float:
+        return self.original_cents / 100
+
+    @property
+    def chf_amount(self) -> float:
+        return self.base_cents / 100
+
+    @classmethod
+    def from_row(cls, cursor: sqlite3.Cursor, row: tuple) -> "Expense":
+        return cls(*row)
+
+
+@dataclass(slots=True)
+class Rule:
+    """A current spending rule (amount in BASE_CURRENCY per period)."""
+
+    id: int
+    category: str
+    name: str
+    period: str
+    amount: float
+
+    @classmethod
+    def from_row(cls, cursor: sqlite3.Cursor, row: tuple) -> "Rule":
+        return cls(*row)
+
+
+@dataclass(slots=True)
+class RuleSnapshot:
+    """A rule as it applies to a given month (snapshot or current rule)."""
+
+    category: str
+    name: str
+    period: str
+    amount: float
+
+    @classmethod
+    def from_row(cls, cursor: sqlite3.Cursor, row: tuple) -> "RuleSnapshot":
+        return cls(*row)
+
+
+@dataclass(slots=True)
+class MonthRule:
+    """A rule of the rule-set version a given month points at."""
+
+    month: str
+    category: str
+    name: str
+    period: str
+    amount: float
+
+    @classmethod
+    def from_row(cls, cursor: sqlite3.Cursor, row: tuple) -> "MonthRule":
+        return cls(*row)
+
+
+@dataclass(slots=True)
+class DailySpend:
+    """Spend of one category on one day of a month (integer hundredths)."""
+
+    category: str
+    day: int
+    cents: int
+
+    @classmethod
+    def from_row(cls, cursor: sqlite3.Cursor, row: tuple) -> "DailySpend":
+        return cls(*row)
+
+
+@dataclass(slots=True)
+class CategoryStats:
+    """Running count, mean and M2 (Welford) of a category's expense amounts."""
+
+    category: str
+    n: int
+    mean: float
+    m2: float
+
+    @property
+    def std(self) -> float:
+        """Sample standard deviation (0 with fewer than two expenses)."""
+        return (self.m2 / (self.n - 1)) ** 0.5 if self.n > 1 else 0.0
+
+    @classmethod
+    def from_row(cls, cursor: sqlite3.Cursor, row: tuple) -> "CategoryStats":
+        return cls(*row)
+
+
+@dataclass(slots=True)
+class YearRow:
+    """
+    A row of the /year review. kind "month": spend of `label` (YYYY-MM),
+    running_cents the spend through that month and delta_cents the change
+    from the previous month (None for the first). kind "category": spend of
+    `label` over the year, running_cents the spend of it and all larger
+    categories (rows come largest first) and delta_cents None.
+    """
+
+    kind: str
+    label: str
+    cents: int
+    count: int
+    running_cents: int
+    delta_cents: int | None
+
+    @classmethod
+    def from_row(cls, cursor: sqlite3.Cursor, row: tuple) -> "YearRow":
+        return cls(*row)
+
+
+@dataclass(slots=True)
+class HeatCell:
+    """Spend in one weekday (0 = Monday) x hour-of-day (0-23) slot of /heatmap."""
+
+    weekday: int
+    hour: int
+    cents: int
+    count: int
+
+    @classmethod
+    def from_row(cls, cursor: sqlite3.Cursor, row: tuple) -> "HeatCell":
+        return cls(*row)
+
+
+@dataclass(slots=True)
+class PayeeSpend:
+    """
+    A /top row: spend at `payee` over the range, with the number of payees
+    and the total spend of the whole range (the same on every row).
+    """
+
+    payee: str
+    cents: int
+    count: int
+    payees: int
+    total_cents: int
+
+    @classmethod
+    def from_row(cls, cursor: sqlite3.Cursor, row: tuple) -> "PayeeSpend":
+        return cls(*row)
+
+
+@dataclass(slots=True)
+class Recurring:
+    """A recurring expense definition (chf_amount in BASE_CURRENCY per occurrence)."""
+
+    id: int
+    category: str
+    name: str
+    period: str
+    start_date: str
+    currency: str
+    original_amount: float
+    chf_amount: float
+    materialized_until: str | None
+
+    @classmethod
+    def from_row(cls, cursor: sqlite3.Cursor, row: tuple) -> "Recurring":
+        return cls(*row)
+
+
+def fetch_records(conn: sqlite3.Connection, record_type, sql: str, params=()):
+    """Run `sql` and build every row as `record_type` instead of sqlite3.Row."""
+    cur = conn.cursor()
+    cur.row_factory = record_type.from_row
+    return cur.execute(sql, params).fetchall()
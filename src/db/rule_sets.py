@@ -0,0 +1,46 @@
+"""
+Content-addressed rule-set versions.
+
+A month's rules are stored once per distinct rule set: `rule_sets` holds one
+row per version (identified by a hash of its items), `rule_set_items` its
+rules, and `month_rule_sets` points each (user, month) at a version. Months
+with unchanged rules share the same version, so a rollover only adds a pointer.
+
+Used by the init_db migration and by services; functions take the connection
+and never commit.
+"""
+
+import hashlib
+from typing import Iterable, Tuple
+
+# (category_id, name, period, amount)
+RuleItem = Tuple[int, str, str, float]
+
+
+def rule_set_hash(items: Iterable[RuleItem]) -> str:
+    """Order-independent hash of a rule set's content."""
+    lines = sorted(
+        f"{int(c)}\x1f{name}\x1f{period}\x1f{float(amount)!r}"
+        for c, name, period, amount in items
+    )
+    return hashlib.sha1("\x1e".join(lines).encode("utf-8")).hexdigest()
+
+
+def store_rule_set(conn, user_id: int, items: list[RuleItem]) -> int:
+    """Returns the id of the version holding `items`, storing it if it's new."""
+    digest = rule_set_hash(items)
+    row = conn.execute(
+        "SELECT id FROM rule_sets WHERE user_id=? AND hash=?", (user_id, digest)
+    ).fetchone()
+    if row:
+        return int(row["id"])
+
+    set_id = conn.execute(
+        "INSERT INTO rule_sets(user_id, hash) VALUES (?, ?)", (user_id, digest)
+    ).lastrowid
+    conn.executemany(
+        "INSERT INTO rule_set_items(set_id, category_id, name, period, amount) "
+        "VALUES (?, ?, ?, ?, ?)",
+        [(set_id, c, name, period, float(amount)) for c, name, period, amount in items],
+    )
+    return int(set_id)
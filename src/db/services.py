@@ -1,9 +1,27 @@
 import calendar
-from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+from datetime import date, datetime, timedelta
 from typing import Optional, Dict, Tuple
 from db.db import db
+from db.records import (
+    CategoryStats,
+    DailySpend,
+    Expense,
+    HeatCell,
+    MonthRule,
+    PayeeSpend,
+    Recurring,
+    Rule,
+    RuleSnapshot,
+    YearRow,
+    fetch_records,
+)
+from db.payees import link_pending_payees, payee_ids
+from db.rule_sets import store_rule_set
 from config import BASE_CURRENCY
-from utils.fx import get_fx_rate, today_key
+from utils.categorize import forget_category_index, learn_categories
+from utils.category_match import forget_category_names
+from utils.fx import get_fx_rate, get_fx_rate_on, today_key
 
 
 def month_key(dt: Optional[datetime] = None) -> str:
@@ -17,16 +35,224 @@ def days_in_month(month: str) -> int:
     return calendar.monthrange(y, m)[1]
 
 
+def months_ending(month: str, n: int) -> list[str]:
+    """The `n` months up to and including `month`, oldest first."""
+    last = int(month[:4]) * 12 + int(month[5:7]) - 1
+    return [f"{i // 12:04d}-{i % 12 + 1:02d}" for i in range(last - n + 1, last + 1)]
+
+
+def day_start_ts(day: date) -> int:
+    """Epoch seconds of local midnight at the start of `day`."""
+    return int(datetime(day.year, day.month, day.day).timestamp())
+
+
+def ts_range_for_days(date_from: date, date_to: date) -> Tuple[int, int]:
+    """Half-open epoch range [start of date_from, start of the day after date_to)."""
+    return day_start_ts(date_from), day_start_ts(date_to + timedelta(days=1))
+
+
+# Start of a day range given as '..YYYY-MM-DD', before any expense
+OPEN_START = date(1970, 1, 1)
+
+# Years a day range may use: the day after the last one must still be a date
+MIN_YEAR, MAX_YEAR = date.min.year + 1, date.max.year - 1
+
+
+def parse_day_range(token: str) -> Tuple[date, date] | None:
+    """
+    'YYYY-MM-DD..YYYY-MM-DD' -> (from, to), both inclusive.
+    Either end may be omitted: an open start is OPEN_START (reports replace it
+    with first_expense_day), an open end means today. Returns None if not a
+    day range or outside MIN_YEAR..MAX_YEAR.
+    """
+    start, sep, end = token.partition("..")
+    if not sep or (not start and not end):
+        return None
+    try:
+        date_from = date.fromisoformat(start) if start else OPEN_START
+        date_to = date.fromisoformat(end) if end else date.today()
+    except ValueError:
+        return None
+    if date_from > date_to or date_from.year < MIN_YEAR or date_to.year > MAX_YEAR:
+        return None
+    return date_from, date_to
+
+
+def recent_days_range(mode: str, today: date | None = None) -> Tuple[date, date] | None:
+    """
+    Named ranges ending today:
+    - 'week' -> since Monday of the current week
+    - '<N>d' -> the last N days, today included (e.g. '7d', '30d')
+    Returns None if `mode` is not a named range.
+    """
+    today = today or date.today()
+    mode = mode.strip().lower()
+    if mode == "week":
+        return today - timedelta(days=today.weekday()), today
+    if mode.endswith("d") and mode[:-1].isdigit():
+        n = int(mode[:-1])
+        if 1 <= n <= 366:
+            return today - timedelta(days=n - 1), today
+    return None
+
+
 def parse_amount(s: str) -> float:
     return float(s.strip().replace(",", "."))
 
 
+def to_cents(amount: float) -> int:
+    """Amount -> integer hundredths as stored in `expenses`, rounding half up."""
+    return int(
+        Decimal(str(amount)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP) * 100
+    )
+
+
+def from_cents(cents: int | None) -> float:
+    return (cents or 0) / 100
+
+
 def looks_like_currency(s: str) -> bool:
     s = s.strip().upper()
     return len(s) == 3 and s.isalpha()
 
 
+# ---- Categories ----
+# Expenses, rules, rule-set versions and recurring expenses store a category_id.
+# _CATEGORY_NAME selects the name of the row's category; _CATEGORY_ID resolves
+# (user_id, name) to an id, NULL (matching nothing) for an unknown name.
+_CATEGORY_NAME = "(SELECT c.name FROM categories c WHERE c.id = category_id)"
+_CATEGORY_ID = "(SELECT id FROM categories WHERE user_id=? AND name=?)"
+
+
+def _category_ids(conn, user_id: int, names) -> Dict[str, int]:
+    """
+    Ids of the category `names` for the user, creating the missing ones.
+    Runs in the caller's transaction (no commit).
+    """
+    names = list(dict.fromkeys(names))
+    if not names:
+        return {}
+    cur = conn.executemany(
+        "INSERT OR IGNORE INTO categories(user_id, name) VALUES (?, ?)",
+        [(user_id, n) for n in names],
+    )
+    if cur.rowcount > 0:
+        forget_category_names(user_id)
+    rows = conn.execute(
+        f"SELECT id, name FROM categories WHERE user_id=? "
+        f"AND name IN ({','.join('?' * len(names))})",
+        (user_id, *names),
+    ).fetchall()
+    return {r["name"]: int(r["id"]) for r in rows}
+
+
+def get_category_id(user_id: int, name: str) -> int | None:
+    conn = db()
+    row = conn.execute(
+        "SELECT id FROM categories WHERE user_id=? AND name=?", (user_id, name)
+    ).fetchone()
+    return int(row["id"]) if row else None
+
+
+def rename_category(user_id: int, category_id: int, new_name: str) -> None:
+    """Renames a category everywhere with a single-row update."""
+    conn = db()
+    conn.execute(
+        "UPDATE categories SET name=? WHERE user_id=? AND id=?",
+        (new_name, user_id, category_id),
+    )
+    conn.commit()
+    forget_category_index(user_id)
+    forget_category_names(user_id)
+
+
+def merge_categories(user_id: int, source_id: int, target_id: int) -> int:
+    """
+    Moves everything of category `source_id` into `target_id` and drops the
+    source, in one transaction. Rule-set versions are immutable: each month
+    whose version has source rules is pointed at the version with those rules
+    under the target (stored if new). Returns the number of expenses moved.
+    """
+    conn = db()
+    params = {"user_id": user_id, "src": source_id, "dst": target_id}
+    try:
+        cur = conn.execute(
+            "UPDATE expenses SET category_id=:dst "
+            "WHERE user_id=:user_id AND category_id=:src",
+            params,
+        )
+        moved = cur.rowcount
+        for table in ("rules", "recurring_expenses"):
+            conn.execute(
+                f"UPDATE {table} SET category_id=:dst "
+                "WHERE user_id=:user_id AND category_id=:src",
+                params,
+            )
+        merged_sets: Dict[int, list] = {}
+        for r in conn.execute(
+            """
+            SELECT set_id, category_id, name, period, amount FROM rule_set_items
+            WHERE set_id IN (
+                SELECT m.set_id FROM month_rule_sets m
+                JOIN rule_set_items i ON i.set_id = m.set_id
+                WHERE m.user_id=:user_id AND i.category_id=:src
+            )
+            """,
+            params,
+        ):
+            category_id = (
+                target_id if r["category_id"] == source_id else r["category_id"]
+            )
+            merged_sets.setdefault(r["set_id"], []).append(
+                (category_id, r["name"], r["period"], r["amount"])
+            )
+        for set_id, items in merged_sets.items():
+            conn.execute(
+                "UPDATE month_rule_sets SET set_id=? WHERE user_id=? AND set_id=?",
+                (store_rule_set(conn, user_id, items), user_id, set_id),
+            )
+        conn.execute(
+            "DELETE FROM categories WHERE user_id=:user_id AND id=:src", params
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    forget_category_index(user_id)
+    forget_category_names(user_id)
+    return moved
+
+
+# ---- Data versions ----
+def get_data_version(user_id: int, month: str) -> int:
+    """
+    Version of a user's data for `month`: grows with every write to the
+    month's expenses, budget or rule snapshot, and with every change to the
+    user's rules or categories (triggers in db/db.py). Equal versions mean
+    nothing a month report reads has changed.
+    """
+    conn = db()
+    row = conn.execute(
+        "SELECT COALESCE(SUM(version), 0) FROM data_versions "
+        "WHERE user_id=? AND month IN (?, '*')",
+        (user_id, month),
+    ).fetchone()
+    return int(row[0])
+
+
 # ---- Budgets ----
+def get_budgets_between(
+    user_id: int, month_from: str, month_to: str
+) -> Dict[str, float]:
+    """Budgets of the months month_from..month_to (inclusive) that have one."""
+    conn = db()
+    rows = conn.execute(
+        "SELECT month, amount FROM budgets WHERE user_id=? AND month BETWEEN ? AND ?",
+        (user_id, month_from, month_to),
+    ).fetchall()
+    return {r["month"]: float(r["amount"]) for r in rows}
+
+
 def get_month_budget(user_id: int, month: str):
     conn = db()
     row = conn.execute(
@@ -94,22 +320,35 @@ def add_rule(
     user_id: int, category: str, name: str, period: str, amount_chf: float
 ) -> None:
     conn = db()
+    category_id = _category_ids(conn, user_id, [category])[category]
     conn.execute(
-        "INSERT INTO rules(user_id, category, name, period, amount) VALUES (?, ?, ?, ?, ?)",
-        (user_id, category, name, period, amount_chf),
+        "INSERT INTO rules(user_id, category_id, name, period, amount) VALUES (?, ?, ?, ?, ?)",
+        (user_id, category_id, name, period, amount_chf),
     )
     conn.commit()
 
 
-def list_rules(user_id: int):
+def list_rules(user_id: int, *, limit: int = -1, offset: int = 0) -> list[Rule]:
     conn = db()
-    rows = conn.execute(
-        "SELECT id, category, name, period, amount FROM rules WHERE user_id=? ORDER BY category, period, name",
-        (user_id,),
-    ).fetchall()
+    rows = fetch_records(
+        conn,
+        Rule,
+        f"SELECT id, {_CATEGORY_NAME} AS category, name, period, amount "
+        "FROM rules WHERE user_id=? "
+        "ORDER BY category, period, name, id LIMIT ? OFFSET ?",
+        (user_id, int(limit), int(offset)),
+    )
     return rows
 
 
+def count_rules(user_id: int) -> int:
+    conn = db()
+    row = conn.execute(
+        "SELECT COUNT(*) AS n FROM rules WHERE user_id=?", (user_id,)
+    ).fetchone()
+    return int(row["n"])
+
+
 def delete_rule(user_id: int, rule_id: int) -> bool:
     conn = db()
     cur = conn.execute("DELETE FROM rules WHERE user_id=? AND id=?", (user_id, rule_id))
@@ -117,6 +356,193 @@ def delete_rule(user_id: int, rule_id: int) -> bool:
     return cur.rowcount > 0
 
 
+# ---- Recurring expenses ----
+def add_recurring(
+    user_id: int,
+    category: str,
+    name: str,
+    period: str,
+    start_date: str,
+    currency: str,
+    original_amount: float,
+    chf_amount: float,
+    fx_rate: float,
+    fx_date: str,
+) -> int:
+    conn = db()
+    category_id = _category_ids(conn, user_id, [category])[category]
+    cur = conn.execute(
+        """
+        INSERT INTO recurring_expenses(
+            user_id, category_id, name, period, start_date,
+            currency, original_amount, chf_amount, fx_rate, fx_date
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (
+            user_id,
+            category_id,
+            name,
+            period,
+            start_date,
+            currency,
+            original_amount,
+            chf_amount,
+            fx_rate,
+            fx_date,
+        ),
+    )
+    conn.commit()
+    return int(cur.lastrowid)
+
+
+def list_recurring(user_id: int) -> list[Recurring]:
+    conn = db()
+    return fetch_records(
+        conn,
+        Recurring,
+        f"""
+        SELECT id, {_CATEGORY_NAME} AS category, name, period, start_date,
+               currency, original_amount, chf_amount, materialized_until
+        FROM recurring_expenses WHERE user_id=?
+        ORDER BY category, period, name, id
+        """,
+        (user_id,),
+    )
+
+
+def delete_recurring(user_id: int, recurring_id: int) -> bool:
+    """Stops future occurrences; already materialized expenses are kept."""
+    conn = db()
+    cur = conn.execute(
+        "DELETE FROM recurring_expenses WHERE user_id=? AND id=?",
+        (user_id, recurring_id),
+    )
+    conn.commit()
+    return cur.rowcount > 0
+
+
+# Occurrence number {n} (0 is start_date) of definition d. Monthly and yearly
+# dates are computed from start_date (not chained), clamped to the month's
+# last day, so a definition starting on the 31st lands on Feb 28/29.
+_OCCURRENCE_DATE = """
+    CASE d.period
+    WHEN 'daily' THEN date(d.start_date, '+' || ({n}) || ' days')
+    WHEN 'weekly' THEN date(d.start_date, '+' || (7 * ({n})) || ' days')
+    WHEN 'monthly' THEN min(
+        date(d.start_date, 'start of month',
+             '+' || ({n}) || ' months', '+' || d.day_offset || ' days'),
+        date(d.start_date, 'start of month',
+             '+' || (({n}) + 1) || ' months', '-1 day'))
+    ELSE min(
+        date(d.start_date, 'start of month',
+             '+' || (12 * ({n})) || ' months', '+' || d.day_offset || ' days'),
+        date(d.start_date, 'start of month',
+             '+' || (12 * ({n}) + 1) || ' months', '-1 day'))
+    END
+"""
+
+# Every occurrence date of the due definitions up to :today. The recursion
+# starts at the first occurrence that can come after materialized_until (at
+# most one before it, dropped by the caller), so a definition running for
+# years costs only the occurrences since the last run.
+_RECURRING_OCCURRENCES_CTE = f"""
+    WITH RECURSIVE
+    defs AS (
+        SELECT id, period, start_date,
+               CAST(strftime('%d', start_date) AS INTEGER) - 1 AS day_offset,
+               max(0, CASE
+                   WHEN materialized_until IS NULL THEN 0
+                   WHEN period = 'daily' THEN CAST(
+                       julianday(materialized_until) - julianday(start_date)
+                       AS INTEGER) + 1
+                   WHEN period = 'weekly' THEN CAST(
+                       julianday(materialized_until) - julianday(start_date)
+                       AS INTEGER) / 7 + 1
+                   WHEN period = 'monthly' THEN
+                       12 * (strftime('%Y', materialized_until) - strftime('%Y', start_date))
+                       + strftime('%m', materialized_until) - strftime('%m', start_date)
+                   ELSE strftime('%Y', materialized_until) - strftime('%Y', start_date)
+               END) AS first_n
+        FROM recurring_expenses
+        WHERE start_date <= :today
+          AND COALESCE(materialized_until, '') < :today
+          AND (:user_id IS NULL OR user_id = :user_id)
+    ),
+    occ(rid, n, occurs_on) AS (
+        SELECT d.id, d.first_n, {_OCCURRENCE_DATE.format(n="d.first_n")} FROM defs d
+        UNION ALL
+        SELECT d.id, o.n + 1, {_OCCURRENCE_DATE.format(n="o.n + 1")}
+        FROM occ o JOIN defs d ON d.id = o.rid
+        WHERE o.occurs_on <= :today
+    )
+"""
+
+
+def materialize_recurring_expenses(
+    today: str, user_id: int | None = None
+) -> Dict[int, int]:
+    """
+    Insert every due occurrence (up to `today`, YYYY-MM-DD) of all recurring
+    definitions, or only `user_id`'s, with one INSERT ... SELECT.
+
+    Idempotent: the (recurring_id, occurs_on) unique index ignores repeats, and
+    materialized_until keeps deleted occurrences from coming back. It advances
+    in the same transaction and the next run starts from it, so missed runs
+    are caught up without walking the older occurrences again. Returns the
+    number of expenses inserted per user; callers drop those users' category
+    indexes (forget_category_index) on the event loop, as the scheduled job
+    runs this in a worker thread.
+    """
+    conn = db()
+    params = {"today": today, "user_id": user_id}
+    try:
+        owners = conn.execute(
+            _RECURRING_OCCURRENCES_CTE
+            + """
+            INSERT OR IGNORE INTO expenses(
+                user_id, month, category_id, name,
+                created_at, ts,
+                currency, original_cents, base_cents, fx_rate, fx_date,
+                recurring_id, occurs_on
+            )
+            SELECT
+                r.user_id, substr(o.occurs_on, 1, 7), r.category_id, r.name,
+                o.occurs_on || 'T00:00:00',
+                CAST(strftime('%s', o.occurs_on, 'utc') AS INTEGER),
+                r.currency,
+                CAST(ROUND(r.original_amount * 100) AS INTEGER),
+                CAST(ROUND(r.chf_amount * 100) AS INTEGER),
+                r.fx_rate, r.fx_date,
+                r.id, o.occurs_on
+            FROM occ o
+            JOIN recurring_expenses r ON r.id = o.rid
+            WHERE o.occurs_on <= :today
+              AND o.occurs_on > COALESCE(r.materialized_until, '')
+            RETURNING user_id
+            """,
+            params,
+        ).fetchall()
+        link_pending_payees(conn)
+        conn.execute(
+            """
+            UPDATE recurring_expenses SET materialized_until = :today
+            WHERE start_date <= :today
+              AND COALESCE(materialized_until, '') < :today
+              AND (:user_id IS NULL OR user_id = :user_id)
+            """,
+            params,
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    inserted: Dict[int, int] = {}
+    for r in owners:
+        inserted[r["user_id"]] = inserted.get(r["user_id"], 0) + 1
+    return inserted
+
+
 def compute_planned_monthly_from_rules(
     user_id: int, month: str
 ) -> Tuple[Dict[str, float], float]:
@@ -125,14 +551,20 @@ def compute_planned_monthly_from_rules(
     # Use snapshot if it exists for that month, otherwise fallback to current rules
     rows, used_snapshot = get_rules_for_month(user_id, month)
 
+    planned_by_cat = _planned_by_cat(rows, d)
+    return planned_by_cat, sum(planned_by_cat.values())
+
+
+def _planned_by_cat(rules, days: int) -> Dict[str, float]:
+    """Monthly planned amount by category of `rules` for a month of `days` days."""
     planned_by_cat: Dict[str, float] = {}
-    for r in rows:
-        cat = r["category"]
-        period = r["period"]
-        amt = float(r["amount"])  # stored in BASE_CURRENCY
+    for r in rules:
+        cat = r.category
+        period = r.period
+        amt = r.amount  # stored in BASE_CURRENCY
 
         if period == "daily":
-            monthly = amt * d
+            monthly = amt * days
         elif period == "weekly":
             monthly = amt * 4.33  # ~4.33 weeks per month
         elif period == "monthly":
@@ -141,8 +573,48 @@ def compute_planned_monthly_from_rules(
             monthly = amt / 12.0
 
         planned_by_cat[cat] = planned_by_cat.get(cat, 0.0) + monthly
+    return planned_by_cat
 
-    return planned_by_cat, sum(planned_by_cat.values())
+
+def compute_planned_by_month(
+    user_id: int, months: list[str]
+) -> Dict[str, Dict[str, float]]:
+    """
+    compute_planned_monthly_from_rules for many months at once: the rule-set
+    versions of all months come from one query, and months without one use
+    the current rules (read at most once).
+    """
+    conn = db()
+    snapshots: Dict[str, list[RuleSnapshot]] = {}
+    for r in fetch_records(
+        conn,
+        MonthRule,
+        f"""
+        SELECT m.month, {_CATEGORY_NAME}, i.name, i.period, i.amount
+        FROM month_rule_sets m
+        JOIN rule_set_items i ON i.set_id = m.set_id
+        WHERE m.user_id=? AND m.month BETWEEN ? AND ?
+        """,
+        (user_id, min(months), max(months)),
+    ):
+        snapshots.setdefault(r.month, []).append(r)
+
+    current = None
+    planned: Dict[str, Dict[str, float]] = {}
+    for month in months:
+        rules = snapshots.get(month)
+        if rules is None:
+            if current is None:
+                current = fetch_records(
+                    conn,
+                    RuleSnapshot,
+                    f"SELECT {_CATEGORY_NAME}, name, period, amount FROM rules "
+                    "WHERE user_id=?",
+                    (user_id,),
+                )
+            rules = current
+        planned[month] = _planned_by_cat(rules, days_in_month(month))
+    return planned
 
 
 # ---- Expenses ----
@@ -157,31 +629,124 @@ def insert_expense(
     fx_rate: float,
     fx_date: str,
 ) -> None:
+    insert_expenses_bulk(
+        user_id,
+        month,
+        [(category, name, chf_amount, currency, original_amount, fx_rate, fx_date)],
+    )
+
+
+def insert_expenses_bulk(
+    user_id: int,
+    month: str,
+    rows: list[Tuple[str, str, float, str, float, float, str]],
+) -> None:
+    """
+    Insert (category, name, chf_amount, currency, original_amount, fx_rate, fx_date)
+    rows with a single executemany in one transaction.
+    """
     conn = db()
-    conn.execute(
+    now = datetime.now().replace(microsecond=0)
+    created_at = now.isoformat(timespec="seconds")
+    ts = int(now.timestamp())
+    category_ids = _category_ids(conn, user_id, (r[0] for r in rows))
+    payees = payee_ids(conn, user_id, (r[1] for r in rows))
+    conn.executemany(
         """
         INSERT INTO expenses(
-            user_id, month, category, name,
-            amount, created_at,
-            currency, original_amount, chf_amount, fx_rate, fx_date
+            user_id, month, category_id, name,
+            created_at, ts,
+            currency, original_cents, base_cents, fx_rate, fx_date,
+            payee_id
         )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """,
-        (
-            user_id,
-            month,
-            category,
-            name,
-            chf_amount,
-            datetime.now().isoformat(timespec="seconds"),
-            currency,
-            original_amount,
-            chf_amount,
-            fx_rate,
-            fx_date,
-        ),
+        [
+            (
+                user_id,
+                month,
+                category_ids[category],
+                name,
+                created_at,
+                ts,
+                currency,
+                to_cents(original_amount),
+                to_cents(chf_amount),
+                fx_rate,
+                fx_date,
+                payees[name],
+            )
+            for category, name, chf_amount, currency, original_amount, fx_rate, fx_date in rows
+        ],
     )
     conn.commit()
+    learn_categories(user_id, ((r[0], r[1]) for r in rows))
+
+
+def import_expenses_bulk(
+    user_id: int,
+    rows: list[Tuple[str, str, str, str, int, str, float, float, float, str, str]],
+) -> int:
+    """
+    Insert imported (month, category, name, created_at, ts, currency,
+    original_amount, chf_amount, fx_rate, fx_date, import_hash) rows in one
+    transaction. Rows whose import_hash is already stored for the user are
+    skipped by the unique index. Returns the number of rows inserted.
+    """
+    conn = db()
+    category_ids = _category_ids(conn, user_id, (r[1] for r in rows))
+    payees = payee_ids(conn, user_id, (r[2] for r in rows))
+    cur = conn.executemany(
+        """
+        INSERT OR IGNORE INTO expenses(
+            user_id, month, category_id, name,
+            created_at, ts,
+            currency, original_cents, base_cents, fx_rate, fx_date,
+            import_hash, payee_id
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        [
+            (
+                user_id,
+                month,
+                category_ids[category],
+                name,
+                created_at,
+                ts,
+                currency,
+                to_cents(original_amount),
+                to_cents(chf_amount),
+                fx_rate,
+                fx_date,
+                import_hash,
+                payees[name],
+            )
+            for (
+                month,
+                category,
+                name,
+                created_at,
+                ts,
+                currency,
+                original_amount,
+                chf_amount,
+                fx_rate,
+                fx_date,
+                import_hash,
+            ) in rows
+        ],
+    )
+    conn.commit()
+    forget_category_index(user_id)
+    return max(cur.rowcount, 0)
+
+
+def _spent_from_cents(rows) -> Tuple[Dict[str, float], float]:
+    """(category, cents) rows -> (spent_by_cat, total); the total is summed exactly."""
+    cents_by_cat = {r["category"]: int(r["s"] or 0) for r in rows}
+    spent_by_cat = {c: from_cents(v) for c, v in cents_by_cat.items()}
+    return spent_by_cat, from_cents(sum(cents_by_cat.values()))
 
 
 def compute_spent_this_month(
@@ -190,86 +755,596 @@ def compute_spent_this_month(
     conn = db()
     rows = conn.execute(
         """
-        SELECT category, SUM(COALESCE(chf_amount, amount)) AS s
-        FROM expenses
-        WHERE user_id=? AND month=?
-        GROUP BY category
+        SELECT c.name AS category, t.s
+        FROM (
+            SELECT category_id, SUM(base_cents) AS s
+            FROM expenses
+            WHERE user_id=? AND month=?
+            GROUP BY category_id
+        ) AS t
+        JOIN categories c ON c.id = t.category_id
         """,
         (user_id, month),
     ).fetchall()
+    return _spent_from_cents(rows)
 
-    spent_by_cat = {r["category"]: float(r["s"] or 0.0) for r in rows}
-    return spent_by_cat, sum(spent_by_cat.values())
 
+def compute_spent_by_month(
+    user_id: int, month_from: str, month_to: str
+) -> Dict[str, Dict[str, float]]:
+    """
+    Spent by month and category for month_from..month_to (inclusive) with one
+    GROUP BY over the (user_id, month, category_id, base_cents) covering index.
+    Months without expenses are absent.
+    """
+    conn = db()
+    rows = conn.execute(
+        """
+        SELECT t.month, c.name AS category, t.s
+        FROM (
+            SELECT month, category_id, SUM(base_cents) AS s
+            FROM expenses
+            WHERE user_id=? AND month BETWEEN ? AND ?
+            GROUP BY month, category_id
+        ) AS t
+        JOIN categories c ON c.id = t.category_id
+        """,
+        (user_id, month_from, month_to),
+    ).fetchall()
+    spent: Dict[str, Dict[str, float]] = {}
+    for r in rows:
+        spent.setdefault(r["month"], {})[r["category"]] = from_cents(r["s"])
+    return spent
 
-def list_expenses_filtered(
-    user_id: int, month: str, *, limit: int = 50, category: str | None = None
-):
+
+def _month_days(month: str) -> Tuple[str, str]:
+    """First and last day (YYYY-MM-DD) of `month`, for daily_spend ranges."""
+    return f"{month}-01", f"{month}-{days_in_month(month):02d}"
+
+
+def compute_daily_spent(user_id: int, month: str) -> list[DailySpend]:
+    """
+    Spent by category and day of `month`, read from the daily_spend
+    aggregate (one primary-key range); days without expenses are absent.
+    """
     conn = db()
+    return fetch_records(
+        conn,
+        DailySpend,
+        f"""
+        SELECT {_CATEGORY_NAME}, CAST(substr(day, 9, 2) AS INTEGER), cents
+        FROM daily_spend
+        WHERE user_id=? AND day BETWEEN ? AND ?
+        """,
+        (user_id, *_month_days(month)),
+    )
 
-    if category:
-        rows = conn.execute(
-            """
-            SELECT id, month, category, name, created_at,
-                   COALESCE(currency, ?) AS currency,
-                   COALESCE(original_amount, COALESCE(chf_amount, amount)) AS original_amount,
-                   COALESCE(chf_amount, amount) AS chf_amount
+
+def compute_spent_by_day(
+    user_id: int, month: str, category: str | None = None
+) -> Dict[int, float]:
+    """
+    Spent per day of `month` (day of month -> amount), optionally for one
+    category, from daily_spend. Days without expenses are absent.
+    """
+    where, params = ["user_id=?", "day BETWEEN ? AND ?"], [user_id, *_month_days(month)]
+    if category is not None:
+        where.append(f"category_id={_CATEGORY_ID}")
+        params += [user_id, category]
+    conn = db()
+    rows = conn.execute(
+        f"""
+        SELECT CAST(substr(day, 9, 2) AS INTEGER) AS d, SUM(cents) AS s
+        FROM daily_spend
+        WHERE {" AND ".join(where)}
+        GROUP BY day
+        """,
+        params,
+    ).fetchall()
+    return {r["d"]: from_cents(r["s"]) for r in rows}
+
+
+def spend_heatmap(user_id: int, ts_from: int, ts_to: int) -> list[HeatCell]:
+    """
+    Spend per weekday x local hour in the epoch range [ts_from, ts_to), as one
+    GROUP BY over the partial covering index idx_expenses_user_ts_timed: the
+    cost follows the number of expenses in the range, not the user's history.
+    Expenses stamped exactly at midnight are left out: materialized recurring
+    expenses and date-only imports carry no time of day. Empty slots are absent.
+    """
+    conn = db()
+    return fetch_records(
+        conn,
+        HeatCell,
+        """
+        SELECT (CAST(strftime('%w', ts, 'unixepoch', 'localtime') AS INTEGER) + 6) % 7
+                   AS weekday,
+               CAST(strftime('%H', ts, 'unixepoch', 'localtime') AS INTEGER) AS hour,
+               SUM(base_cents), COUNT(*)
+        FROM expenses
+        WHERE user_id=? AND ts>=? AND ts<? AND substr(created_at, 12) <> '00:00:00'
+        GROUP BY weekday, hour
+        """,
+        (user_id, int(ts_from), int(ts_to)),
+    )
+
+
+def top_payees(user_id: int, ts_from: int, ts_to: int, limit: int) -> list[PayeeSpend]:
+    """
+    The `limit` payees with the most spend in the epoch range [ts_from, ts_to),
+    largest first. Spend is grouped by payee id over the covering index
+    idx_expenses_user_ts_payee_cents; every row also carries the number of
+    payees and the total spend of the range.
+    """
+    conn = db()
+    return fetch_records(
+        conn,
+        PayeeSpend,
+        """
+        SELECT p.name, t.cents, t.n, COUNT(*) OVER (), SUM(t.cents) OVER ()
+        FROM (
+            SELECT payee_id, SUM(base_cents) AS cents, COUNT(*) AS n
             FROM expenses
-            WHERE user_id=? AND month=? AND category=?
-            ORDER BY id DESC
-            LIMIT ?
-            """,
-            (BASE_CURRENCY, user_id, month, category, int(limit)),
-        ).fetchall()
-    else:
-        rows = conn.execute(
-            """
-            SELECT id, month, category, name, created_at,
-                   COALESCE(currency, ?) AS currency,
-                   COALESCE(original_amount, COALESCE(chf_amount, amount)) AS original_amount,
-                   COALESCE(chf_amount, amount) AS chf_amount
+            WHERE user_id=? AND ts>=? AND ts<?
+            GROUP BY payee_id
+        ) AS t
+        JOIN payees p ON p.id = t.payee_id
+        ORDER BY t.cents DESC, p.key
+        LIMIT ?
+        """,
+        (user_id, int(ts_from), int(ts_to), int(limit)),
+    )
+
+
+def get_category_stats(user_id: int, categories) -> Dict[str, CategoryStats]:
+    """Amount statistics of the given categories (absent if no expenses yet)."""
+    names = list(dict.fromkeys(categories))
+    if not names:
+        return {}
+    conn = db()
+    rows = fetch_records(
+        conn,
+        CategoryStats,
+        f"""
+        SELECT c.name, s.n, s.mean, s.m2
+        FROM category_stats s JOIN categories c ON c.id = s.category_id
+        WHERE s.user_id=? AND c.name IN ({",".join("?" * len(names))})
+        """,
+        (user_id, *names),
+    )
+    return {r.category: r for r in rows}
+
+
+def year_review(user_id: int, month_from: str, month_to: str) -> list[YearRow]:
+    """
+    Monthly totals, running totals, month-over-month deltas and categories
+    ranked by spend for month_from..month_to, in one statement: a single
+    GROUP BY month, category_id over the covering index, and window functions
+    over those aggregates. Every month of the range gets a row (0 if empty);
+    month rows come first, in month order.
+    """
+    conn = db()
+    return fetch_records(
+        conn,
+        YearRow,
+        """
+        WITH RECURSIVE months(month) AS (
+            SELECT ?
+            UNION ALL
+            SELECT strftime('%Y-%m', month || '-01', '+1 month')
+            FROM months WHERE month < ?
+        ),
+        cells AS (
+            SELECT month, category_id, SUM(base_cents) AS cents, COUNT(*) AS n
             FROM expenses
-            WHERE user_id=? AND month=?
-            ORDER BY id DESC
-            LIMIT ?
-            """,
-            (BASE_CURRENCY, user_id, month, int(limit)),
-        ).fetchall()
-    return rows
+            WHERE user_id=? AND month BETWEEN ? AND ?
+            GROUP BY month, category_id
+        ),
+        by_month AS (
+            SELECT m.month, COALESCE(SUM(c.cents), 0) AS cents, COALESCE(SUM(c.n), 0) AS n
+            FROM months m LEFT JOIN cells c ON c.month = m.month
+            GROUP BY m.month
+        ),
+        by_category AS (
+            SELECT category_id, SUM(cents) AS cents, SUM(n) AS n
+            FROM cells
+            GROUP BY category_id
+        )
+        SELECT * FROM (
+            SELECT 'month' AS kind, month AS label, cents, n,
+                   SUM(cents) OVER (ORDER BY month) AS running,
+                   cents - LAG(cents) OVER (ORDER BY month)
+            FROM by_month
+            UNION ALL
+            SELECT 'category', cat.name, b.cents, b.n,
+                   SUM(b.cents) OVER (ORDER BY b.cents DESC, cat.name),
+                   NULL
+            FROM by_category b JOIN categories cat ON cat.id = b.category_id
+        )
+        ORDER BY kind = 'category', CASE WHEN kind = 'month' THEN label END, running
+        """,
+        (month_from, month_to, user_id, month_from, month_to),
+    )
 
 
-def delete_expense_by_id(user_id: int, expense_id: int) -> bool:
+def compute_spent_between(
+    user_id: int, ts_from: int, ts_to: int
+) -> Tuple[Dict[str, float], float]:
+    """Spent by category in the epoch range [ts_from, ts_to), across month boundaries."""
     conn = db()
-    cur = conn.execute(
-        "DELETE FROM expenses WHERE user_id=? AND id=?",
-        (user_id, int(expense_id)),
+    rows = conn.execute(
+        """
+        SELECT c.name AS category, t.s
+        FROM (
+            SELECT category_id, SUM(base_cents) AS s
+            FROM expenses
+            WHERE user_id=? AND ts>=? AND ts<?
+            GROUP BY category_id
+        ) AS t
+        JOIN categories c ON c.id = t.category_id
+        """,
+        (user_id, int(ts_from), int(ts_to)),
+    ).fetchall()
+    return _spent_from_cents(rows)
+
+
+def compute_planned_between(
+    user_id: int, date_from: date, date_to: date
+) -> Tuple[Dict[str, float], float]:
+    """
+    Planned spend by category for the days date_from..date_to (inclusive):
+    each month's planned amount prorated by the number of its days in range.
+    The plans of all months come from compute_planned_by_month in one go.
+    """
+    n_months = (
+        (date_to.year - date_from.year) * 12 + date_to.month - date_from.month + 1
     )
-    conn.commit()
-    return cur.rowcount > 0
+    months = months_ending(f"{date_to.year:04d}-{date_to.month:02d}", n_months)
+    planned_by_month = compute_planned_by_month(user_id, months)
+
+    planned_by_cat: Dict[str, float] = {}
+    day = date_from
+    for month in months:
+        d = days_in_month(month)
+        last = min(date_to, date(day.year, day.month, d))
+        share = ((last - day).days + 1) / d
+
+        for cat, planned in planned_by_month[month].items():
+            planned_by_cat[cat] = planned_by_cat.get(cat, 0.0) + planned * share
+
+        day = last + timedelta(days=1)
+
+    return planned_by_cat, sum(planned_by_cat.values())
+
+
+def first_expense_day(user_id: int) -> date | None:
+    """Day of the user's earliest expense (None without expenses)."""
+    row = (
+        db()
+        .execute("SELECT MIN(ts) FROM expenses WHERE user_id=?", (user_id,))
+        .fetchone()
+    )
+    return date.fromtimestamp(row[0]) if row[0] is not None else None
 
 
-def delete_last_expense(user_id: int, month: str):
+def _expense_scope(
+    month: str | None, ts_range: Tuple[int, int] | None
+) -> Tuple[list[str], list]:
+    """WHERE terms selecting a month, or an epoch range [from, to) via (user_id, ts)."""
+    if ts_range is not None:
+        return ["ts>=?", "ts<?"], [int(ts_range[0]), int(ts_range[1])]
+    return ["month=?"], [month]
+
+
+def list_expenses_filtered(
+    user_id: int,
+    month: str | None,
+    *,
+    limit: int = 50,
+    category: str | None = None,
+    before_id: int | None = None,
+    after_id: int | None = None,
+    offset: int = 0,
+    ts_range: Tuple[int, int] | None = None,
+) -> list[Expense]:
+    """
+    Returns up to `limit` expenses of `month` (or of `ts_range` when given),
+    newest first.
+
+    Keyset pagination: pass `before_id` to get the page after a row
+    (older expenses) or `after_id` for the page before it (newer expenses).
+    Both are served by the (user_id, month[, category_id]) indexes, which
+    carry the rowid in index order. `offset` is only used to jump to an
+    arbitrary page.
+    """
     conn = db()
+
+    scope_where, scope_params = _expense_scope(month, ts_range)
+    where = ["user_id=?", *scope_where]
+    params: list = [user_id, *scope_params]
+    if category:
+        where.append(f"category_id={_CATEGORY_ID}")
+        params.extend((user_id, category))
+    if before_id is not None:
+        where.append("id<?")
+        params.append(int(before_id))
+    if after_id is not None:
+        where.append("id>?")
+        params.append(int(after_id))
+    params += [int(limit), int(offset)]
+
+    order = "ASC" if after_id is not None else "DESC"
+    rows = fetch_records(
+        conn,
+        Expense,
+        f"""
+        SELECT id, month, {_CATEGORY_NAME} AS category, name, created_at,
+               currency, original_cents, base_cents
+        FROM expenses
+        WHERE {" AND ".join(where)}
+        ORDER BY id {order}
+        LIMIT ? OFFSET ?
+        """,
+        params,
+    )
+
+    if after_id is not None:
+        rows.reverse()
+    return rows
+
+
+def summarize_expenses(
+    user_id: int,
+    month: str | None,
+    *,
+    category: str | None = None,
+    ts_range: Tuple[int, int] | None = None,
+) -> Tuple[int, float]:
+    """Returns (count, total) of the expenses matching the same filter as list_expenses_filtered."""
+    conn = db()
+    scope_where, params = _expense_scope(month, ts_range)
+    where = ["user_id=?", *scope_where]
+    params = [user_id, *params]
+    if category:
+        where.append(f"category_id={_CATEGORY_ID}")
+        params.extend((user_id, category))
     row = conn.execute(
-        """
-        SELECT id, category, name,
-               COALESCE(currency, ?) AS currency,
-               COALESCE(original_amount, COALESCE(chf_amount, amount)) AS original_amount,
-               COALESCE(chf_amount, amount) AS chf_amount
+        f"""
+        SELECT COUNT(*) AS n, SUM(base_cents) AS s
         FROM expenses
-        WHERE user_id=? AND month=?
-        ORDER BY id DESC
-        LIMIT 1
+        WHERE {" AND ".join(where)}
         """,
-        (BASE_CURRENCY, user_id, month),
+        params,
     ).fetchone()
+    return int(row["n"]), from_cents(row["s"])
+
+
+def list_expense_categories(
+    user_id: int, month: str | None, *, ts_range: Tuple[int, int] | None = None
+) -> list[str]:
+    """Distinct categories with expenses in `month` (or `ts_range`)."""
+    conn = db()
+    scope_where, params = _expense_scope(month, ts_range)
+    rows = conn.execute(
+        f"""
+        SELECT c.name AS category
+        FROM categories c
+        WHERE c.id IN (
+            SELECT category_id FROM expenses
+            WHERE user_id=? AND {" AND ".join(scope_where)}
+        )
+        """,
+        (user_id, *params),
+    ).fetchall()
+    return [r["category"] for r in rows]
+
+
+# ---- Full-text search ----
+def build_fts_query(terms: list[str]) -> str:
+    """
+    Turns free-text terms into an FTS5 MATCH expression.
+    Every word must match (as a prefix); FTS5 syntax in the input is neutralised.
+    """
+    words = []
+    for t in terms:
+        for w in t.split():
+            w = w.replace('"', "")
+            if w:
+                words.append(f'"{w}"*')
+    return " ".join(words)
+
+
+def _search_filter(
+    user_id: int, month_from: str | None, month_to: str | None, category: str | None
+) -> Tuple[str, list]:
+    where = ""
+    params: list = []
+    if month_from:
+        where += " AND e.month>=?"
+        params.append(month_from)
+    if month_to:
+        where += " AND e.month<=?"
+        params.append(month_to)
+    if category:
+        where += f" AND e.category_id={_CATEGORY_ID}"
+        params.extend((user_id, category))
+    return where, params
 
-    if not row:
-        return None
 
-    conn.execute("DELETE FROM expenses WHERE id=?", (row["id"],))
+def search_expenses(
+    user_id: int,
+    match: str,
+    *,
+    month_from: str | None = None,
+    month_to: str | None = None,
+    category: str | None = None,
+    limit: int = 10,
+    offset: int = 0,
+) -> list[Expense]:
+    """Expenses matching `match` (see build_fts_query), best bm25 rank first."""
+    conn = db()
+    where, params = _search_filter(user_id, month_from, month_to, category)
+    return fetch_records(
+        conn,
+        Expense,
+        f"""
+        SELECT e.id, e.month, c.name, e.name, e.created_at,
+               e.currency, e.original_cents, e.base_cents
+        FROM expenses_fts f
+        JOIN expenses e ON e.id = f.rowid
+        JOIN categories c ON c.id = e.category_id
+        WHERE expenses_fts MATCH ? AND e.user_id=?{where}
+        ORDER BY bm25(expenses_fts, 2.0, 1.0), e.id DESC
+        LIMIT ? OFFSET ?
+        """,
+        [match, user_id, *params, int(limit), int(offset)],
+    )
+
+
+def summarize_search(
+    user_id: int,
+    match: str,
+    *,
+    month_from: str | None = None,
+    month_to: str | None = None,
+    category: str | None = None,
+) -> Tuple[int, float]:
+    """Returns (count, total) of the expenses matching the same search."""
+    conn = db()
+    where, params = _search_filter(user_id, month_from, month_to, category)
+    row = conn.execute(
+        f"""
+        SELECT COUNT(*) AS n, SUM(e.base_cents) AS s
+        FROM expenses_fts f
+        JOIN expenses e ON e.id = f.rowid
+        WHERE expenses_fts MATCH ? AND e.user_id=?{where}
+        """,
+        [match, user_id, *params],
+    ).fetchone()
+    return int(row["n"]), from_cents(row["s"])
+
+
+def save_search(
+    user_id: int,
+    terms: str,
+    month_from: str | None = None,
+    month_to: str | None = None,
+    category: str | None = None,
+) -> int:
+    """Stores a search so pagination buttons can refer to it by id."""
+    conn = db()
+    key = (user_id, terms, month_from or "", month_to or "", category or "")
+    conn.execute(
+        "INSERT OR IGNORE INTO saved_searches(user_id, terms, month_from, month_to, category) "
+        "VALUES (?, ?, ?, ?, ?)",
+        key,
+    )
     conn.commit()
-    return row
+    row = conn.execute(
+        "SELECT id FROM saved_searches WHERE user_id=? AND terms=? AND month_from=? "
+        "AND month_to=? AND category=?",
+        key,
+    ).fetchone()
+    return int(row["id"])
+
+
+def get_saved_search(user_id: int, search_id: int):
+    """Returns the saved search row (terms, month_from, month_to, category) or None."""
+    conn = db()
+    return conn.execute(
+        "SELECT terms, month_from, month_to, category FROM saved_searches "
+        "WHERE user_id=? AND id=?",
+        (user_id, int(search_id)),
+    ).fetchone()
+
+
+def _delete_expenses_returning(
+    user_id: int, where: list[str], params: list
+) -> list[Expense]:
+    """
+    One DELETE ... RETURNING of the user's expenses in one transaction; the
+    deleted rows come back as Expense records (sorted by id, RETURNING order
+    is unspecified).
+    """
+    conn = db()
+    try:
+        rows = fetch_records(
+            conn,
+            Expense,
+            f"""
+            DELETE FROM expenses
+            WHERE {" AND ".join(where)}
+            RETURNING id, month, {_CATEGORY_NAME}, name, created_at,
+                      currency, original_cents, base_cents
+            """,
+            params,
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    if rows:
+        forget_category_index(user_id)
+    rows.sort(key=lambda r: r.id)
+    return rows
+
+
+def delete_expenses_by_ids(
+    user_id: int,
+    ids: list[int] | None = None,
+    id_ranges: list[Tuple[int, int]] | None = None,
+) -> list[Expense]:
+    """Delete the given ids and inclusive (from, to) id ranges in one statement."""
+    ids = [int(i) for i in ids or []]
+    id_ranges = [(int(a), int(b)) for a, b in id_ranges or []]
+    if not ids and not id_ranges:
+        return []
+
+    terms: list[str] = []
+    params: list = []
+    if ids:
+        terms.append(f"id IN ({','.join('?' * len(ids))})")
+        params.extend(ids)
+    for a, b in id_ranges:
+        terms.append("id BETWEEN ? AND ?")
+        params.extend((min(a, b), max(a, b)))
+
+    return _delete_expenses_returning(
+        user_id, ["user_id=?", f"({' OR '.join(terms)})"], [user_id, *params]
+    )
+
+
+def delete_expenses_in_scope(
+    user_id: int,
+    month: str | None,
+    *,
+    category: str | None = None,
+    ts_range: Tuple[int, int] | None = None,
+) -> list[Expense]:
+    """Delete every expense of `month` (or `ts_range`), optionally one category."""
+    scope, scope_params = _expense_scope(month, ts_range)
+    where = ["user_id=?", *scope]
+    params = [user_id, *scope_params]
+    if category:
+        where.append(f"category_id={_CATEGORY_ID}")
+        params.extend((user_id, category))
+    return _delete_expenses_returning(user_id, where, params)
+
+
+def delete_last_expenses(user_id: int, month: str, n: int = 1) -> list[Expense]:
+    """Delete the `n` most recently added expenses of `month` (returned newest first)."""
+    rows = _delete_expenses_returning(
+        user_id,
+        [
+            """id IN (
+                SELECT id FROM expenses WHERE user_id=? AND month=?
+                ORDER BY id DESC LIMIT ?
+            )"""
+        ],
+        [user_id, month, int(n)],
+    )
+    rows.reverse()
+    return rows
 
 
 def reset_month_expenses(user_id: int, month: str) -> int:
@@ -278,6 +1353,7 @@ def reset_month_expenses(user_id: int, month: str) -> int:
         "DELETE FROM expenses WHERE user_id=? AND month=?", (user_id, month)
     )
     conn.commit()
+    forget_category_index(user_id)
     return cur.rowcount
 
 
@@ -296,7 +1372,81 @@ def reset_all_user_data(user_id: int) -> None:
     conn.execute("DELETE FROM budgets WHERE user_id=?", (user_id,))
     conn.execute("DELETE FROM rules WHERE user_id=?", (user_id,))
     conn.execute("DELETE FROM expenses WHERE user_id=?", (user_id,))
+    conn.execute("DELETE FROM payees WHERE user_id=?", (user_id,))
+    conn.execute("DELETE FROM saved_searches WHERE user_id=?", (user_id,))
+    conn.execute("DELETE FROM recurring_expenses WHERE user_id=?", (user_id,))
+    # Rule-set versions are kept (history), and so are the categories they use
+    conn.execute(
+        """
+        DELETE FROM categories WHERE user_id=? AND id NOT IN (
+            SELECT i.category_id FROM rule_set_items i
+            JOIN rule_sets s ON s.id = i.set_id
+            WHERE s.user_id=?
+        )
+        """,
+        (user_id, user_id),
+    )
     conn.commit()
+    forget_category_index(user_id)
+    forget_category_names(user_id)
+
+
+# ---- Delta export cursor ----
+def get_export_cursor(user_id: int) -> Tuple[int, int]:
+    """Returns (last_expense_id, last_seq) of the last delta export, (0, 0) if none."""
+    conn = db()
+    row = conn.execute(
+        "SELECT last_expense_id, last_seq FROM export_cursors WHERE user_id=?",
+        (user_id,),
+    ).fetchone()
+    if not row:
+        return 0, 0
+    return int(row["last_expense_id"]), int(row["last_seq"])
+
+
+def advance_export_cursor(user_id: int, last_expense_id: int, last_seq: int) -> None:
+    """
+    Moves the delta export high-water mark forward and drops the tombstones
+    it has already delivered.
+    """
+    conn = db()
+    conn.execute(
+        """
+        INSERT INTO export_cursors(user_id, last_expense_id, last_seq, exported_at)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(user_id) DO UPDATE SET
+            last_expense_id=excluded.last_expense_id,
+            last_seq=excluded.last_seq,
+            exported_at=excluded.exported_at
+        """,
+        (
+            user_id,
+            int(last_expense_id),
+            int(last_seq),
+            datetime.now().isoformat(timespec="seconds"),
+        ),
+    )
+    conn.execute(
+        "DELETE FROM expense_tombstones WHERE user_id=? AND seq<=?",
+        (user_id, int(last_seq)),
+    )
+    conn.commit()
+
+
+# ---- FX ----
+async def resolve_fx_rate(currency: str, day: str | None = None) -> Tuple[str, float]:
+    """
+    Returns (fx_date, rate) to convert `currency` into BASE_CURRENCY,
+    using the rate of `day` (YYYY-MM-DD) when given, otherwise today's.
+    """
+    currency = currency.upper()
+    if currency == BASE_CURRENCY:
+        return day or today_key(), 1.0
+    if day is None:
+        fx_date, rate = await get_fx_rate(currency, BASE_CURRENCY)
+    else:
+        fx_date, rate = await get_fx_rate_on(currency, BASE_CURRENCY, day)
+    return str(fx_date), float(rate)
 
 
 # ---- Rule creation with optional FX ----
@@ -309,14 +1459,8 @@ async def add_rule_named_fx(
     period: str = "monthly",
 ):
     """Add a rule with optional FX conversion. Period can be 'daily', 'weekly', 'monthly', or 'yearly'."""
-    currency = currency.upper()
-    if currency == BASE_CURRENCY:
-        fx_date = today_key()
-        rate = 1.0
-        chf = float(amount)
-    else:
-        fx_date, rate = await get_fx_rate(currency, BASE_CURRENCY)
-        chf = float(amount) * float(rate)
+    fx_date, rate = await resolve_fx_rate(currency)
+    chf = float(amount) * rate
 
     add_rule(user_id, category, rule_name, period, chf)
     return fx_date, rate, chf
@@ -327,13 +1471,8 @@ async def add_expense_optional_fx(
     user_id: int, category: str, name: str, amount: float, currency: str, month: str
 ):
     currency = currency.upper()
-    if currency == BASE_CURRENCY:
-        fx_date = today_key()
-        rate = 1.0
-        chf = float(amount)
-    else:
-        fx_date, rate = await get_fx_rate(currency, BASE_CURRENCY)
-        chf = float(amount) * float(rate)
+    fx_date, rate = await resolve_fx_rate(currency)
+    chf = float(amount) * rate
 
     insert_expense(
         user_id,
@@ -349,6 +1488,31 @@ async def add_expense_optional_fx(
     return fx_date, rate, chf
 
 
+async def add_expenses_batch_fx(
+    user_id: int,
+    month: str,
+    items: list[Tuple[str, str, float, str]],
+    rates: Dict[str, Tuple[str, float]],
+) -> list[Tuple[str, float, float]]:
+    """
+    Insert many (category, name, amount, currency) expenses in one transaction.
+    `rates` maps every currency used to its (fx_date, rate), see resolve_fx_rate.
+    Returns (fx_date, rate, converted) per item.
+    """
+    converted = []
+    rows = []
+    for category, name, amount, currency in items:
+        fx_date, rate = rates[currency.upper()]
+        chf = float(amount) * rate
+        converted.append((fx_date, rate, chf))
+        rows.append(
+            (category, name, chf, currency.upper(), float(amount), rate, fx_date)
+        )
+
+    insert_expenses_bulk(user_id, month, rows)
+    return converted
+
+
 # --- Snapshots for rules ---
 def get_last_seen_month(user_id: int) -> str | None:
     conn = db()
@@ -374,37 +1538,39 @@ def set_last_seen_month(user_id: int, month: str) -> None:
 
 def snapshot_rules_for_month_if_missing(user_id: int, month: str) -> bool:
     """
-    Creates rule snapshots for `month` if they don't exist.
+    Points `month` at the version of the current rules if it has none yet.
+    The version is only stored when this exact rule set is new, so months
+    with unchanged rules cost a single pointer row.
     Returns True if snapshot was created, False if already existed (or no rules).
     """
     conn = db()
 
     exists = conn.execute(
-        "SELECT 1 FROM rule_snapshots WHERE user_id=? AND month=? LIMIT 1",
+        "SELECT 1 FROM month_rule_sets WHERE user_id=? AND month=?",
         (user_id, month),
     ).fetchone()
     if exists:
         return False
 
-    rules = conn.execute(
-        "SELECT category, name, period, amount FROM rules WHERE user_id=?",
-        (user_id,),
-    ).fetchall()
-
-    if not rules:
+    items = [
+        tuple(r)
+        for r in conn.execute(
+            "SELECT category_id, name, period, amount FROM rules WHERE user_id=?",
+            (user_id,),
+        )
+    ]
+    if not items:
         return False
 
-    conn.executemany(
-        """
-        INSERT OR IGNORE INTO rule_snapshots(user_id, month, category, name, period, amount)
-        VALUES (?, ?, ?, ?, ?, ?)
-        """,
-        [
-            (user_id, month, r["category"], r["name"], r["period"], float(r["amount"]))
-            for r in rules
-        ],
-    )
-    conn.commit()
+    try:
+        conn.execute(
+            "INSERT OR IGNORE INTO month_rule_sets(user_id, month, set_id) VALUES (?, ?, ?)",
+            (user_id, month, store_rule_set(conn, user_id, items)),
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
     return True
 
 
@@ -432,23 +1598,32 @@ def ensure_rollover_snapshot(
     return created, last
 
 
-def get_rules_for_month(user_id: int, month: str):
+def get_rules_for_month(user_id: int, month: str) -> tuple[list[RuleSnapshot], bool]:
     """
     Returns (rows, used_snapshot: bool)
-    rows are dict-like rows with: category, name, period, amount
+    rows are RuleSnapshot records with: category, name, period, amount
     """
     conn = db()
-    snap = conn.execute(
-        "SELECT category, name, period, amount FROM rule_snapshots WHERE user_id=? AND month=?",
+    snap = fetch_records(
+        conn,
+        RuleSnapshot,
+        f"""
+        SELECT {_CATEGORY_NAME}, i.name, i.period, i.amount
+        FROM month_rule_sets m
+        JOIN rule_set_items i ON i.set_id = m.set_id
+        WHERE m.user_id=? AND m.month=?
+        """,
         (user_id, month),
-    ).fetchall()
+    )
 
     if snap:
         return snap, True
 
     # fallback to current rules if no snapshot exists
-    rules = conn.execute(
-        "SELECT category, name, period, amount FROM rules WHERE user_id=?",
+    rules = fetch_records(
+        conn,
+        RuleSnapshot,
+        f"SELECT {_CATEGORY_NAME}, name, period, amount FROM rules WHERE user_id=?",
         (user_id,),
-    ).fetchall()
+    )
     return rules, False
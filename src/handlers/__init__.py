@@ -1,5 +1,15 @@
 from .commands.setup import start, help_command
-from .commands.report import status, categories
+from .commands.report import (
+    status,
+    categories,
+    trend,
+    year,
+    forecast,
+    heatmap,
+    top,
+)
+from .commands.charts import chart
+from .commands.categories import renamecategory
 from .commands.rules import (
     rules,
     delrule,
@@ -9,6 +19,9 @@ from .commands.rules import (
     setyearly,
     setbudget,
 )
-from .commands.expenses import expenses, delexpense, undo, add
+from .commands.expenses import expenses, delexpense, undo, add, add_category_choice
+from .commands.search import search
+from .commands.recurring import recurring, delrecurring
 from .commands.export import export, backupdb
+from .commands.importer import import_command, import_document
 from .commands.reset import resetmonth, resetall
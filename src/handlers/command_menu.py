@@ -31,11 +31,22 @@ def _get_command_descriptions() -> dict[str, str]:
         "delrule": "🗑️ Delete a spending rule",
         "status": "📈 View budget summary & spending",
         "categories": "🏷️ List all expense categories",
+        "trend": "📉 Spending trend over recent months",
+        "year": "📆 Year in review",
+        "forecast": "🔮 Month-end spending forecast",
+        "heatmap": "🕒 When you spend (weekday × hour)",
+        "top": "🏪 Top payees by spend",
+        "chart": "🖼️ Spending chart (by category or vs plan)",
+        "renamecategory": "✏️ Rename or merge a category",
         "add": "➕ Record a new expense",
         "undo": "↩️ Undo the last expense",
         "expenses": "📝 List expenses by category",
         "delexpense": "❌ Delete an expense",
-        "export": "📥 Export expenses, rules, or budgets",
+        "search": "🔎 Search expenses by name or category",
+        "recurring": "🔁 List or add recurring expenses",
+        "delrecurring": "🗑️ Delete a recurring expense",
+        "export": "📥 Export expenses, rules, budgets, or a report",
+        "import": "📤 Import expenses from a CSV file",
         "backupdb": "💾 Backup your database",
         "resetmonth": "🔄 Clear current month data",
         "resetall": "⚠️ Delete all data",
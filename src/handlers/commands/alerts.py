@@ -1,9 +1,12 @@
 from dataclasses import dataclass
-from typing import Dict, Tuple
+from typing import Dict
 from pathlib import Path
 import yaml
 
 from config import BASE_CURRENCY
+from db.records import CategoryStats
+from utils.anomalies import find_anomalies
+from utils.budget import summarize_budget
 
 # Load messages from YAML file
 _current_dir = Path(__file__).parent
@@ -17,43 +20,6 @@ class AlertResult:
     messages: list[str]
 
 
-def compute_overspend_total(
-    planned_by_cat: Dict[str, float], spent_by_cat: Dict[str, float]
-) -> float:
-    all_cats = set(planned_by_cat.keys()) | set(spent_by_cat.keys())
-    total = 0.0
-    for c in all_cats:
-        p = planned_by_cat.get(c, 0.0)
-        s = spent_by_cat.get(c, 0.0)
-        total += max(0.0, s - p)
-    return total
-
-
-def compute_unplanned_spend(
-    planned_by_cat: Dict[str, float], spent_by_cat: Dict[str, float]
-) -> float:
-    total = 0.0
-    for c, s in spent_by_cat.items():
-        if planned_by_cat.get(c, 0.0) == 0.0:
-            total += s
-    return total
-
-
-def compute_remaining_overall(
-    budget: float,
-    planned_total: float,
-    planned_by_cat: Dict[str, float],
-    spent_by_cat: Dict[str, float],
-) -> Tuple[float, float]:
-    """
-    Returns (remaining_overall, overspend_total)
-    remaining = budget - planned_total - Σ max(0, spent_c - planned_c)
-    """
-    overspend_total = compute_overspend_total(planned_by_cat, spent_by_cat)
-    remaining = budget - planned_total - overspend_total
-    return remaining, overspend_total
-
-
 def check_alerts_after_add(
     *,
     category: str,
@@ -61,45 +27,97 @@ def check_alerts_after_add(
     prev_spent_by_cat: Dict[str, float],
     new_spent_by_cat: Dict[str, float],
     budget: float | None,
-    planned_total: float,
     new_planned_by_cat: Dict[str, float],
+    prev_projected: float | None = None,
+    new_projected: float | None = None,
+    amount: float | None = None,
+    prev_stats: Dict[str, CategoryStats] | None = None,
 ) -> AlertResult:
     """
     Alerts:
     - Category exceeded (crossing from >=0 to <0 for that category remaining)
     - Overall remaining became negative (crossing)
     - Optional: warn when overall remaining drops below 10% of budget
+    - Projected month-end spend crosses the budget (if projections are given)
+    - Unusually large expense for its category (if amount and stats are given)
+    """
+    return check_alerts_after_batch(
+        categories=[category],
+        prev_planned_by_cat=prev_planned_by_cat,
+        prev_spent_by_cat=prev_spent_by_cat,
+        new_spent_by_cat=new_spent_by_cat,
+        budget=budget,
+        new_planned_by_cat=new_planned_by_cat,
+        prev_projected=prev_projected,
+        new_projected=new_projected,
+        amounts=None if amount is None else [amount],
+        prev_stats=prev_stats,
+    )
+
+
+def check_alerts_after_batch(
+    *,
+    categories: list[str],
+    prev_planned_by_cat: Dict[str, float],
+    prev_spent_by_cat: Dict[str, float],
+    new_spent_by_cat: Dict[str, float],
+    budget: float | None,
+    new_planned_by_cat: Dict[str, float],
+    prev_projected: float | None = None,
+    new_projected: float | None = None,
+    amounts: list[float] | None = None,
+    prev_stats: Dict[str, CategoryStats] | None = None,
+) -> AlertResult:
+    """
+    Same alerts as check_alerts_after_add, evaluated once for several added
+    expenses: one category check per touched category, one overall check.
+    `amounts` (BASE_CURRENCY) line up with `categories`.
     """
     msgs: list[str] = []
 
-    # CATEGORY alert
-    p = prev_planned_by_cat.get(category, 0.0)
-    s_prev = prev_spent_by_cat.get(category, 0.0)
-    s_new = new_spent_by_cat.get(category, 0.0)
-
-    prev_remaining_cat = p - s_prev
-    new_remaining_cat = p - s_new
-
-    # Only alert category exceeded if the category is planned (p > 0)
-    if p > 0 and prev_remaining_cat >= 0 and new_remaining_cat < 0:
-        msgs.append(
-            MESSAGES["category_exceeded"].format(
-                category=category,
-                planned=p,
-                spent=s_new,
-                overspend=abs(new_remaining_cat),
-                currency=BASE_CURRENCY,
+    # UNUSUAL expenses, against the category statistics before the add
+    if amounts is not None and prev_stats:
+        for i, z in find_anomalies(prev_stats, list(zip(categories, amounts))):
+            stats = prev_stats[categories[i]]
+            msgs.append(
+                MESSAGES["unusual_expense"].format(
+                    category=categories[i],
+                    amount=amounts[i],
+                    sigma=z,
+                    mean=stats.mean,
+                    currency=BASE_CURRENCY,
+                )
+            )
+
+    # CATEGORY alerts
+    for category in dict.fromkeys(categories):
+        p = prev_planned_by_cat.get(category, 0.0)
+        s_prev = prev_spent_by_cat.get(category, 0.0)
+        s_new = new_spent_by_cat.get(category, 0.0)
+
+        prev_remaining_cat = p - s_prev
+        new_remaining_cat = p - s_new
+
+        # Only alert category exceeded if the category is planned (p > 0)
+        if p > 0 and prev_remaining_cat >= 0 and new_remaining_cat < 0:
+            msgs.append(
+                MESSAGES["category_exceeded"].format(
+                    category=category,
+                    planned=p,
+                    spent=s_new,
+                    overspend=abs(new_remaining_cat),
+                    currency=BASE_CURRENCY,
+                )
             )
-        )
 
     # OVERALL alerts (only if a budget exists)
     if budget is not None:
-        prev_overall, _ = compute_remaining_overall(
-            budget, planned_total, prev_planned_by_cat, prev_spent_by_cat
-        )
-        new_overall, _ = compute_remaining_overall(
-            budget, planned_total, new_planned_by_cat, new_spent_by_cat
-        )
+        prev_overall = summarize_budget(
+            prev_planned_by_cat, prev_spent_by_cat, budget
+        ).metrics.remaining_overall
+        new_overall = summarize_budget(
+            new_planned_by_cat, new_spent_by_cat, budget
+        ).metrics.remaining_overall
 
         if prev_overall >= 0 and new_overall < 0:
             msgs.append(
@@ -124,4 +142,18 @@ def check_alerts_after_add(
                     )
                 )
 
+        # Early warning: the month-end projection now crosses the budget
+        if (
+            prev_projected is not None
+            and new_projected is not None
+            and prev_projected <= budget < new_projected
+        ):
+            msgs.append(
+                MESSAGES["forecast_budget_warning"].format(
+                    projected=new_projected,
+                    over=new_projected - budget,
+                    currency=BASE_CURRENCY,
+                )
+            )
+
     return AlertResult(messages=msgs)
@@ -29,11 +29,13 @@ async def reply(
     *,
     parse_mode: str | None = None,
     reply_markup=None,
+    quote: bool | None = None,
 ):
+    """`quote` replies to the command message (to the chat when there is none)."""
     chat = update.effective_chat
     if update.message is not None:
         return await update.message.reply_text(
-            text, parse_mode=parse_mode, reply_markup=reply_markup
+            text, parse_mode=parse_mode, reply_markup=reply_markup, do_quote=quote
         )
     if chat is not None:
         return await context.bot.send_message(
@@ -67,6 +69,24 @@ async def reply_doc(
     return None
 
 
+async def reply_photo(
+    update: Update,
+    context: ContextTypes.DEFAULT_TYPE,
+    photo,
+    *,
+    caption: str | None = None,
+):
+    """`photo` is image bytes/file or the file_id of a photo Telegram already has."""
+    chat = update.effective_chat
+    if update.message is not None:
+        return await update.message.reply_photo(photo=photo, caption=caption)
+    if chat is not None:
+        return await context.bot.send_photo(
+            chat_id=chat.id, photo=photo, caption=caption
+        )
+    return None
+
+
 def _rollover_common(*, notify: bool):
     def decorator(fn):
         @wraps(fn)
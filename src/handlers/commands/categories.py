@@ -0,0 +1,61 @@
+from .base import *
+from db.services import get_category_id, merge_categories, rename_category
+from utils.validators import validate_category, CategoryValidationError
+
+# Load messages from YAML file using relative path
+_current_dir = Path(__file__).parent
+_messages_path = _current_dir / "messages" / "categories.yaml"
+_error_messages_path = _current_dir / "messages" / "errors.yaml"
+with open(_messages_path, "r") as file:
+    MESSAGES = yaml.safe_load(file)
+with open(_error_messages_path, "r") as file:
+    ERROR_MESSAGES = yaml.safe_load(file)
+
+
+@rollover_notify
+async def renamecategory(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    /renamecategory "Old name" "New name"
+
+    Renames the category in expenses, rules, rule history and recurring
+    expenses. If "New name" already exists, the two categories are merged.
+
+    Examples:
+      /renamecategory Food "Food & Drinks"
+      /renamecategory Taxi Travel
+    """
+    user_id = update.effective_user.id
+    args = get_args(update)
+
+    if len(args) != 2:
+        return await reply(update, context, MESSAGES["usage_renamecategory"])
+
+    old, new = args[0].strip(), args[1]
+    try:
+        new = validate_category(new)
+    except CategoryValidationError as e:
+        return await reply(
+            update,
+            context,
+            ERROR_MESSAGES.get(e.message, MESSAGES["usage_renamecategory"]),
+        )
+
+    source_id = get_category_id(user_id, old)
+    if source_id is None:
+        return await reply(
+            update, context, MESSAGES["category_not_found"].format(category=old)
+        )
+
+    target_id = get_category_id(user_id, new)
+    if target_id is None or target_id == source_id:
+        rename_category(user_id, source_id, new)
+        return await reply(
+            update, context, MESSAGES["category_renamed"].format(old=old, new=new)
+        )
+
+    moved = merge_categories(user_id, source_id, target_id)
+    await reply(
+        update,
+        context,
+        MESSAGES["category_merged"].format(old=old, new=new, count=moved),
+    )
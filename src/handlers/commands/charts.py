@@ -0,0 +1,156 @@
+from .base import *
+from itertools import accumulate
+from telegram.error import TelegramError
+from db.services import (
+    compute_planned_monthly_from_rules,
+    compute_spent_by_day,
+    compute_spent_this_month,
+    days_in_month,
+    get_data_version,
+    get_month_budget,
+)
+from utils.budget import summarize_budget
+from utils.charts import draw_breakdown, draw_spend_curve, render_chart
+from utils.fx import BoundedLRUCache
+from datetime import date
+
+
+# Load messages from YAML file using relative path
+_current_dir = Path(__file__).parent
+_messages_path = _current_dir / "messages" / "charts.yaml"
+with open(_messages_path, "r") as file:
+    MESSAGES = yaml.safe_load(file)
+
+CHART_TOP_N = 15
+CHART_CACHE_SIZE = 256
+
+# Sent charts: (user, kind, month, data version, day) -> (Telegram file_id, caption).
+# Resending by file_id costs neither rendering nor an upload.
+_CHART_CACHE = BoundedLRUCache(max_size=CHART_CACHE_SIZE)
+
+
+def _is_month_token(t: str) -> bool:
+    return len(t) == 7 and t[4] == "-" and t[:4].isdigit() and t[5:].isdigit()
+
+
+@rollover_silent
+async def chart(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    /chart [YYYY-MM] [trend]
+    Examples:
+      /chart              -> spend per category, current month
+      /chart 2025-12
+      /chart trend        -> cumulative spend vs plan by day, current month
+      /chart trend 2025-12
+    """
+    user_id = update.effective_user.id
+    args = [a.lower() for a in get_args(update)]
+
+    m = month_key()
+    kind = "breakdown"
+    for a in args:
+        if a == "trend":
+            kind = "trend"
+        elif _is_month_token(a):
+            m = a
+        else:
+            return await reply(update, context, MESSAGES["usage_chart"])
+
+    current = month_key()
+    if m > current:
+        return await reply(update, context, MESSAGES["chart_no_data"].format(month=m))
+
+    # The current month's curve grows with the date even without new data
+    key = (
+        user_id,
+        kind,
+        m,
+        get_data_version(user_id, m),
+        date.today() if kind == "trend" and m == current else None,
+    )
+    cached = _CHART_CACHE.get(key)
+    if cached is not None:
+        file_id, caption = cached
+        try:
+            return await reply_photo(update, context, file_id, caption=caption)
+        except TelegramError:
+            # e.g. the file is no longer available; render and upload it again
+            pass
+
+    if kind == "trend":
+        rendered = await _spend_curve(user_id, m, current)
+    else:
+        rendered = await _breakdown(user_id, m)
+    if rendered is None:
+        return await reply(update, context, MESSAGES["chart_no_data"].format(month=m))
+
+    png, caption = rendered
+    sent = await reply_photo(update, context, png, caption=caption)
+    if sent is not None and sent.photo:
+        _CHART_CACHE.put(key, (sent.photo[-1].file_id, caption))
+
+
+async def _breakdown(user_id: int, m: str) -> tuple[bytes, str] | None:
+    """Spend per category, largest overspend first, the tail folded into one bar."""
+    planned_by_cat, _ = compute_planned_monthly_from_rules(user_id, m)
+    spent_by_cat, _ = compute_spent_this_month(user_id, m)
+    summary = summarize_budget(planned_by_cat, spent_by_cat)
+    if not summary.categories:
+        return None
+
+    lines = summary.lines()
+    categories = [line.category for line in lines[:CHART_TOP_N]]
+    planned = [line.planned for line in lines[:CHART_TOP_N]]
+    spent = [line.spent for line in lines[:CHART_TOP_N]]
+    rest = lines[CHART_TOP_N:]
+    if rest:
+        categories.append(MESSAGES["chart_other"].format(count=len(rest)))
+        planned.append(sum(line.planned for line in rest))
+        spent.append(sum(line.spent for line in rest))
+
+    metrics = summary.metrics
+    png = await render_chart(
+        draw_breakdown,
+        MESSAGES["chart_breakdown_title"].format(month=m),
+        categories,
+        planned,
+        spent,
+        BASE_CURRENCY,
+    )
+    caption = MESSAGES["chart_breakdown_caption"].format(
+        month=m,
+        spent=metrics.spent_total,
+        planned=metrics.planned_total,
+        currency=BASE_CURRENCY,
+    )
+    return png, caption
+
+
+async def _spend_curve(user_id: int, m: str, current: str) -> tuple[bytes, str] | None:
+    """Cumulative spend per day against the plan prorated over the month."""
+    _, planned_total = compute_planned_monthly_from_rules(user_id, m)
+    spent_by_day = compute_spent_by_day(user_id, m)
+    if planned_total <= 0 and not spent_by_day:
+        return None
+
+    days = days_in_month(m)
+    elapsed = date.today().day if m == current else days
+    spent = list(accumulate(spent_by_day.get(d, 0.0) for d in range(1, elapsed + 1)))
+    allowance = [planned_total * d / days for d in range(1, days + 1)]
+
+    png = await render_chart(
+        draw_spend_curve,
+        MESSAGES["chart_trend_title"].format(month=m),
+        spent,
+        allowance,
+        get_month_budget(user_id, m),
+        BASE_CURRENCY,
+    )
+    caption = MESSAGES["chart_trend_caption"].format(
+        day=elapsed,
+        days=days,
+        spent=spent[-1],
+        allowance=allowance[elapsed - 1],
+        currency=BASE_CURRENCY,
+    )
+    return png, caption
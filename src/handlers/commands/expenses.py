@@ -1,24 +1,37 @@
 from .base import *
+import re
+from typing import Dict
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.helpers import escape_markdown
 from db.services import (
     add_expense_optional_fx,
+    add_expenses_batch_fx,
     compute_planned_monthly_from_rules,
     compute_spent_this_month,
-    delete_last_expense,
+    delete_last_expenses,
+    delete_expenses_by_ids,
+    delete_expenses_in_scope,
     ensure_month_budget,
+    get_category_stats,
     parse_amount,
+    resolve_fx_rate,
     looks_like_currency,
     month_key,
-    list_expenses_filtered,
-    delete_expense_by_id,
+    parse_day_range,
+    ts_range_for_days,
 )
-from ..pagination_callbacks import _format_expenses_page
+from ..pagination_callbacks import render_expenses_page, expenses_cursor
 from utils.fx import (
     InvalidCurrencyError,
     CurrencyFormatError,
     CurrencyNotSupportedError,
 )
-from .alerts import check_alerts_after_add
+from .alerts import check_alerts_after_add, check_alerts_after_batch
+from utils.categorize import UNCATEGORIZED, predict_category
+from utils.category_match import category_typo
+from utils.forecast import forecast_month
 from utils.validators import (
+    parse_quoted_line,
     validate_amount,
     validate_category,
     validate_name,
@@ -26,8 +39,6 @@ from utils.validators import (
     CategoryValidationError,
     NameValidationError,
 )
-from utils.pagination import PaginationState
-from telegram import InlineKeyboardMarkup, InlineKeyboardButton
 
 
 # Load messages from YAML file using relative path
@@ -40,32 +51,38 @@ with open(_error_messages_path, "r") as file:
     ERROR_MESSAGES = yaml.safe_load(file)
 
 
+UNDO_MAX = 100  # most expenses a single /undo may remove
+DELETED_ROWS_SHOWN = 20  # deleted expenses listed in a reply
+
+_ID_RANGE = re.compile(r"\d+-\d+")
+
+# "Did you mean" buttons: add the quoted /add message with the typos fixed or kept
+ADD_CALLBACK_PREFIX = "addcat"
+FIX_TYPOS = "fix"
+KEEP_TYPOS = "keep"
+
+
 def _is_month_token(t: str) -> bool:
     return len(t) == 7 and t[4] == "-" and t[:4].isdigit() and t[5:].isdigit()
 
 
-@rollover_notify
-async def add(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """
-    /add <name> <amount> [currency]
-    /add <category> <name> <amount> [currency]
+class AddParseError(Exception):
+    """Raised when an expense line can't be parsed; carries the reply text."""
 
-    Examples (no category - uses "Uncategorized"):
-      /add Groceries 62.40
-      /add "Taxi to airport" 20 EUR
+    def __init__(self, message: str):
+        self.message = message
+        super().__init__(message)
 
-    Examples (with category):
-      /add Food Groceries 62.40
-      /add "Food & Drinks" "Taxi to airport" 20 EUR
+
+def _parse_expense_args(args: list[str]) -> tuple[str | None, str, float, str]:
     """
-    user_id = update.effective_user.id
-    text = update.message.text if update.message else ""
-    args = parse_quoted_args(text)
+    Parse one expense from /add arguments.
 
+    Returns (category, name, amount, currency), category None when the line
+    has none; raises AddParseError.
+    """
     if len(args) < 2:
-        return await reply(update, context, MESSAGES["usage_add"])
-
-    m = month_key()
+        raise AddParseError(MESSAGES["usage_add"])
 
     # Try to parse as: name amount [currency]
     # If it looks like (name, amount), assume no category
@@ -75,13 +92,15 @@ async def add(update: Update, context: ContextTypes.DEFAULT_TYPE):
     name = None
     amount = None
     currency = BASE_CURRENCY
+    no_category = False
 
     # Check if we have 2 args: likely "name amount" with no category
     if len(args) == 2:
         try:
             amount = parse_amount(args[1])
             name = args[0].strip()
-            category = "Uncategorized"
+            category = UNCATEGORIZED
+            no_category = True
         except Exception:
             # Not a valid amount, might be something else
             pass
@@ -94,7 +113,8 @@ async def add(update: Update, context: ContextTypes.DEFAULT_TYPE):
             currency_candidate = args[2].strip().upper()
             if looks_like_currency(currency_candidate):
                 name = args[0].strip()
-                category = "Uncategorized"
+                category = UNCATEGORIZED
+                no_category = True
                 currency = currency_candidate
         except Exception:
             pass
@@ -117,24 +137,21 @@ async def add(update: Update, context: ContextTypes.DEFAULT_TYPE):
             category = args[0].strip()
             name = " ".join(args[1:-1]).strip()
         except Exception:
-            if len(args) < 4:
-                return await reply(update, context, MESSAGES["usage_add"])
-
             currency = args[-1].strip().upper()
             if not looks_like_currency(currency):
-                return await reply(update, context, MESSAGES["currency_error"])
+                raise AddParseError(MESSAGES["currency_error"])
 
             try:
                 amount = parse_amount(args[-2])
             except Exception:
-                return await reply(update, context, MESSAGES["amount_parse_error"])
+                raise AddParseError(MESSAGES["amount_parse_error"])
 
             category = args[0].strip()
             name = " ".join(args[1:-2]).strip()
 
     # Final validation
     if category is None or name is None or amount is None:
-        return await reply(update, context, MESSAGES["usage_add"])
+        raise AddParseError(MESSAGES["usage_add"])
 
     name = name or "(no name)"
 
@@ -145,34 +162,214 @@ async def add(update: Update, context: ContextTypes.DEFAULT_TYPE):
         if name != "(no name)":
             name = validate_name(name, field_name="name")
     except AmountValidationError as e:
-        return await reply(
-            update,
-            context,
+        raise AddParseError(
             ERROR_MESSAGES.get(
                 e.message, MESSAGES.get("amount_parse_error", "Invalid amount")
-            ),
+            )
         )
     except CategoryValidationError as e:
-        return await reply(
-            update,
-            context,
+        raise AddParseError(
             ERROR_MESSAGES.get(
                 e.message, MESSAGES.get("invalid_input", "Invalid category")
-            ),
+            )
         )
     except NameValidationError as e:
-        return await reply(
-            update,
-            context,
-            ERROR_MESSAGES.get(
-                e.message, MESSAGES.get("invalid_input", "Invalid name")
-            ),
+        raise AddParseError(
+            ERROR_MESSAGES.get(e.message, MESSAGES.get("invalid_input", "Invalid name"))
         )
 
+    return (None if no_category else category), name, amount, currency
+
+
+def _categorize(user_id: int, category: str | None, name: str) -> tuple[str, bool]:
+    """
+    Fills in a missing category from the user's earlier expenses with the same
+    or a similar name. Returns (category, guessed).
+    """
+    if category is not None:
+        return category, False
+    predicted = predict_category(user_id, name)
+    if predicted is None:
+        return UNCATEGORIZED, False
+    return predicted, True
+
+
+def _category_typos(user_id: int, categories) -> Dict[str, str]:
+    """
+    Typed categories the user doesn't have yet -> the existing category each
+    one probably misspells ("Fodo" -> "Food").
+    """
+    typos = {}
+    for category in dict.fromkeys(c for c in categories if c is not None):
+        match = category_typo(user_id, category)
+        if match is not None:
+            typos[category] = match
+    return typos
+
+
+async def _ask_category(
+    update: Update, context: ContextTypes.DEFAULT_TYPE, typos: Dict[str, str]
+):
+    """
+    Asks before /add creates categories that look like typos of existing ones.
+    Nothing is added yet; the buttons re-run the quoted /add message.
+    """
+    if len(typos) == 1:
+        ((typed, match),) = typos.items()
+        fix_label = MESSAGES["typo_fix_one"].format(match=match)
+        keep_label = MESSAGES["typo_keep_one"].format(typed=typed)
+    else:
+        fix_label, keep_label = MESSAGES["typo_fix"], MESSAGES["typo_keep"]
+    markup = InlineKeyboardMarkup(
+        [
+            [
+                InlineKeyboardButton(
+                    fix_label, callback_data=f"{ADD_CALLBACK_PREFIX}:{FIX_TYPOS}"
+                )
+            ],
+            [
+                InlineKeyboardButton(
+                    keep_label, callback_data=f"{ADD_CALLBACK_PREFIX}:{KEEP_TYPOS}"
+                )
+            ],
+        ]
+    )
+    lines = [
+        MESSAGES["typo_line"].format(typed=typed, match=match)
+        for typed, match in typos.items()
+    ]
+    await reply(
+        update,
+        context,
+        MESSAGES["typo_prompt"].format(typos="\n".join(lines)),
+        reply_markup=markup,
+        quote=True,
+    )
+
+
+def _split_expense_lines(text: str) -> list[list[str] | None]:
+    """
+    Split an /add message into one argument list per expense line.
+
+    The first line holds the command (and optionally the first expense);
+    every following non-empty line is an expense. Lines with unbalanced
+    quotes come back as None.
+    """
+    first, *rest = (text or "").split("\n")
+    lines: list[list[str] | None] = []
+
+    try:
+        first_args = parse_quoted_args(first)
+    except ValueError:
+        first_args = None
+    if first_args != [] or not rest:
+        lines.append(first_args)
+
+    for line in rest:
+        if not line.strip():
+            continue
+        try:
+            lines.append(parse_quoted_line(line))
+        except ValueError:
+            lines.append(None)
+    return lines
+
+
+@rollover_notify
+async def add(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    /add <name> <amount> [currency]
+    /add <category> <name> <amount> [currency]
+
+    Examples (no category - guessed from earlier expenses, else "Uncategorized"):
+      /add Groceries 62.40
+      /add "Taxi to airport" 20 EUR
+
+    Examples (with category):
+      /add Food Groceries 62.40
+      /add "Food & Drinks" "Taxi to airport" 20 EUR
+
+    Several expenses at once, one per line:
+      /add
+      Food Groceries 62.40
+      "Taxi to airport" 20 EUR
+    """
+    user_id = update.effective_user.id
+    text = update.message.text if update.message else ""
+    await _add_text(update, context, user_id, text)
+
+
+@rollover_notify
+async def add_category_choice(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    A button of the "did you mean" prompt: adds the /add message the prompt
+    quotes, with the suspected typos replaced by the existing categories or
+    kept as new categories.
+    """
+    query = update.callback_query
+    user_id = update.effective_user.id
+    choice = query.data.partition(":")[2]
+    original = getattr(query.message, "reply_to_message", None)
+    if (
+        choice not in (FIX_TYPOS, KEEP_TYPOS)
+        or original is None
+        or original.from_user is None
+        or original.from_user.id != user_id
+    ):
+        await query.answer(MESSAGES["typo_expired"])
+        return
+
+    await query.answer()
+    # Remove the buttons first so the expenses can't be added twice
+    await query.edit_message_reply_markup(reply_markup=None)
+    await _add_text(update, context, user_id, original.text or "", choice)
+
+
+async def _add_text(
+    update: Update,
+    context: ContextTypes.DEFAULT_TYPE,
+    user_id: int,
+    text: str,
+    typo_choice: str | None = None,
+):
+    """
+    Adds the expenses of an /add message. Categories that look like typos of
+    existing ones are asked about first unless `typo_choice` says what to do.
+    """
+    lines = _split_expense_lines(text)
+
+    if len(lines) > 1:
+        return await _add_batch(update, context, user_id, lines, typo_choice)
+
+    args = lines[0] if lines else None
+    if not args or len(args) < 2:
+        return await reply(update, context, MESSAGES["usage_add"])
+
+    m = month_key()
+
+    try:
+        category, name, amount, currency = _parse_expense_args(args)
+    except AddParseError as e:
+        return await reply(update, context, e.message)
+
+    typos = _category_typos(user_id, [category])
+    if typos:
+        if typo_choice is None:
+            return await _ask_category(update, context, typos)
+        if typo_choice == FIX_TYPOS:
+            category = typos[category]
+    category, guessed = _categorize(user_id, category, name)
+
     # BEFORE insert: baseline for alert crossings
     planned_by_cat, planned_total = compute_planned_monthly_from_rules(user_id, m)
     overall_budget, carried, carried_from = ensure_month_budget(user_id, m)
     prev_spent_by_cat, prev_spent_total = compute_spent_this_month(user_id, m)
+    prev_forecast = (
+        forecast_month(user_id, m, overall_budget)
+        if overall_budget is not None
+        else None
+    )
+    prev_stats = get_category_stats(user_id, [category])
 
     # ✅ Determine unplanned/new category BEFORE insert
     has_plan = planned_by_cat.get(category, 0.0) > 0.0
@@ -196,6 +393,11 @@ async def add(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     # AFTER insert: recompute spent
     new_spent_by_cat, new_spent_total = compute_spent_this_month(user_id, m)
+    new_forecast = (
+        forecast_month(user_id, m, overall_budget)
+        if prev_forecast is not None
+        else None
+    )
 
     # Alerts
     alert_result = check_alerts_after_add(
@@ -204,34 +406,32 @@ async def add(update: Update, context: ContextTypes.DEFAULT_TYPE):
         prev_spent_by_cat=prev_spent_by_cat,
         new_spent_by_cat=new_spent_by_cat,
         budget=overall_budget,
-        planned_total=planned_total,
         new_planned_by_cat=planned_by_cat,  # planned doesn't change on add
+        prev_projected=prev_forecast and prev_forecast.projected_total,
+        new_projected=new_forecast and new_forecast.projected_total,
+        amount=chf_amount,
+        prev_stats=prev_stats,
     )
 
     # Confirmation
     if currency == BASE_CURRENCY:
-        await reply(
-            update,
-            context,
-            MESSAGES["add_success_base"].format(
-                category=category, name=name, amount=chf_amount, currency=BASE_CURRENCY
-            ),
+        confirmation = MESSAGES["add_success_base"].format(
+            category=category, name=name, amount=chf_amount, currency=BASE_CURRENCY
         )
     else:
-        await reply(
-            update,
-            context,
-            MESSAGES["add_success_fx"].format(
-                category=category,
-                name=name,
-                amount=amount,
-                currency=currency,
-                converted=chf_amount,
-                base_currency=BASE_CURRENCY,
-                rate=rate,
-                fx_date=fx_date,
-            ),
+        confirmation = MESSAGES["add_success_fx"].format(
+            category=category,
+            name=name,
+            amount=amount,
+            currency=currency,
+            converted=chf_amount,
+            base_currency=BASE_CURRENCY,
+            rate=rate,
+            fx_date=fx_date,
         )
+    if guessed:
+        confirmation = confirmation.rstrip("\n") + "\n" + MESSAGES["category_guessed"]
+    await reply(update, context, confirmation)
 
     # ✅ Inform about new unplanned category (instead of "category exceeded")
     if is_new_unplanned_category:
@@ -247,30 +447,231 @@ async def add(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await reply(update, context, msg, parse_mode="Markdown")
 
 
+async def _add_batch(
+    update: Update,
+    context: ContextTypes.DEFAULT_TYPE,
+    user_id: int,
+    lines: list[list[str] | None],
+    typo_choice: str | None = None,
+):
+    """
+    Add one expense per line in a single transaction.
+
+    Every line is parsed first; if any line fails nothing is inserted.
+    Each distinct currency is converted once, alerts are evaluated once on
+    the final state and everything is answered in one reply.
+    """
+    parsed: list[tuple[str | None, str, float, str]] = []
+    errors: list[str] = []
+    for n, args in enumerate(lines, start=1):
+        if args is None:
+            errors.append(MESSAGES["batch_line_unparsed"].format(line=n))
+            continue
+        try:
+            parsed.append(_parse_expense_args(args))
+        except AddParseError as e:
+            error = e.message
+            if error == MESSAGES["usage_add"]:
+                error = MESSAGES["batch_line_usage"]
+            errors.append(MESSAGES["batch_line_error"].format(line=n, error=error))
+
+    if errors:
+        return await reply(
+            update,
+            context,
+            MESSAGES["batch_failed"].format(errors="\n".join(errors)),
+        )
+
+    typos = _category_typos(user_id, (category for category, _, _, _ in parsed))
+    if typos and typo_choice is None:
+        return await _ask_category(update, context, typos)
+    fixes = typos if typo_choice == FIX_TYPOS else {}
+
+    items: list[tuple[str, str, float, str]] = []
+    guessed: list[bool] = []
+    for category, name, amount, currency in parsed:
+        category, was_guessed = _categorize(
+            user_id, fixes.get(category, category), name
+        )
+        items.append((category, name, amount, currency))
+        guessed.append(was_guessed)
+
+    m = month_key()
+
+    # One FX lookup per distinct currency
+    rates: dict[str, tuple[str, float]] = {}
+    try:
+        for currency in dict.fromkeys(c.upper() for _, _, _, c in items):
+            rates[currency] = await resolve_fx_rate(currency)
+    except CurrencyFormatError:
+        return await reply(update, context, MESSAGES["currency_error"])
+    except CurrencyNotSupportedError:
+        return await reply(update, context, MESSAGES["currency_not_supported"])
+    except InvalidCurrencyError:
+        return await reply(update, context, MESSAGES["currency_error"])
+
+    # BEFORE insert: baseline for alert crossings
+    planned_by_cat, planned_total = compute_planned_monthly_from_rules(user_id, m)
+    overall_budget, carried, carried_from = ensure_month_budget(user_id, m)
+    prev_spent_by_cat, prev_spent_total = compute_spent_this_month(user_id, m)
+    prev_forecast = (
+        forecast_month(user_id, m, overall_budget)
+        if overall_budget is not None
+        else None
+    )
+
+    categories = [category for category, _, _, _ in items]
+    prev_stats = get_category_stats(user_id, categories)
+    new_unplanned = [
+        c
+        for c in dict.fromkeys(categories)
+        if planned_by_cat.get(c, 0.0) <= 0.0 and prev_spent_by_cat.get(c, 0.0) <= 0.0
+    ]
+
+    converted = await add_expenses_batch_fx(user_id, m, items, rates)
+
+    # AFTER insert: recompute spent once
+    new_spent_by_cat, new_spent_total = compute_spent_this_month(user_id, m)
+    new_forecast = (
+        forecast_month(user_id, m, overall_budget)
+        if prev_forecast is not None
+        else None
+    )
+
+    alert_result = check_alerts_after_batch(
+        categories=categories,
+        prev_planned_by_cat=planned_by_cat,
+        prev_spent_by_cat=prev_spent_by_cat,
+        new_spent_by_cat=new_spent_by_cat,
+        budget=overall_budget,
+        new_planned_by_cat=planned_by_cat,  # planned doesn't change on add
+        prev_projected=prev_forecast and prev_forecast.projected_total,
+        new_projected=new_forecast and new_forecast.projected_total,
+        amounts=[chf for _, _, chf in converted],
+        prev_stats=prev_stats,
+    )
+
+    # One combined reply: confirmations, new categories, alerts
+    rows = []
+    for (
+        (category, name, amount, currency),
+        (fx_date, rate, chf_amount),
+        was_guessed,
+    ) in zip(items, converted, guessed):
+        key = "batch_row_base" if currency.upper() == BASE_CURRENCY else "batch_row_fx"
+        row = MESSAGES[key].format(
+            category=escape_markdown(category),
+            name=escape_markdown(name),
+            amount=amount,
+            currency=currency.upper(),
+            converted=chf_amount,
+            base_currency=BASE_CURRENCY,
+        )
+        rows.append(row + MESSAGES["batch_guessed_mark"] if was_guessed else row)
+    if any(guessed):
+        rows.append(MESSAGES["batch_guessed_note"])
+
+    parts = [
+        MESSAGES["batch_header"].format(
+            count=len(items),
+            total=sum(chf for _, _, chf in converted),
+            currency=BASE_CURRENCY,
+        )
+        + "\n"
+        + "\n".join(rows)
+    ]
+    parts += [
+        MESSAGES["new_unplanned_category"].format(category=escape_markdown(c)).strip()
+        for c in new_unplanned
+    ]
+    parts += [msg.strip() for msg in alert_result.messages]
+
+    await reply(update, context, "\n\n".join(parts), parse_mode="Markdown")
+
+
+def _format_deleted(rows, header: str) -> str:
+    """Summary of deleted expenses (as returned by DELETE ... RETURNING)."""
+    lines = [
+        MESSAGES[header].format(
+            count=len(rows),
+            total=sum(r.chf_amount for r in rows),
+            currency=BASE_CURRENCY,
+        )
+    ]
+    for r in rows[:DELETED_ROWS_SHOWN]:
+        created = (r.created_at or "")[:10]
+        if r.currency == BASE_CURRENCY:
+            line = MESSAGES["expenses_row_base"].format(
+                id=r.id,
+                category=r.category,
+                name=r.name,
+                amount=r.chf_amount,
+                currency=BASE_CURRENCY,
+                created=created,
+            )
+        else:
+            line = MESSAGES["expenses_row_fx"].format(
+                id=r.id,
+                category=r.category,
+                name=r.name,
+                amount=r.original_amount,
+                currency=r.currency,
+                converted=r.chf_amount,
+                base_currency=BASE_CURRENCY,
+                created=created,
+            )
+        lines.append(line)
+    if len(rows) > DELETED_ROWS_SHOWN:
+        lines.append(
+            MESSAGES["deleted_more"].format(count=len(rows) - DELETED_ROWS_SHOWN)
+        )
+    return "\n".join(lines)
+
+
 @rollover_notify
 async def undo(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    /undo [n]
+    Removes the last n expenses added this month (default 1).
+    """
     user_id = update.effective_user.id
+    args = get_args(update)
+
+    n = 1
+    if args:
+        try:
+            n = int(args[0])
+        except ValueError:
+            return await reply(update, context, MESSAGES["usage_undo"])
+        if not 1 <= n <= UNDO_MAX:
+            return await reply(update, context, MESSAGES["usage_undo"])
+
     m = month_key()
-    row = delete_last_expense(user_id, m)
-    if not row:
+    rows = delete_last_expenses(user_id, m, n)
+    if not rows:
         return await reply(update, context, MESSAGES["nothing_to_undo"])
 
-    cur = row["currency"]
-    orig = float(row["original_amount"])
-    chf = float(row["chf_amount"])
+    if len(rows) > 1:
+        return await reply(update, context, _format_deleted(rows, "undo_many"))
 
-    if cur == BASE_CURRENCY:
+    row = rows[0]
+    if row.currency == BASE_CURRENCY:
         await reply(
             update,
             context,
-            MESSAGES["undo_success_base"].format(amount=orig, currency=BASE_CURRENCY),
+            MESSAGES["undo_success_base"].format(
+                amount=row.original_amount, currency=BASE_CURRENCY
+            ),
         )
     else:
         await reply(
             update,
             context,
             MESSAGES["undo_success_fx"].format(
-                amount=orig, currency=cur, converted=chf, base_currency=BASE_CURRENCY
+                amount=row.original_amount,
+                currency=row.currency,
+                converted=row.chf_amount,
+                base_currency=BASE_CURRENCY,
             ),
         )
 
@@ -278,13 +679,14 @@ async def undo(update: Update, context: ContextTypes.DEFAULT_TYPE):
 @rollover_silent
 async def expenses(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
-    /expenses [YYYY-MM] ["Category Name"]
+    /expenses [YYYY-MM | YYYY-MM-DD..YYYY-MM-DD] ["Category Name"]
 
     Shows expenses with pagination (Previous/Next buttons).
 
     Examples:
       /expenses               # Current month
       /expenses 2025-12       # Specific month
+      /expenses 2025-11-25..2025-12-05  # Day range (across months)
       /expenses "Food & Drinks"  # Current month, filtered by category
       /expenses 2025-12 "Food & Drinks"  # Specific month and category
     """
@@ -300,6 +702,12 @@ async def expenses(update: Update, context: ContextTypes.DEFAULT_TYPE):
     for a in args:
         if _is_month_token(a):
             m = a
+        elif ".." in a:
+            day_range = parse_day_range(a)
+            if day_range is None:
+                return await reply(update, context, MESSAGES["expenses_range_error"])
+            # Normalised so open ends are fixed when the buttons are drawn
+            m = f"{day_range[0].isoformat()}..{day_range[1].isoformat()}"
         else:
             leftovers.append(a)
 
@@ -307,71 +715,45 @@ async def expenses(update: Update, context: ContextTypes.DEFAULT_TYPE):
         category = " ".join(leftovers).strip()
 
     # Validate month format
-    if not _is_month_token(m):
+    if not _is_month_token(m) and ".." not in m:
         return await reply(
             update,
             context,
-            'Usage: /expenses [YYYY-MM] ["Category Name"]\nExample: /expenses 2025-12 "Food & Drinks"',
+            MESSAGES["expenses_usage"],
         )
 
-    # Get all expenses (no limit - pagination handles display)
-    rows = list_expenses_filtered(user_id, m, limit=1000, category=category)
-
-    title = MESSAGES["expenses_title"].format(
-        month=m, category=f' — "{category}"' if category else ""
+    # Render the first page; later pages are fetched by the button callbacks
+    page = render_expenses_page(
+        user_id, expenses_cursor(m, category), category=category
     )
 
-    if not rows:
-        return await reply(
-            update, context, MESSAGES["expenses_no_rows"].format(title=title)
+    if page is None:
+        title = MESSAGES["expenses_title"].format(
+            month=m, category=f' — "{category}"' if category else ""
         )
+        text = MESSAGES["expenses_no_rows"].format(title=title)
+        match = category_typo(user_id, category) if category else None
+        if match is not None:
+            text += "\n" + MESSAGES["expenses_did_you_mean"].format(
+                category=match, scope=m
+            )
+        return await reply(update, context, text)
 
-    # Create pagination state
-    state = PaginationState(
-        items=rows,
-        current_page=0,
-        items_per_page=10,
-        filter_category=category,
-        filter_month=m,
-        callback_prefix="expenses",
-    )
-
-    # Format and send first page with buttons
-    page_text = _format_expenses_page(state)
-
-    # Build pagination buttons
-    from utils.pagination import get_pagination_buttons
-
-    buttons_data, footer = get_pagination_buttons(
-        prefix="expenses",
-        current_page=state.current_page,
-        total_pages=state.total_pages,
-        has_previous=state.has_previous,
-        has_next=state.has_next,
-    )
-    page_text += f"\n\n{footer}"
-
-    # Build inline keyboard
-    keyboard = []
-    if buttons_data:
-        button_row = []
-        for label, callback in buttons_data:
-            button_row.append(InlineKeyboardButton(label, callback_data=callback))
-        keyboard.append(button_row)
-
-    reply_markup = InlineKeyboardMarkup(keyboard) if keyboard else None
-
-    # Send message with pagination
-    msg = await reply(update, context, page_text, reply_markup=reply_markup)
-
-    # Store pagination state in context for callback handlers
-    context.user_data["expenses_pagination"] = state.to_dict()
+    page_text, reply_markup = page
+    await reply(update, context, page_text, reply_markup=reply_markup)
 
 
 @rollover_notify
 async def delexpense(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
-    /delexpense <id>
+    /delexpense <id | from-to> [...]
+    /delexpense <YYYY-MM | YYYY-MM-DD..YYYY-MM-DD> ["Category Name"]
+
+    Examples:
+      /delexpense 42
+      /delexpense 12 15 20-40
+      /delexpense 2025-12 "Food & Drinks"
+      /delexpense 2025-11-25..2025-12-05
     """
     user_id = update.effective_user.id
     args = get_args(update)
@@ -379,14 +761,52 @@ async def delexpense(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if not args:
         return await reply(update, context, MESSAGES["delexpense_usage"])
 
-    try:
-        eid = int(args[0])
-    except Exception:
+    ids: list[int] = []
+    id_ranges: list[tuple[int, int]] = []
+    month = None
+    ts_range = None
+    scopes = 0
+    leftovers = []
+    for a in args:
+        if _is_month_token(a):
+            month = a
+            scopes += 1
+        elif ".." in a:
+            day_range = parse_day_range(a)
+            if day_range is None:
+                return await reply(update, context, MESSAGES["expenses_range_error"])
+            ts_range = ts_range_for_days(*day_range)
+            scopes += 1
+        elif a.isdigit():
+            ids.append(int(a))
+        elif _ID_RANGE.fullmatch(a):
+            lo, hi = a.split("-")
+            id_ranges.append((int(lo), int(hi)))
+        else:
+            leftovers.append(a)
+
+    if scopes > 1:
+        return await reply(
+            update,
+            context,
+            MESSAGES["delexpense_scope_error"] + "\n\n" + MESSAGES["delexpense_usage"],
+        )
+
+    scoped = scopes == 1
+    if ids or id_ranges:
+        if scoped or leftovers:
+            return await reply(update, context, MESSAGES["delexpense_usage"])
+        rows = delete_expenses_by_ids(user_id, ids, id_ranges)
+    elif scoped:
+        category = " ".join(leftovers).strip() or None
+        rows = delete_expenses_in_scope(
+            user_id, month, category=category, ts_range=ts_range
+        )
+    elif leftovers:
         return await reply(update, context, MESSAGES["delexpense_id_error"])
+    else:
+        return await reply(update, context, MESSAGES["delexpense_usage"])
 
-    ok = delete_expense_by_id(user_id, eid)
-    await reply(
-        update,
-        context,
-        MESSAGES["delexpense_success" if ok else "delexpense_failure"],
-    )
+    if not rows:
+        return await reply(update, context, MESSAGES["delexpense_failure"])
+    await reply(update, context, _format_deleted(rows, "delexpense_success"))
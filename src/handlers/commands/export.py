@@ -1,6 +1,13 @@
 from .base import *
 import io
-from utils.export_csv import export_expenses_csv, export_rules_csv, export_budgets_csv
+from db.services import get_export_cursor, advance_export_cursor
+from utils.export_csv import (
+    export_expenses_csv,
+    export_expenses_delta_csv,
+    export_rules_csv,
+    export_budgets_csv,
+    export_report_csv,
+)
 
 
 # Load messages from YAML file using relative path
@@ -13,12 +20,14 @@ with open(_messages_path, "r") as file:
 @rollover_silent
 async def export(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
-    /export [expenses|rules|budgets] [YYYY-MM]
+    /export [expenses|rules|budgets|report|delta] [YYYY-MM]
     Defaults:
       /export -> expenses for current month
       /export rules
       /export budgets
       /export expenses 2025-12
+      /export report 2025-12 -> per-category planned/spent/remaining, as in /status
+      /export delta -> expenses added/deleted since the last delta export
     """
     user_id = update.effective_user.id
     args = get_args(update)
@@ -31,14 +40,21 @@ async def export(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if len(args) >= 2:
         m = args[1].strip()
 
-    if kind not in ("expenses", "rules", "budgets"):
+    if kind not in ("expenses", "rules", "budgets", "report", "delta"):
         return await reply(update, context, MESSAGES["usage_export"])
 
+    if kind == "delta":
+        return await _export_delta(update, context, user_id)
+
+    if kind in ("expenses", "report") and (len(m) != 7 or m[4] != "-"):
+        return await reply(update, context, MESSAGES["invalid_month"])
+
     if kind == "expenses":
-        if len(m) != 7 or m[4] != "-":
-            return await reply(update, context, MESSAGES["invalid_month"])
         data = export_expenses_csv(user_id, m)
         filename = f"expenses_{m}.csv"
+    elif kind == "report":
+        data = export_report_csv(user_id, m)
+        filename = f"report_{m}.csv"
     elif kind == "rules":
         data = export_rules_csv(user_id)
         filename = "rules.csv"
@@ -57,6 +73,36 @@ async def export(update: Update, context: ContextTypes.DEFAULT_TYPE):
     )
 
 
+async def _export_delta(
+    update: Update, context: ContextTypes.DEFAULT_TYPE, user_id: int
+):
+    last_expense_id, last_seq = get_export_cursor(user_id)
+    data, n_inserted, n_deleted, new_expense_id, new_seq = export_expenses_delta_csv(
+        user_id, last_expense_id, last_seq
+    )
+
+    if n_inserted == 0 and n_deleted == 0:
+        # Still move past tombstones of rows that were never delivered
+        advance_export_cursor(user_id, new_expense_id, new_seq)
+        return await reply(update, context, MESSAGES["delta_no_changes"])
+
+    filename = f"expenses_delta_{new_expense_id}_{new_seq}.csv"
+    bio = io.BytesIO(data)
+    bio.name = filename
+    bio.seek(0)
+    await reply_doc(
+        update,
+        context,
+        InputFile(bio),
+        caption=MESSAGES["delta_caption"].format(
+            filename=filename, inserted=n_inserted, deleted=n_deleted
+        ),
+    )
+
+    # Only advance once the file has been delivered
+    advance_export_cursor(user_id, new_expense_id, new_seq)
+
+
 @rollover_silent
 async def backupdb(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
@@ -0,0 +1,197 @@
+from .base import *
+import csv
+import io
+import time
+import httpx
+from collections import Counter
+from telegram.error import TelegramError
+from db.services import import_expenses_bulk, resolve_fx_rate
+from utils.fx import InvalidCurrencyError
+from utils.import_csv import (
+    IMPORT_MAX_BYTES,
+    ImportCreditError,
+    ImportFormatError,
+    import_hash,
+    iter_import_chunks,
+    open_import_reader,
+    parse_import_row,
+)
+from utils.validators import ValidationError
+
+# Load messages from YAML file using relative path
+_current_dir = Path(__file__).parent
+_messages_path = _current_dir / "messages" / "importer.yaml"
+_error_messages_path = _current_dir / "messages" / "errors.yaml"
+with open(_messages_path, "r") as file:
+    MESSAGES = yaml.safe_load(file)
+with open(_error_messages_path, "r") as file:
+    ERROR_MESSAGES = yaml.safe_load(file)
+
+IMPORT_PROGRESS_SECONDS = 2.0  # minimum gap between progress edits
+IMPORT_MAX_ERRORS_SHOWN = 5
+
+
+@rollover_silent
+async def import_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    /import (as a reply to a CSV file)
+
+    CSV files sent with the caption /import are handled by import_document.
+    """
+    msg = update.message
+    document = None
+    if msg is not None and msg.reply_to_message is not None:
+        document = msg.reply_to_message.document
+
+    if document is None:
+        return await reply(update, context, MESSAGES["usage_import"])
+
+    await _import_document(update, context, document)
+
+
+@rollover_silent
+async def import_document(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """A CSV document uploaded with the caption /import."""
+    await _import_document(update, context, update.message.document)
+
+
+def _error_text(key: str) -> str:
+    return MESSAGES.get(key) or ERROR_MESSAGES.get(key) or key
+
+
+async def _import_document(
+    update: Update, context: ContextTypes.DEFAULT_TYPE, document
+):
+    user_id = update.effective_user.id
+
+    if document.file_size and document.file_size > IMPORT_MAX_BYTES:
+        return await reply(update, context, MESSAGES["import_too_large"])
+
+    data = io.BytesIO()
+    telegram_file = await document.get_file()
+    await telegram_file.download_to_memory(data)
+    data.seek(0)
+
+    try:
+        reader, columns = open_import_reader(data)
+    except ImportFormatError as e:
+        return await reply(update, context, _error_text(e.message))
+    except UnicodeDecodeError:
+        return await reply(update, context, MESSAGES["import_bad_encoding"])
+
+    status_msg = await reply(update, context, MESSAGES["import_started"])
+
+    rates: dict[tuple[str, str], tuple[str, float] | None] = {}
+    occurrences: Counter = Counter()
+    errors: list[tuple[int, str]] = []
+    credits: list[int] = []  # lines of incoming payments on a signed statement
+    read = inserted = duplicates = 0
+    stopped_at = None  # line where the FX service failed
+    last_edit = time.monotonic()
+
+    try:
+        for chunk in iter_import_chunks(reader):
+            parsed = []
+            for line, record in chunk:
+                read += 1
+                try:
+                    parsed.append(parse_import_row(line, record, columns))
+                except ImportCreditError:
+                    credits.append(line)
+                except (ImportFormatError, ValidationError) as e:
+                    errors.append((line, e.message))
+
+            # One FX lookup per (currency, day) over the whole file
+            for row in parsed:
+                key = (row.currency, row.day.isoformat())
+                if key not in rates:
+                    try:
+                        rates[key] = await resolve_fx_rate(*key)
+                    except InvalidCurrencyError:
+                        rates[key] = None
+                    except (httpx.HTTPError, KeyError, ValueError):
+                        # FX service down or answering garbage: keep what is
+                        # committed, import this chunk up to the row and stop
+                        stopped_at = row.line
+                        break
+            if stopped_at is not None:
+                parsed = [row for row in parsed if row.line < stopped_at]
+                errors = [(line, key) for line, key in errors if line < stopped_at]
+                credits = [line for line in credits if line < stopped_at]
+                read -= sum(1 for line, _ in chunk if line >= stopped_at)
+
+            rows = []
+            for row in parsed:
+                fx = rates[(row.currency, row.day.isoformat())]
+                if fx is None:
+                    errors.append((row.line, "import_bad_currency"))
+                    continue
+                fx_date, rate = fx
+                dedup_key = (row.day, round(row.amount, 2), row.currency, row.name)
+                occurrences[dedup_key] += 1
+                rows.append(
+                    (
+                        row.day.strftime("%Y-%m"),
+                        row.category,
+                        row.name,
+                        row.created_at,
+                        row.ts,
+                        row.currency,
+                        row.amount,
+                        row.amount * rate,
+                        rate,
+                        fx_date,
+                        import_hash(row, occurrences[dedup_key]),
+                    )
+                )
+
+            # One bounded transaction per chunk
+            added = import_expenses_bulk(user_id, rows)
+            inserted += added
+            duplicates += len(rows) - added
+            if stopped_at is not None:
+                break
+
+            if time.monotonic() - last_edit >= IMPORT_PROGRESS_SECONDS:
+                last_edit = time.monotonic()
+                await _edit_status(
+                    status_msg,
+                    MESSAGES["import_progress"].format(
+                        read=read, inserted=inserted, duplicates=duplicates
+                    ),
+                )
+    except (csv.Error, UnicodeDecodeError):
+        errors.append((reader.line_num, "import_bad_encoding"))
+
+    summary = MESSAGES["import_stopped" if stopped_at else "import_done"].format(
+        read=read,
+        inserted=inserted,
+        duplicates=duplicates,
+        skipped=len(errors),
+        line=stopped_at,
+    )
+    if credits:
+        summary += "\n" + MESSAGES["import_credits_skipped"].format(count=len(credits))
+    if errors:
+        summary += "\n" + "\n".join(
+            MESSAGES["import_error_line"].format(line=line, error=_error_text(key))
+            for line, key in errors[:IMPORT_MAX_ERRORS_SHOWN]
+        )
+        if len(errors) > IMPORT_MAX_ERRORS_SHOWN:
+            summary += "\n" + MESSAGES["import_more_errors"].format(
+                count=len(errors) - IMPORT_MAX_ERRORS_SHOWN
+            )
+
+    if not await _edit_status(status_msg, summary):
+        await reply(update, context, summary)
+
+
+async def _edit_status(status_msg, text: str) -> bool:
+    if status_msg is None:
+        return False
+    try:
+        await status_msg.edit_text(text)
+        return True
+    except TelegramError:
+        # e.g. "message is not modified"; progress is best effort
+        return False
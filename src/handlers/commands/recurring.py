@@ -0,0 +1,160 @@
+from .base import *
+from datetime import date
+from db.services import (
+    add_recurring,
+    delete_recurring,
+    list_recurring,
+    materialize_recurring_expenses,
+    resolve_fx_rate,
+)
+from utils.fx import (
+    InvalidCurrencyError,
+    CurrencyFormatError,
+    CurrencyNotSupportedError,
+)
+from utils.categorize import forget_category_index
+from .expenses import AddParseError, _categorize, _parse_expense_args
+
+# Load messages from YAML file using relative path
+_current_dir = Path(__file__).parent
+_messages_path = _current_dir / "messages" / "recurring.yaml"
+with open(_messages_path, "r") as file:
+    MESSAGES = yaml.safe_load(file)
+
+PERIODS = ("daily", "weekly", "monthly", "yearly")
+
+
+@rollover_notify
+async def recurring(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    /recurring                      -> list recurring expenses
+    /recurring <daily|weekly|monthly|yearly> [YYYY-MM-DD] <category> <name> <amount> [currency]
+
+    The expense is recorded on the start date (default: today) and then every
+    period; the scheduled job adds each occurrence as a normal expense.
+
+    Examples:
+      /recurring monthly Housing Rent 1800
+      /recurring monthly 2026-01-05 Subscriptions Netflix 15.99 EUR
+    """
+    user_id = update.effective_user.id
+    args = get_args(update)
+
+    if not args:
+        return await _list_recurring(update, context, user_id)
+
+    period = args[0].strip().lower()
+    if period not in PERIODS:
+        return await reply(update, context, MESSAGES["usage_recurring"])
+
+    start = date.today()
+    rest = args[1:]
+    if rest:
+        try:
+            start = date.fromisoformat(rest[0].strip())
+            rest = rest[1:]
+        except ValueError:
+            pass
+
+    try:
+        category, name, amount, currency = _parse_expense_args(rest)
+    except AddParseError:
+        return await reply(update, context, MESSAGES["usage_recurring"])
+    category, _ = _categorize(user_id, category, name)
+
+    try:
+        fx_date, rate = await resolve_fx_rate(currency)
+    except CurrencyFormatError:
+        return await reply(update, context, MESSAGES["currency_error"])
+    except CurrencyNotSupportedError:
+        return await reply(update, context, MESSAGES["currency_not_supported"])
+    except InvalidCurrencyError:
+        return await reply(update, context, MESSAGES["currency_error"])
+
+    currency = currency.upper()
+    chf_amount = float(amount) * rate
+    rid = add_recurring(
+        user_id,
+        category,
+        name,
+        period,
+        start.isoformat(),
+        currency,
+        float(amount),
+        chf_amount,
+        rate,
+        fx_date,
+    )
+
+    # Occurrences already due (today or a past start date) show up right away
+    today = date.today().isoformat()
+    added = materialize_recurring_expenses(today, user_id).get(user_id, 0)
+    if added:
+        forget_category_index(user_id)
+
+    await reply(
+        update,
+        context,
+        MESSAGES["recurring_added"].format(
+            id=rid,
+            category=category,
+            name=name,
+            amount=float(amount),
+            currency=currency,
+            period=period,
+            start=start.isoformat(),
+        )
+        + (
+            "\n" + MESSAGES["recurring_materialized"].format(count=added)
+            if added
+            else ""
+        ),
+    )
+
+
+async def _list_recurring(
+    update: Update, context: ContextTypes.DEFAULT_TYPE, user_id: int
+):
+    items = list_recurring(user_id)
+    if not items:
+        return await reply(update, context, MESSAGES["no_recurring"])
+
+    lines = [MESSAGES["recurring_list_header"]]
+    for r in items:
+        lines.append(
+            MESSAGES["recurring_list_item"].format(
+                id=r.id,
+                category=r.category,
+                name=r.name,
+                amount=r.original_amount,
+                currency=r.currency,
+                period=r.period,
+                start=r.start_date,
+            )
+        )
+    lines.append(MESSAGES["recurring_list_footer"])
+    await reply(update, context, "\n".join(lines))
+
+
+@rollover_notify
+async def delrecurring(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    /delrecurring <id>
+    """
+    user_id = update.effective_user.id
+    args = get_args(update)
+
+    if not args:
+        return await reply(update, context, MESSAGES["usage_delrecurring"])
+
+    try:
+        rid = int(args[0])
+    except ValueError:
+        return await reply(update, context, MESSAGES["recurring_id_error"])
+
+    ok = delete_recurring(user_id, rid)
+    await reply(
+        update,
+        context,
+        MESSAGES["delrecurring_success" if ok else "delrecurring_failure"],
+    )
@@ -5,9 +5,32 @@ from db.services import (
     month_key,
     compute_planned_monthly_from_rules,
     compute_spent_this_month,
+    compute_spent_between,
+    compute_planned_between,
+    compute_planned_by_month,
+    compute_spent_by_month,
+    first_expense_day,
+    compute_spent_by_day,
+    days_in_month,
+    get_budgets_between,
+    get_data_version,
+    months_ending,
+    year_review,
+    spend_heatmap,
+    top_payees,
+    parse_day_range,
+    recent_days_range,
+    ts_range_for_days,
+    OPEN_START,
+    MIN_YEAR,
+    MAX_YEAR,
 )
-from dataclasses import dataclass
-from typing import Dict
+from utils.budget import BudgetMetrics, CategoryLine, summarize_budget
+from utils.category_match import suggest_categories
+from utils.forecast import Forecast, forecast_month
+from utils.fx import BoundedLRUCache
+from datetime import date
+from typing import Dict, Tuple
 
 
 # Load messages from YAML file using relative path
@@ -17,28 +40,21 @@ with open(_messages_path, "r") as file:
     MESSAGES = yaml.safe_load(file)
 
 TOP_N = 8
+TREND_DEFAULT_MONTHS = 12
+TREND_MAX_MONTHS = 36
+TREND_BAR_WIDTH = 8
+STATUS_CACHE_SIZE = 512
+HEATMAP_DEFAULT_DAYS = 365
+HEATMAP_SHADES = "·░▒▓█"  # empty, then quarters of the busiest slot
+TOP_PAYEES_DEFAULT = 10
+TOP_PAYEES_MAX = 50
 
-
-@dataclass
-class BudgetMetrics:
-    """Container for calculated budget metrics."""
-
-    overall_budget: float
-    planned_total: float
-    spent_total: float
-    overspend_total: float
-    remaining_overall: float
-    unplanned_spent: float
-    overspend_by_cat: Dict[str, float]
-
-    @property
-    def remaining_tag(self) -> str:
-        """Get the emoji tag for remaining balance."""
-        return "✅" if self.remaining_overall >= 0 else "🚨"
+# Rendered /status replies: (user, month, mode, data version, day) -> (text, parse_mode)
+_STATUS_CACHE = BoundedLRUCache(max_size=STATUS_CACHE_SIZE)
 
 
 class BudgetReport:
-    """Shared utility class for generating budget reports."""
+    """Formats a budget summary (utils.budget) as report lines."""
 
     def __init__(
         self,
@@ -47,73 +63,47 @@ class BudgetReport:
         overall_budget: float,
         currency: str = BASE_CURRENCY,
     ):
-        self.planned_by_cat = planned_by_cat
-        self.spent_by_cat = spent_by_cat
-        self.overall_budget = overall_budget
+        self.summary = summarize_budget(planned_by_cat, spent_by_cat, overall_budget)
         self.currency = currency
-        self.all_cats = set(planned_by_cat.keys()) | set(spent_by_cat.keys())
-
-    def calculate_metrics(self) -> BudgetMetrics:
-        """Calculate all budget metrics (overspend, remaining, etc.)."""
-        planned_total = sum(self.planned_by_cat.values())
-        spent_total = sum(self.spent_by_cat.values())
-
-        # Calculate overspend by category
-        overspend_by_cat = {}
-        overspend_total = 0.0
-        for c in self.all_cats:
-            p = self.planned_by_cat.get(c, 0.0)
-            s = self.spent_by_cat.get(c, 0.0)
-            over = max(0.0, s - p)
-            overspend_by_cat[c] = over
-            overspend_total += over
-
-        # Calculate remaining and unplanned
-        remaining_overall = self.overall_budget - planned_total - overspend_total
-        unplanned_spent = sum(
-            self.spent_by_cat.get(c, 0.0)
-            for c in self.spent_by_cat.keys()
-            if self.planned_by_cat.get(c, 0.0) == 0.0
-        )
-
-        return BudgetMetrics(
-            overall_budget=self.overall_budget,
-            planned_total=planned_total,
-            spent_total=spent_total,
-            overspend_total=overspend_total,
-            remaining_overall=remaining_overall,
-            unplanned_spent=unplanned_spent,
-            overspend_by_cat=overspend_by_cat,
-        )
-
-    def sort_categories(self) -> list[str]:
-        """Sort categories by importance: overspend desc, spent desc, name asc."""
-        metrics = self.calculate_metrics()
 
-        def sort_key(c: str):
-            return (
-                -metrics.overspend_by_cat.get(c, 0.0),
-                -self.spent_by_cat.get(c, 0.0),
-                c.lower(),
-            )
-
-        return sorted(self.all_cats, key=sort_key)
+    @property
+    def metrics(self) -> BudgetMetrics:
+        return self.summary.metrics
+
+    @staticmethod
+    def metrics_by_month(
+        months: list[str],
+        planned_by_month: Dict[str, Dict[str, float]],
+        spent_by_month: Dict[str, Dict[str, float]],
+        budgets: Dict[str, float],
+    ) -> Dict[str, BudgetMetrics]:
+        """
+        Budget metrics for many months, one summarize_budget pass per month
+        (months without a budget get overall_budget 0).
+        """
+        empty: Dict[str, float] = {}
+        return {
+            m: summarize_budget(
+                planned_by_month.get(m, empty),
+                spent_by_month.get(m, empty),
+                budgets.get(m, 0.0),
+            ).metrics
+            for m in months
+        }
 
     def format_category_line(
-        self, category: str, metrics: BudgetMetrics, show_unplanned_label: bool = False
+        self, line: CategoryLine, show_unplanned_label: bool = False
     ) -> str:
         """Format a single category as a report line."""
-        p = self.planned_by_cat.get(category, 0.0)
-        s = self.spent_by_cat.get(category, 0.0)
+        p, s = line.planned, line.spent
         r = p - s
 
-        label = category
+        label = line.category
         if show_unplanned_label and p == 0.0 and s > 0.0:
-            label = f"{category} (unplanned)"
+            label = f"{line.category} (unplanned)"
 
         r_tag = "✅" if r >= 0 else "⚠️"
-        over = metrics.overspend_by_cat.get(category, 0.0)
-        over_str = f"  (+{over:.2f} over)" if over > 0 else ""
+        over_str = f"  (+{line.over:.2f} over)" if line.over > 0 else ""
 
         return (
             f"- {label}: {p:.2f} | {s:.2f} | {r_tag} {r:.2f} {self.currency}{over_str}"
@@ -121,14 +111,13 @@ class BudgetReport:
 
     def get_category_summary_lines(
         self,
-        cats_to_show: list[str],
-        metrics: BudgetMetrics,
+        lines_to_show: list[CategoryLine],
         separate_planned: bool = True,
     ) -> list[str]:
         """Generate category summary lines, optionally separating planned/unplanned."""
         lines = []
 
-        if not cats_to_show:
+        if not lines_to_show:
             lines.append(
                 MESSAGES["status_no_categories"]
                 if separate_planned
@@ -137,33 +126,29 @@ class BudgetReport:
             return lines
 
         if separate_planned:
-            # Separate planned and unplanned
-            planned_cats = [
-                c for c in cats_to_show if self.planned_by_cat.get(c, 0.0) > 0.0
-            ]
-            unplanned_cats = [
-                c for c in cats_to_show if self.planned_by_cat.get(c, 0.0) == 0.0
-            ]
-
-            if planned_cats:
+            # Separate planned and unplanned, in one pass
+            planned_lines, unplanned_lines = [], []
+            for line in lines_to_show:
+                (planned_lines if line.planned > 0.0 else unplanned_lines).append(line)
+
+            if planned_lines:
                 lines.append(MESSAGES["status_by_category_planned"])
-                for c in planned_cats:
-                    lines.append(self.format_category_line(c, metrics))
+                lines.extend(map(self.format_category_line, planned_lines))
 
-            if unplanned_cats:
-                if planned_cats:
+            if unplanned_lines:
+                if planned_lines:
                     lines.append("")
                 lines.append(MESSAGES["status_by_category_unplanned"])
-                for c in unplanned_cats:
-                    s = self.spent_by_cat.get(c, 0.0)
-                    lines.append(f"- {c}: {s:.2f} {self.currency}")
+                currency = self.currency
+                lines.extend(
+                    f"- {line.category}: {line.spent:.2f} {currency}"
+                    for line in unplanned_lines
+                )
         else:
             # Show all together (for month report)
             lines.append(MESSAGES["month_by_category"])
-            for c in cats_to_show:
-                lines.append(
-                    self.format_category_line(c, metrics, show_unplanned_label=True)
-                )
+            for line in lines_to_show:
+                lines.append(self.format_category_line(line, show_unplanned_label=True))
 
         return lines
 
@@ -182,6 +167,14 @@ async def status(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # - /status YYYY-MM              -> compact historical month
     # - /status YYYY-MM full         -> full historical month
     # - /status YYYY-MM <category>   -> category detail for historical month
+    # - /status [YYYY-MM] pace [category] -> cumulative spend vs rule allowance per day
+    # - /status week|7d|30d          -> spend over a recent day range
+    # - /status YYYY-MM-DD..YYYY-MM-DD -> spend over a custom day range
+
+    if args:
+        day_range = recent_days_range(args[0]) or parse_day_range(args[0])
+        if day_range is not None:
+            return await _status_range(update, context, user_id, args[0], *day_range)
 
     # Extract month from args if provided (YYYY-MM format)
     m = month_key()  # default to current month
@@ -197,6 +190,50 @@ async def status(update: Update, context: ContextTypes.DEFAULT_TYPE):
     want_full = any(a.lower() in ("full", "all") for a in filtered_args)
     filtered_args = [a for a in filtered_args if a.lower() not in ("full", "all")]
 
+    # The rendered report is cached until a write touches this user and month
+    # (data_versions); the current month's also expires daily, since its pace
+    # and forecast depend on the date
+    key = (
+        user_id,
+        m,
+        want_full,
+        tuple(filtered_args),
+        get_data_version(user_id, m),
+        date.today() if m == month_key() else None,
+    )
+    rendered = _STATUS_CACHE.get(key)
+    if rendered is None:
+        rendered = _render_status(user_id, m, want_full, filtered_args)
+        _STATUS_CACHE.put(key, rendered)
+    text, parse_mode = rendered
+    await reply(update, context, text, parse_mode=parse_mode)
+
+
+def _category_not_found(user_id: int, category: str, known) -> Tuple[str, str | None]:
+    """Reply for an unknown category: the close matches among `known`, else all of them."""
+    if not known:
+        return (
+            MESSAGES["category_not_found_no_categories"].format(category=category),
+            None,
+        )
+    close = suggest_categories(user_id, category, within=set(known))
+    return (
+        MESSAGES["category_did_you_mean" if close else "category_not_found"].format(
+            category=category,
+            categories="\n".join(f"- {c}" for c in close or sorted(known)),
+        ),
+        "Markdown",
+    )
+
+
+def _render_status(
+    user_id: int, m: str, want_full: bool, filtered_args: list[str]
+) -> Tuple[str, str | None]:
+    """The /status reply for month `m` (not a day range) as (text, parse_mode)."""
+    if filtered_args and filtered_args[0].lower() == "pace":
+        category = " ".join(filtered_args[1:]).strip() or None
+        return _render_pace(user_id, m, category)
+
     # For historical months, use get_month_budget; for current, use ensure_month_budget
     is_current_month = m == month_key()
 
@@ -224,46 +261,27 @@ async def status(update: Update, context: ContextTypes.DEFAULT_TYPE):
             else:
                 lines.append("(no rules configured yet)")
 
-            return await reply(update, context, "\n".join(lines), parse_mode="Markdown")
+            return "\n".join(lines), "Markdown"
         else:
             # Historical month: show "data not recorded" message
-            return await reply(
-                update, context, MESSAGES["historical_month_no_data"].format(month=m)
-            )
+            return MESSAGES["historical_month_no_data"].format(month=m), None
 
     planned_by_cat, planned_total = compute_planned_monthly_from_rules(user_id, m)
     spent_by_cat, spent_total = compute_spent_this_month(user_id, m)
 
     # Create report generator
     report = BudgetReport(planned_by_cat, spent_by_cat, overall_budget)
-    metrics = report.calculate_metrics()
-
-    known_cats_sorted = sorted(report.all_cats)
+    metrics = report.metrics
 
     # If user provided something besides "full", treat it as a category query
     if filtered_args:
         cat = " ".join(filtered_args).strip()
 
-        if cat not in report.all_cats:
-            if known_cats_sorted:
-                return await reply(
-                    update,
-                    context,
-                    MESSAGES["category_not_found"].format(
-                        category=cat,
-                        categories="\n".join(f"- {c}" for c in known_cats_sorted),
-                    ),
-                    parse_mode="Markdown",
-                )
-            return await reply(
-                update,
-                context,
-                MESSAGES["category_not_found_no_categories"].format(category=cat),
-            )
+        line = report.summary.line(cat)
+        if line is None:
+            return _category_not_found(user_id, cat, report.summary.categories)
 
-        planned = planned_by_cat.get(cat, 0.0)
-        spent = spent_by_cat.get(cat, 0.0)
-        remaining = planned - spent
+        planned, spent, remaining = line.planned, line.spent, line.remaining
 
         planned_label = (
             f"{planned:.2f} {BASE_CURRENCY}"
@@ -272,9 +290,7 @@ async def status(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
         tag = "✅" if remaining >= 0 else "⚠️"
 
-        return await reply(
-            update,
-            context,
+        return (
             MESSAGES["category_details"].format(
                 month=m,
                 category=cat,
@@ -284,12 +300,12 @@ async def status(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 remaining=remaining,
                 currency=BASE_CURRENCY,
             ),
-            parse_mode="Markdown",
+            "Markdown",
         )
 
     # Generate main report
-    cats_sorted = report.sort_categories()
-    show_cats = cats_sorted if want_full else cats_sorted[:TOP_N]
+    # Categories by importance: overspend desc, spent desc, name asc
+    show_lines = report.summary.lines(None if want_full else TOP_N)
 
     summary_type = "Full" if want_full else "Summary"
     lines = [MESSAGES["status_summary"].format(month=m, summary_type=summary_type)]
@@ -329,17 +345,31 @@ async def status(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "",
     ]
 
-    if not want_full and len(cats_sorted) > TOP_N:
+    if not want_full and len(report.summary) > TOP_N:
         lines.append(
             MESSAGES["status_top_categories"].format(
-                top_n=TOP_N, total=len(cats_sorted)
+                top_n=TOP_N, total=len(report.summary)
             )
         )
         lines.append("")
 
-    lines.extend(
-        report.get_category_summary_lines(show_cats, metrics, separate_planned=True)
-    )
+    lines.extend(report.get_category_summary_lines(show_lines, separate_planned=True))
+
+    if is_current_month:
+        day = date.today().day
+        allowance = metrics.planned_total * day / days_in_month(m)
+        lines += [
+            "",
+            MESSAGES["pace_summary"].format(
+                tag="✅" if metrics.spent_total <= allowance else "🚨",
+                day=day,
+                days=days_in_month(m),
+                spent=metrics.spent_total,
+                allowance=allowance,
+                currency=BASE_CURRENCY,
+            ),
+        ]
+        lines += _forecast_summary_lines(forecast_month(user_id, m, overall_budget))
 
     # small footer hint
     if not want_full:
@@ -348,11 +378,594 @@ async def status(update: Update, context: ContextTypes.DEFAULT_TYPE):
             MESSAGES["status_header_tips"],
             MESSAGES["status_tip_quotes"],
             MESSAGES["status_tip_full"],
+            MESSAGES["status_tip_range"],
+            MESSAGES["status_tip_pace"],
+            MESSAGES["status_tip_forecast"],
         ]
 
+    return "\n".join(lines), "Markdown"
+
+
+async def _status_range(
+    update: Update,
+    context: ContextTypes.DEFAULT_TYPE,
+    user_id: int,
+    mode: str,
+    date_from: date,
+    date_to: date,
+):
+    """Spend by category over a day range, with the plan prorated to those days."""
+    if date_from == OPEN_START:
+        # '..YYYY-MM-DD' starts at the first expense, not at the epoch
+        date_from = min(first_expense_day(user_id) or date_to, date_to)
+    ts_from, ts_to = ts_range_for_days(date_from, date_to)
+    spent_by_cat, spent_total = compute_spent_between(user_id, ts_from, ts_to)
+    planned_by_cat, planned_total = compute_planned_between(user_id, date_from, date_to)
+
+    n_days = (date_to - date_from).days + 1
+    label = MESSAGES["range_labels"].get(mode.lower())
+    if label is None:
+        label = MESSAGES["range_label_days"].format(days=n_days)
+
+    report = BudgetReport(planned_by_cat, spent_by_cat, 0.0)
+    metrics = report.metrics
+
+    lines = [
+        MESSAGES["range_summary"].format(
+            label=label, date_from=date_from.isoformat(), date_to=date_to.isoformat()
+        ),
+        "",
+        MESSAGES["range_planned"].format(
+            planned_total=planned_total, currency=BASE_CURRENCY
+        ),
+        MESSAGES["status_spent"].format(
+            spent_total=spent_total, currency=BASE_CURRENCY
+        ),
+        MESSAGES["range_daily_average"].format(
+            average=spent_total / n_days, currency=BASE_CURRENCY
+        ),
+        MESSAGES["status_overspend"].format(
+            overspend_total=metrics.overspend_total, currency=BASE_CURRENCY
+        ),
+        "",
+    ]
+    lines.extend(
+        report.get_category_summary_lines(report.summary.lines(), separate_planned=True)
+    )
+
     await reply(update, context, "\n".join(lines), parse_mode="Markdown")
 
 
+def _render_pace(user_id: int, m: str, category: str | None) -> Tuple[str, str | None]:
+    """
+    Cumulative spend per day of the month against the rule allowance prorated
+    to that day (daily rules count in full per day, weekly, monthly and yearly
+    rules by their share of the month), overall or for one category.
+    """
+    planned_by_cat, planned_total = compute_planned_monthly_from_rules(user_id, m)
+    spent_by_day = compute_spent_by_day(user_id, m, category)
+
+    if category is not None:
+        if category not in planned_by_cat and not spent_by_day:
+            known = set(planned_by_cat) | set(compute_spent_this_month(user_id, m)[0])
+            return _category_not_found(user_id, category, known)
+        planned_total = planned_by_cat.get(category, 0.0)
+
+    days = days_in_month(m)
+    current = month_key()
+    if m > current:
+        return MESSAGES["historical_month_no_data"].format(month=m), None
+    elapsed = date.today().day if m == current else days
+
+    lines = [
+        MESSAGES["pace_header"].format(
+            month=m,
+            scope=category or MESSAGES["pace_scope_all"],
+            day=elapsed,
+            days=days,
+        ),
+        MESSAGES["pace_allowance"].format(
+            per_day=planned_total / days, planned=planned_total, currency=BASE_CURRENCY
+        ),
+        "",
+        MESSAGES["pace_columns"],
+    ]
+    cumulative = 0.0
+    for d in range(1, elapsed + 1):
+        cumulative += spent_by_day.get(d, 0.0)
+        allowance = planned_total * d / days
+        lines.append(
+            MESSAGES["pace_row"].format(
+                day=d,
+                spent=cumulative,
+                allowance=allowance,
+                tag="✅" if cumulative <= allowance + 0.005 else "🚨",
+                diff=allowance - cumulative,
+            )
+        )
+
+    if elapsed < days:
+        lines += [
+            "",
+            MESSAGES["pace_rest_of_month"].format(
+                per_day=max(0.0, planned_total - cumulative) / (days - elapsed),
+                currency=BASE_CURRENCY,
+            ),
+        ]
+    return "\n".join(lines), None
+
+
+def _forecast_summary_lines(fc: Forecast) -> list[str]:
+    """Projected month-end total and the early budget warning."""
+    lines = [
+        MESSAGES["forecast_total"].format(
+            projected=fc.projected_total, currency=BASE_CURRENCY
+        )
+    ]
+    if fc.budget is None:
+        return lines
+    day = fc.crossing_day()
+    if day is None:
+        lines.append(
+            MESSAGES["forecast_within_budget"].format(
+                margin=fc.budget - fc.projected_total, currency=BASE_CURRENCY
+            )
+        )
+    elif day <= fc.today:
+        lines.append(
+            MESSAGES["forecast_already_over"].format(
+                over=fc.projected_total - fc.budget, currency=BASE_CURRENCY
+            )
+        )
+    else:
+        lines.append(
+            MESSAGES["forecast_will_cross"].format(
+                day=day,
+                month=fc.month,
+                over=fc.projected_total - fc.budget,
+                currency=BASE_CURRENCY,
+            )
+        )
+    return lines
+
+
+@rollover_silent
+async def forecast(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    /forecast
+    Projects month-end spend per category from this month's daily spend and
+    the rules, and warns if the projection crosses the budget.
+    """
+    user_id = update.effective_user.id
+    if get_args(update):
+        return await reply(update, context, MESSAGES["forecast_usage"])
+
+    m = month_key()
+    overall_budget, _, _ = ensure_month_budget(user_id, m)
+    fc = forecast_month(user_id, m, overall_budget)
+    if not fc.categories:
+        return await reply(
+            update, context, MESSAGES["forecast_no_data"].format(month=m)
+        )
+
+    lines = [MESSAGES["forecast_header"].format(month=m, day=fc.today, days=fc.days)]
+    lines += _forecast_summary_lines(fc)
+    lines += ["", MESSAGES["forecast_by_category"]]
+    for cat, (spent, projected, planned) in fc.by_category().items():
+        if planned > 0:
+            tag = "🚨" if projected > planned + 0.005 else "✅"
+            lines.append(
+                MESSAGES["forecast_row_planned"].format(
+                    tag=tag,
+                    category=cat,
+                    spent=spent,
+                    projected=projected,
+                    planned=planned,
+                )
+            )
+        else:
+            lines.append(
+                MESSAGES["forecast_row_unplanned"].format(
+                    category=cat, spent=spent, projected=projected
+                )
+            )
+    await reply(update, context, "\n".join(lines))
+
+
+def _trend_bar(value: float, peak: float) -> str:
+    if peak <= 0:
+        return ""
+    return "█" * max(1 if value > 0 else 0, round(TREND_BAR_WIDTH * value / peak))
+
+
+@rollover_silent
+async def trend(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    /trend [months] ["Category"]
+    Spend, plan and remaining budget for each of the last months.
+    Examples:
+      /trend
+      /trend 6
+      /trend 12 "Food & Drinks"
+    """
+    user_id = update.effective_user.id
+    args = get_args(update)
+
+    n = TREND_DEFAULT_MONTHS
+    if args and args[0].isdigit():
+        n = int(args[0])
+        args = args[1:]
+    if not 1 <= n <= TREND_MAX_MONTHS:
+        return await reply(
+            update, context, MESSAGES["trend_usage"].format(max=TREND_MAX_MONTHS)
+        )
+    category = " ".join(args).strip() or None
+
+    current = month_key()
+    months = months_ending(current, n)
+    ensure_month_budget(user_id, current)  # carry the budget forward like /status
+
+    # Three queries for the whole range, then one pass for all months
+    spent_by_month = compute_spent_by_month(user_id, months[0], months[-1])
+    planned_by_month = compute_planned_by_month(user_id, months)
+    budgets = get_budgets_between(user_id, months[0], months[-1])
+
+    known_cats = set().union(*planned_by_month.values(), *spent_by_month.values())
+    if not known_cats:
+        return await reply(update, context, MESSAGES["trend_no_data"].format(n=n))
+
+    header = dict(n=n, month_from=months[0], month_to=months[-1])
+    if category is not None:
+        if category not in known_cats:
+            text, parse_mode = _category_not_found(user_id, category, known_cats)
+            return await reply(update, context, text, parse_mode=parse_mode)
+        spent = {m: spent_by_month.get(m, {}).get(category, 0.0) for m in months}
+        planned = {m: planned_by_month[m].get(category, 0.0) for m in months}
+        remaining = {m: planned[m] - spent[m] for m in months}
+        lines = [
+            MESSAGES["trend_header_category"].format(category=category, **header),
+            MESSAGES["trend_columns_category"],
+        ]
+    else:
+        metrics = BudgetReport.metrics_by_month(
+            months, planned_by_month, spent_by_month, budgets
+        )
+        spent = {m: metrics[m].spent_total for m in months}
+        planned = {m: metrics[m].planned_total for m in months}
+        remaining = {
+            m: metrics[m].remaining_overall if m in budgets else None for m in months
+        }
+        lines = [
+            MESSAGES["trend_header"].format(**header),
+            MESSAGES["trend_columns"],
+        ]
+
+    peak = max(spent.values())
+    for m in reversed(months):
+        r = remaining[m]
+        lines.append(
+            MESSAGES["trend_row"]
+            .format(
+                month=m,
+                spent=spent[m],
+                planned=planned[m],
+                remaining=(
+                    MESSAGES["trend_no_budget"]
+                    if r is None
+                    else f"{'✅' if r >= 0 else '🚨'} {r:.2f}"
+                ),
+                bar=_trend_bar(spent[m], peak),
+            )
+            .rstrip()
+        )
+
+    total = sum(spent.values())
+    over = sum(1 for r in remaining.values() if r is not None and r < 0)
+    lines += [
+        "",
+        MESSAGES["trend_total"].format(
+            total=total, average=total / n, currency=BASE_CURRENCY
+        ),
+        MESSAGES["trend_over_months"].format(count=over, n=n),
+    ]
+    await reply(update, context, "\n".join(lines))
+
+
+def _format_year(year: str, rows, budgets: Dict[str, float]) -> str:
+    """Renders year_review rows (month rows first, then categories by spend)."""
+    month_rows = [r for r in rows if r.kind == "month"]
+    cat_rows = [r for r in rows if r.kind == "category"]
+    total_cents = month_rows[-1].running_cents
+    count = sum(r.count for r in month_rows)
+    total = total_cents / 100
+
+    lines = [
+        MESSAGES["year_header"].format(
+            year=year, month_from=month_rows[0].label, month_to=month_rows[-1].label
+        ),
+        MESSAGES["year_total"].format(total=total, count=count, currency=BASE_CURRENCY),
+        MESSAGES["year_average"].format(
+            average=total / len(month_rows), currency=BASE_CURRENCY
+        ),
+    ]
+    if budgets:
+        budget_total = sum(budgets.values())
+        remaining = budget_total - total
+        lines.append(
+            MESSAGES["year_budget"].format(
+                budget=budget_total,
+                months=len(budgets),
+                tag="✅" if remaining >= 0 else "🚨",
+                remaining=remaining,
+                currency=BASE_CURRENCY,
+            )
+        )
+    peak = max(month_rows, key=lambda r: r.cents)
+    lines.append(
+        MESSAGES["year_highest"].format(
+            month=peak.label, spent=peak.cents / 100, currency=BASE_CURRENCY
+        )
+    )
+
+    lines += ["", MESSAGES["year_by_month"]]
+    for r in month_rows:
+        if r.delta_cents is None:
+            delta = MESSAGES["year_no_delta"]
+        else:
+            delta = f"{'▲' if r.delta_cents > 0 else '▼' if r.delta_cents < 0 else '='} {abs(r.delta_cents) / 100:.2f}"
+        lines.append(
+            MESSAGES["year_month_row"]
+            .format(
+                month=r.label,
+                spent=r.cents / 100,
+                cumulative=r.running_cents / 100,
+                delta=delta,
+                bar=_trend_bar(r.cents, peak.cents),
+            )
+            .rstrip()
+        )
+
+    lines += [
+        "",
+        MESSAGES["year_top_categories"].format(
+            top_n=min(TOP_N, len(cat_rows)), total=len(cat_rows)
+        ),
+    ]
+    for rank, r in enumerate(cat_rows[:TOP_N], start=1):
+        lines.append(
+            MESSAGES["year_category_row"].format(
+                rank=rank,
+                category=r.label,
+                spent=r.cents / 100,
+                share=100 * r.cents / total_cents,
+                cumulative_share=100 * r.running_cents / total_cents,
+            )
+        )
+    return "\n".join(lines)
+
+
+@rollover_silent
+async def year(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    /year [YYYY]
+    Monthly totals, running total, month-over-month change and top
+    categories for a year (up to the current month for this year).
+    Examples:
+      /year
+      /year 2025
+    """
+    user_id = update.effective_user.id
+    args = get_args(update)
+
+    current = month_key()
+    y = args[0].strip() if args else current[:4]
+    if len(args) > 1 or not (y.isdigit() and len(y) == 4) or y > current[:4]:
+        return await reply(update, context, MESSAGES["year_usage"])
+
+    month_from = f"{y}-01"
+    month_to = current if y == current[:4] else f"{y}-12"
+    if y == current[:4]:
+        ensure_month_budget(user_id, current)
+
+    # One statement: monthly totals, running sums, LAG deltas and category ranks
+    rows = year_review(user_id, month_from, month_to)
+    if not any(r.kind == "category" for r in rows):
+        return await reply(update, context, MESSAGES["year_no_data"].format(year=y))
+
+    budgets = get_budgets_between(user_id, month_from, month_to)
+    await reply(update, context, _format_year(y, rows, budgets))
+
+
+@rollover_silent
+async def heatmap(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    /heatmap [range]
+    When spending happens: spend per weekday x hour of day, from one grouped
+    query over the range (default: the last HEATMAP_DEFAULT_DAYS days).
+    Examples:
+      /heatmap
+      /heatmap 30d
+      /heatmap 2025-12
+      /heatmap 2025
+      /heatmap 2025-01-01..2025-06-30
+    """
+    user_id = update.effective_user.id
+    args = get_args(update)
+    if len(args) > 1:
+        return await reply(update, context, MESSAGES["heatmap_usage"])
+
+    if args:
+        parsed = _range_arg(args[0].strip())
+        if parsed is None:
+            return await reply(update, context, MESSAGES["heatmap_usage"])
+        date_from, date_to, label = parsed
+    else:
+        date_from, date_to = recent_days_range(f"{HEATMAP_DEFAULT_DAYS}d")
+        label = MESSAGES["range_label_last_days"].format(days=HEATMAP_DEFAULT_DAYS)
+
+    cells = spend_heatmap(user_id, *ts_range_for_days(date_from, date_to))
+    header = MESSAGES["heatmap_header"].format(
+        label=label, date_from=date_from.isoformat(), date_to=date_to.isoformat()
+    )
+    if not cells:
+        return await reply(
+            update, context, "\n".join([header, MESSAGES["heatmap_no_data"]])
+        )
+    await reply(update, context, _format_heatmap(header, cells), parse_mode="Markdown")
+
+
+@rollover_silent
+async def top(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    /top [range] [N]
+    The N payees (normalised expense names) with the most spend in the range
+    (default: this year so far), from one grouped query over the payee index.
+    Examples:
+      /top
+      /top 20
+      /top 2025
+      /top 30d 5
+      /top 2025-01-01..2025-06-30
+    """
+    user_id = update.effective_user.id
+    args = get_args(update)
+    if len(args) > 2:
+        return await reply(update, context, MESSAGES["top_usage"])
+
+    today = date.today()
+    date_from, date_to, label = date(today.year, 1, 1), today, str(today.year)
+    limit = TOP_PAYEES_DEFAULT
+    for a in (a.strip() for a in args):
+        if a.isdigit() and len(a) < 4:
+            limit = int(a)
+            if not 1 <= limit <= TOP_PAYEES_MAX:
+                return await reply(update, context, MESSAGES["top_usage"])
+            continue
+        parsed = _range_arg(a)
+        if parsed is None:
+            return await reply(update, context, MESSAGES["top_usage"])
+        date_from, date_to, label = parsed
+
+    rows = top_payees(user_id, *ts_range_for_days(date_from, date_to), limit)
+    lines = [
+        MESSAGES["top_header"].format(
+            label=label, date_from=date_from.isoformat(), date_to=date_to.isoformat()
+        )
+    ]
+    if not rows:
+        lines.append(MESSAGES["top_no_data"])
+        return await reply(update, context, "\n".join(lines))
+
+    total = rows[0].total_cents
+    lines.append("")
+    for rank, r in enumerate(rows, start=1):
+        lines.append(
+            MESSAGES["top_row"].format(
+                rank=rank,
+                payee=r.payee,
+                spent=r.cents / 100,
+                count=r.count,
+                share=100 * r.cents / total if total else 0.0,
+                currency=BASE_CURRENCY,
+            )
+        )
+    shown = sum(r.cents for r in rows)
+    lines += [
+        "",
+        MESSAGES["top_total"].format(
+            shown=len(rows),
+            payees=rows[0].payees,
+            spent=shown / 100,
+            total=total / 100,
+            share=100 * shown / total if total else 0.0,
+            currency=BASE_CURRENCY,
+        ),
+    ]
+    await reply(update, context, "\n".join(lines))
+
+
+def _range_arg(token: str) -> Tuple[date, date, str] | None:
+    """
+    (first day, last day, label) of a day range argument of /heatmap and
+    /top: week, <N>d, YYYY-MM-DD..YYYY-MM-DD, YYYY-MM or YYYY. None if the
+    token is not a range or its year is outside MIN_YEAR..MAX_YEAR.
+    """
+    day_range = recent_days_range(token)
+    if day_range is not None:
+        label = MESSAGES["range_labels"].get(token.lower())
+        if label is None:
+            label = MESSAGES["range_label_last_days"].format(
+                days=(day_range[1] - day_range[0]).days + 1
+            )
+        return *day_range, label
+    day_range = parse_day_range(token)
+    if day_range is not None:
+        return *day_range, token
+    if len(token) == 7 and token[4] == "-" and token.replace("-", "").isdigit():
+        year, month = int(token[:4]), int(token[5:])
+        if 1 <= month <= 12 and MIN_YEAR <= year <= MAX_YEAR:
+            last = days_in_month(token)
+            return date(year, month, 1), date(year, month, last), token
+    if len(token) == 4 and token.isdigit() and MIN_YEAR <= int(token) <= MAX_YEAR:
+        return date(int(token), 1, 1), date(int(token), 12, 31), token
+    return None
+
+
+def _format_heatmap(header: str, cells) -> str:
+    """Weekday x hour grid shaded relative to the busiest slot, plus the peaks."""
+    grid = [[0] * 24 for _ in range(7)]
+    counts = [[0] * 24 for _ in range(7)]
+    for c in cells:
+        grid[c.weekday][c.hour] = c.cents
+        counts[c.weekday][c.hour] = c.count
+
+    peak = max(max(row) for row in grid)
+    total = sum(map(sum, grid))
+    weekdays = MESSAGES["heatmap_weekdays"]
+
+    lines = [header, "", "```"]
+    lines.append(" " * 4 + "".join(f"{h:<6}" for h in range(0, 24, 6)).rstrip())
+    for w, row in enumerate(grid):
+        shades = "".join(
+            HEATMAP_SHADES[0 if v <= 0 else min(4, -(-4 * v // peak))] for v in row
+        )
+        lines.append(f"{weekdays[w]:<4}{shades}")
+    lines.append("```")
+
+    top_w, top_h = max(
+        ((w, h) for w in range(7) for h in range(24)), key=lambda wh: grid[wh[0]][wh[1]]
+    )
+    by_weekday = [sum(row) for row in grid]
+    by_hour = [sum(row[h] for row in grid) for h in range(24)]
+    busiest_day = max(range(7), key=by_weekday.__getitem__)
+    busiest_hour = max(range(24), key=by_hour.__getitem__)
+    lines += [
+        MESSAGES["heatmap_busiest_slot"].format(
+            weekday=weekdays[top_w],
+            hour=top_h,
+            next_hour=top_h + 1,
+            spent=peak / 100,
+            count=counts[top_w][top_h],
+            currency=BASE_CURRENCY,
+        ),
+        MESSAGES["heatmap_busiest_day"].format(
+            weekday=weekdays[busiest_day],
+            share=100 * by_weekday[busiest_day] / total,
+        ),
+        MESSAGES["heatmap_busiest_hour"].format(
+            hour=busiest_hour,
+            next_hour=busiest_hour + 1,
+            share=100 * by_hour[busiest_hour] / total,
+        ),
+        MESSAGES["heatmap_total"].format(
+            total=total / 100,
+            count=sum(map(sum, counts)),
+            currency=BASE_CURRENCY,
+        ),
+    ]
+    return "\n".join(lines)
+
+
 @rollover_silent
 async def categories(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
@@ -378,24 +991,22 @@ async def categories(update: Update, context: ContextTypes.DEFAULT_TYPE):
     planned_by_cat, _ = compute_planned_monthly_from_rules(user_id, m)
     spent_by_cat, _ = compute_spent_this_month(user_id, m)
 
-    cats = sorted(set(planned_by_cat.keys()) | set(spent_by_cat.keys()))
-    if not cats:
+    summary = summarize_budget(planned_by_cat, spent_by_cat)
+    if not summary.categories:
         return await reply(
             update, context, MESSAGES["categories_no_categories"].format(month=m)
         )
 
     # Optional: show which are planned vs unplanned
     lines = [MESSAGES["categories_header"].format(month=m)]
-    for c in cats:
-        planned = planned_by_cat.get(c, 0.0) > 0.0
-        spent = spent_by_cat.get(c, 0.0) > 0.0
-        if planned:
+    for line in sorted(summary.lines(), key=lambda x: x.category):
+        if line.is_planned:
             tag = "planned"
-        elif spent:
+        elif line.spent > 0.0:
             tag = "unplanned"
         else:
             tag = ""
-        lines.append(f"- {c}" + (f" ({tag})" if tag else ""))
+        lines.append(f"- {line.category}" + (f" ({tag})" if tag else ""))
 
     lines.append("")
     lines.append(MESSAGES["categories_tip"])
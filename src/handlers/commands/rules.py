@@ -2,7 +2,6 @@ from .base import *
 from db.services import (
     add_rule,
     delete_rule,
-    list_rules,
     parse_amount,
     looks_like_currency,
     add_rule_named_fx,
@@ -10,7 +9,7 @@ from db.services import (
     month_key,
 )
 
-from ..pagination_callbacks import _format_rules_page
+from ..pagination_callbacks import render_rules_page, rules_cursor
 from utils.validators import (
     validate_budget,
     validate_amount,
@@ -281,48 +280,14 @@ async def setmonthly(update: Update, context: ContextTypes.DEFAULT_TYPE):
 @rollover_silent
 async def rules(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.effective_user.id
-    rows = list_rules(user_id)
-    if not rows:
-        return await reply(update, context, MESSAGES["no_rules"])
-
-    # Setup pagination
-    from utils.pagination import PaginationState
-    from telegram import InlineKeyboardButton, InlineKeyboardMarkup
-    from utils.pagination import get_pagination_buttons
-
-    state = PaginationState(items=rows, items_per_page=10, callback_prefix="rules")
-
-    # Format first page with grouped display
-    page_text = _format_rules_page(state)
-
-    # Add pagination info if needed
-    if state.total_pages > 1:
-        buttons_data, footer = get_pagination_buttons(
-            prefix="rules",
-            current_page=state.current_page,
-            total_pages=state.total_pages,
-            has_previous=state.has_previous,
-            has_next=state.has_next,
-        )
-        page_text += f"\n\n{footer}"
-
-        # Build keyboard
-        keyboard = []
-        if buttons_data:
-            button_row = []
-            for label, callback in buttons_data:
-                button_row.append(InlineKeyboardButton(label, callback_data=callback))
-            keyboard.append(button_row)
-
-        reply_markup = InlineKeyboardMarkup(keyboard) if keyboard else None
 
-        # Store pagination state
-        context.user_data["rules_pagination"] = state.to_dict()
+    # Render the first page; later pages are fetched by the button callbacks
+    page = render_rules_page(user_id, rules_cursor())
+    if page is None:
+        return await reply(update, context, MESSAGES["no_rules"])
 
-        await reply(update, context, page_text, reply_markup=reply_markup)
-    else:
-        # No pagination needed
-        await reply(update, context, page_text)
+    page_text, reply_markup = page
+    await reply(update, context, page_text, reply_markup=reply_markup)
 
 
 @rollover_notify
@@ -0,0 +1,84 @@
+from .base import *
+from db.services import build_fts_query, save_search, summarize_search
+from ..pagination_callbacks import render_search_page, search_cursor, search_title
+
+
+# Load messages from YAML file using relative path
+_current_dir = Path(__file__).parent
+_messages_path = _current_dir / "messages" / "search.yaml"
+with open(_messages_path, "r") as file:
+    MESSAGES = yaml.safe_load(file)
+
+
+def _is_month_token(t: str) -> bool:
+    return len(t) == 7 and t[4] == "-" and t[:4].isdigit() and t[5:].isdigit()
+
+
+def _parse_month_range(t: str) -> tuple[str, str] | None:
+    """'2025-01..2025-06' -> ('2025-01', '2025-06'); '2025-03' -> ('2025-03', '2025-03')."""
+    if _is_month_token(t):
+        return t, t
+    start, sep, end = t.partition("..")
+    if not sep:
+        return None
+    if (start and not _is_month_token(start)) or (end and not _is_month_token(end)):
+        return None
+    if not start and not end:
+        return None
+    return start or None, end or None
+
+
+@rollover_silent
+async def search(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    /search <terms> [YYYY-MM..YYYY-MM] [category]
+
+    Full-text search over expense names and categories, best matches first.
+    Arguments after the month range are taken as the category filter.
+
+    Examples:
+      /search migros
+      /search taxi 2025-01..2025-12
+      /search coffee 2025-12 "Food & Drinks"
+    """
+    user_id = update.effective_user.id
+    args = get_args(update)
+
+    terms = []
+    month_from = month_to = None
+    category = None
+
+    for i, a in enumerate(args):
+        if ".." in a or _is_month_token(a):
+            month_range = _parse_month_range(a)
+            if month_range is None:
+                return await reply(update, context, MESSAGES["invalid_range"])
+            month_from, month_to = month_range
+            category = " ".join(args[i + 1 :]).strip() or None
+            break
+        terms.append(a)
+
+    terms_text = " ".join(terms).strip()
+    match = build_fts_query(terms)
+    if not match:
+        return await reply(update, context, MESSAGES["usage_search"])
+
+    title = search_title(terms_text, month_from, month_to, category)
+    total_count, _ = summarize_search(
+        user_id, match, month_from=month_from, month_to=month_to, category=category
+    )
+    if not total_count:
+        return await reply(
+            update, context, MESSAGES["search_no_results"].format(title=title)
+        )
+
+    # Buttons refer to the search by id: the terms may not fit in callback_data
+    search_id = save_search(user_id, terms_text, month_from, month_to, category)
+    page = render_search_page(user_id, search_cursor(search_id))
+    if page is None:
+        return await reply(
+            update, context, MESSAGES["search_no_results"].format(title=title)
+        )
+
+    page_text, reply_markup = page
+    await reply(update, context, page_text, reply_markup=reply_markup)
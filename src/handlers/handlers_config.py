@@ -8,7 +8,7 @@ making it easy to add, modify, or remove commands without touching main.py.
 from dataclasses import dataclass
 from typing import Callable, Awaitable
 from telegram import Update
-from telegram.ext import ContextTypes, CallbackQueryHandler
+from telegram.ext import ContextTypes, CallbackQueryHandler, MessageHandler, filters
 
 
 @dataclass
@@ -70,19 +70,35 @@ class HandlersRegistry:
         return None
 
     def get_pagination_handlers(self) -> list[CallbackQueryHandler]:
-        """Get all pagination callback handlers for expenses and rules."""
-        from .pagination_callbacks import (
-            expenses_pagination_prev,
-            expenses_pagination_next,
-            rules_pagination_prev,
-            rules_pagination_next,
-        )
+        """Get the pagination callback handler shared by expenses and rules."""
+        from .pagination_callbacks import pagination_callback
+        from utils.pagination import CALLBACK_PREFIX
+
+        return [
+            CallbackQueryHandler(pagination_callback, pattern=f"^{CALLBACK_PREFIX}:"),
+        ]
+
+    def get_callback_handlers(self) -> list[CallbackQueryHandler]:
+        """Get handlers for the other inline buttons ("did you mean" on /add)."""
+        from handlers import add_category_choice
+        from handlers.commands.expenses import ADD_CALLBACK_PREFIX
+
+        return [
+            CallbackQueryHandler(
+                add_category_choice, pattern=f"^{ADD_CALLBACK_PREFIX}:"
+            ),
+        ]
+
+    def get_message_handlers(self) -> list[MessageHandler]:
+        """Get handlers for non-command messages (CSV uploads captioned /import)."""
+        from handlers import import_document
 
         return [
-            CallbackQueryHandler(expenses_pagination_prev, pattern="^expenses_prev$"),
-            CallbackQueryHandler(expenses_pagination_next, pattern="^expenses_next$"),
-            CallbackQueryHandler(rules_pagination_prev, pattern="^rules_prev$"),
-            CallbackQueryHandler(rules_pagination_next, pattern="^rules_next$"),
+            MessageHandler(
+                filters.Document.FileExtension("csv")
+                & filters.CaptionRegex(r"^/import(@\w+)?\b"),
+                import_document,
+            ),
         ]
 
 
@@ -107,10 +123,21 @@ def create_handlers_config() -> HandlersRegistry:
         undo,
         expenses,
         delexpense,
+        search,
+        recurring,
+        delrecurring,
         status,
         categories,
+        trend,
+        year,
+        forecast,
+        heatmap,
+        top,
+        chart,
+        renamecategory,
         export,
         backupdb,
+        import_command,
         resetmonth,
         resetall,
     )
@@ -133,16 +160,27 @@ def create_handlers_config() -> HandlersRegistry:
     # Status & Report commands
     registry.register("status", status, aliases=["s", "m"])
     registry.register("categories", categories, aliases=["c"])
+    registry.register("trend", trend, aliases=["t"])
+    registry.register("year", year, aliases=["y"])
+    registry.register("forecast", forecast, aliases=["fc"])
+    registry.register("heatmap", heatmap, aliases=["hm"])
+    registry.register("top", top, aliases=["tp"])
+    registry.register("chart", chart, aliases=["ch"])
+    registry.register("renamecategory", renamecategory, aliases=["rnc"])
 
     # Expenses commands
     registry.register("add", add, aliases=["a"])
     registry.register("undo", undo, aliases=["u"])
     registry.register("expenses", expenses, aliases=["e"])
     registry.register("delexpense", delexpense, aliases=["d"])
+    registry.register("search", search, aliases=["f"])
+    registry.register("recurring", recurring, aliases=["rc"])
+    registry.register("delrecurring", delrecurring, aliases=["drc"])
 
     # Export and backup commands
     registry.register("export", export)
     registry.register("backupdb", backupdb)
+    registry.register("import", import_command)
 
     # Reset commands
     registry.register("resetmonth", resetmonth, aliases=["rm"])
@@ -0,0 +1,64 @@
+"""
+Scheduled background jobs (python-telegram-bot JobQueue).
+
+Jobs run their database work in a worker thread so interactive updates keep
+being served while they run.
+"""
+
+import asyncio
+import logging
+from datetime import date, time
+
+from telegram.ext import Application, ContextTypes
+
+from db.services import materialize_recurring_expenses
+from utils.anomalies import recompute_category_stats
+from utils.categorize import forget_category_index
+
+logger = logging.getLogger(__name__)
+
+RECURRING_JOB_INTERVAL = 3600  # seconds; catches up after downtime on first run
+CATEGORY_STATS_JOB_TIME = time(3, 30)  # nightly, local time
+
+
+async def materialize_recurring_job(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Add every due recurring expense occurrence for all users."""
+    today = date.today().isoformat()
+    inserted = await asyncio.to_thread(materialize_recurring_expenses, today)
+    # The in-memory indexes are only touched from the event loop
+    for user_id in inserted:
+        forget_category_index(user_id)
+    if inserted:
+        logger.info(
+            f"Materialized {sum(inserted.values())} recurring expense(s) "
+            f"for {len(inserted)} user(s) up to {today}"
+        )
+
+
+async def recompute_category_stats_job(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Rebuild the anomaly statistics exactly, correcting incremental drift."""
+    categories = await asyncio.to_thread(recompute_category_stats)
+    logger.info(f"Recomputed amount statistics of {categories} categories")
+
+
+def schedule_jobs(app: Application) -> None:
+    """Register repeating jobs; needs python-telegram-bot[job-queue]."""
+    if app.job_queue is None:
+        logger.warning(
+            "JobQueue not available (install python-telegram-bot[job-queue]); "
+            "recurring expenses are only added when /recurring is used and "
+            "anomaly statistics are not recomputed nightly"
+        )
+        return
+
+    app.job_queue.run_repeating(
+        materialize_recurring_job,
+        interval=RECURRING_JOB_INTERVAL,
+        first=10,
+        name="materialize_recurring",
+    )
+    app.job_queue.run_daily(
+        recompute_category_stats_job,
+        time=CATEGORY_STATS_JOB_TIME,
+        name="recompute_category_stats",
+    )
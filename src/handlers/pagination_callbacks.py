@@ -1,276 +1,373 @@
 """
-Pagination callback handlers for inline buttons in expenses and rules lists.
+Pagination callback handler for inline buttons in expenses and rules lists.
 
-This module handles the Previous/Next button callbacks for pagination
-in the expenses and rules commands.
+Every pagination button carries a PageCursor in its callback_data, so a
+single handler can render any page of any list straight from the database.
+No list state is kept per user.
 """
 
+import logging
+from typing import Optional, Tuple
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.error import BadRequest
 from telegram.ext import ContextTypes
-from utils.pagination import PaginationState, get_pagination_buttons, get_period_emoji
+from utils.pagination import (
+    PageCursor,
+    category_token,
+    get_pagination_buttons,
+    get_period_emoji,
+    total_pages_for,
+)
+from db.services import (
+    parse_day_range,
+    ts_range_for_days,
+    count_rules,
+    list_expense_categories,
+    list_expenses_filtered,
+    list_rules,
+    summarize_expenses,
+    build_fts_query,
+    get_saved_search,
+    search_expenses,
+    summarize_search,
+)
 from pathlib import Path
 from config import BASE_CURRENCY
 import yaml
 
+logger = logging.getLogger(__name__)
+
 # Load messages from YAML files using relative path
 _current_dir = Path(__file__).parent
 _expenses_messages_path = _current_dir / "commands" / "messages" / "expenses.yaml"
 _rules_messages_path = _current_dir / "commands" / "messages" / "rules.yaml"
+_search_messages_path = _current_dir / "commands" / "messages" / "search.yaml"
 
 with open(_expenses_messages_path, "r") as file:
     EXPENSES_MESSAGES = yaml.safe_load(file)
 with open(_rules_messages_path, "r") as file:
     RULES_MESSAGES = yaml.safe_load(file)
+with open(_search_messages_path, "r") as file:
+    SEARCH_MESSAGES = yaml.safe_load(file)
+
+EXPENSES_PER_PAGE = 10
+RULES_PER_PAGE = 10
+SEARCH_RESULTS_PER_PAGE = 10
 
 
-async def expenses_pagination_prev(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Handle Previous button click for expenses pagination."""
+async def pagination_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle any pagination button (Previous, Next or page jump)."""
     query = update.callback_query
     user_id = update.effective_user.id
 
-    # Get the stored pagination state
-    state_dict = context.user_data.get("expenses_pagination", {})
-    if not state_dict:
-        await query.answer(
-            "Pagination state not found. Please refresh by running /expenses again."
-        )
+    cursor = PageCursor.decode(query.data)
+    if cursor is None:
+        # Page indicator button
+        await query.answer()
         return
 
-    # Restore state from dict
-    state = PaginationState.from_dict(state_dict)
-
-    # Go to previous page
-    if not state.previous_page():
-        await query.answer("Already at first page")
+    if cursor.kind == "e":
+        page = render_expenses_page(user_id, cursor)
+    elif cursor.kind == "r":
+        page = render_rules_page(user_id, cursor)
+    elif cursor.kind == "s":
+        page = render_search_page(user_id, cursor)
+    else:
+        page = None
+
+    if page is None:
+        await query.answer("This list has changed. Please run the command again.")
         return
 
-    # Format the page (not first page anymore)
-    page_text = _format_expenses_page(state, is_first_page=False)
-
-    # Get pagination buttons
-    buttons_data, footer = get_pagination_buttons(
-        prefix="expenses",
-        current_page=state.current_page,
-        total_pages=state.total_pages,
-        has_previous=state.has_previous,
-        has_next=state.has_next,
-    )
-    page_text += f"\n\n{footer}"
-
-    # Build keyboard
-    keyboard = []
-    if buttons_data:
-        button_row = []
-        for label, callback in buttons_data:
-            button_row.append(InlineKeyboardButton(label, callback_data=callback))
-        keyboard.append(button_row)
-
-    reply_markup = InlineKeyboardMarkup(keyboard) if keyboard else None
+    page_text, reply_markup = page
 
     # Update the message
     try:
         await query.edit_message_text(page_text, reply_markup=reply_markup)
     except Exception as e:
-        await query.answer(f"Error updating message: {str(e)}")
-
-    # Save updated state
-    context.user_data["expenses_pagination"] = state.to_dict()
+        # A repeated tap on the same button leaves the text unchanged
+        if not (isinstance(e, BadRequest) and "not modified" in str(e).lower()):
+            logger.warning(f"Failed to update page {query.data}: {e}")
+            await query.answer(
+                "Couldn't update this list. Please run the command again."
+            )
+            return
 
     await query.answer()
 
 
-async def expenses_pagination_next(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Handle Next button click for expenses pagination."""
-    query = update.callback_query
-    user_id = update.effective_user.id
+def _build_keyboard(button_rows) -> InlineKeyboardMarkup | None:
+    keyboard = [
+        [InlineKeyboardButton(label, callback_data=data) for label, data in row]
+        for row in button_rows
+        if row
+    ]
+    return InlineKeyboardMarkup(keyboard) if keyboard else None
 
-    # Get the stored pagination state
-    state_dict = context.user_data.get("expenses_pagination", {})
-    if not state_dict:
-        await query.answer(
-            "Pagination state not found. Please refresh by running /expenses again."
-        )
-        return
 
-    # Restore state from dict
-    state = PaginationState.from_dict(state_dict)
+def expenses_cursor(scope: str, category: str | None = None) -> PageCursor:
+    """
+    Cursor of the first page of /expenses for a scope and optional category.
+    The scope is a month (YYYY-MM) or a day range (YYYY-MM-DD..YYYY-MM-DD).
+    """
+    return PageCursor(kind="e", scope=scope, category=category_token(category))
 
-    # Go to next page
-    if not state.next_page():
-        await query.answer("Already at last page")
-        return
 
-    # Format the page (not first page anymore)
-    page_text = _format_expenses_page(state, is_first_page=False)
+def _expenses_scope(scope: str):
+    """Returns (month, ts_range) for list queries, or None if the scope is invalid."""
+    if ".." not in scope:
+        return scope, None
+    day_range = parse_day_range(scope)
+    if day_range is None:
+        return None
+    return None, ts_range_for_days(*day_range)
+
 
-    # Get pagination buttons
-    buttons_data, footer = get_pagination_buttons(
-        prefix="expenses",
-        current_page=state.current_page,
-        total_pages=state.total_pages,
-        has_previous=state.has_previous,
-        has_next=state.has_next,
+def render_expenses_page(
+    user_id: int, cursor: PageCursor, *, category: str | None = None
+) -> Optional[Tuple[str, InlineKeyboardMarkup | None]]:
+    """
+    Fetch and format the expenses page addressed by `cursor`.
+
+    `category` is the filter in clear text; when omitted it is resolved from
+    the token in the cursor. Returns None if the page does not exist (anymore).
+    """
+    scope = _expenses_scope(cursor.scope)
+    if scope is None:
+        return None
+    month, ts_range = scope
+
+    if category is None and cursor.category:
+        category = _resolve_category(user_id, month, ts_range, cursor.category)
+        if category is None:
+            return None
+
+    total_count, total_amount = summarize_expenses(
+        user_id, month, category=category, ts_range=ts_range
+    )
+    if not total_count:
+        return None
+
+    rows = list_expenses_filtered(
+        user_id,
+        month,
+        limit=EXPENSES_PER_PAGE,
+        category=category,
+        before_id=cursor.before_id,
+        after_id=cursor.after_id,
+        offset=0 if cursor.anchor else cursor.page * EXPENSES_PER_PAGE,
+        ts_range=ts_range,
+    )
+    if not rows:
+        return None
+
+    # Rows may have been deleted since the button was drawn
+    total_pages = total_pages_for(total_count, EXPENSES_PER_PAGE)
+    cursor = cursor.at(min(cursor.page, total_pages - 1), cursor.anchor)
+
+    page_text = _format_expenses_page(
+        rows,
+        month=cursor.scope,
+        category=category,
+        total_count=total_count,
+        total_amount=total_amount,
+        is_first_page=cursor.page == 0,
+    )
+
+    button_rows, footer = get_pagination_buttons(
+        cursor,
+        total_pages,
+        first_id=rows[0].id,
+        last_id=rows[-1].id,
     )
     page_text += f"\n\n{footer}"
 
-    # Build keyboard
-    keyboard = []
-    if buttons_data:
-        button_row = []
-        for label, callback in buttons_data:
-            button_row.append(InlineKeyboardButton(label, callback_data=callback))
-        keyboard.append(button_row)
+    return page_text, _build_keyboard(button_rows)
 
-    reply_markup = InlineKeyboardMarkup(keyboard) if keyboard else None
 
-    # Update the message
-    try:
-        await query.edit_message_text(page_text, reply_markup=reply_markup)
-    except Exception as e:
-        await query.answer(f"Error updating message: {str(e)}")
+def _resolve_category(
+    user_id: int, month: str | None, ts_range, token: str
+) -> str | None:
+    """Map a category token from callback_data back to the category name."""
+    for c in list_expense_categories(user_id, month, ts_range=ts_range):
+        if category_token(c) == token:
+            return c
+    return None
 
-    # Save updated state
-    context.user_data["expenses_pagination"] = state.to_dict()
 
-    await query.answer()
+def rules_cursor() -> PageCursor:
+    """Cursor of the first page of /rules."""
+    return PageCursor(kind="r")
 
 
-async def rules_pagination_prev(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Handle Previous button click for rules pagination."""
-    query = update.callback_query
+def render_rules_page(
+    user_id: int, cursor: PageCursor
+) -> Optional[Tuple[str, InlineKeyboardMarkup | None]]:
+    """
+    Fetch and format the rules page addressed by `cursor`.
+    Returns None if the page does not exist (anymore).
+    """
+    total_count = count_rules(user_id)
+    if not total_count:
+        return None
 
-    # Get the stored pagination state
-    state_dict = context.user_data.get("rules_pagination", {})
-    if not state_dict:
-        await query.answer(
-            "Pagination state not found. Please refresh by running /rules again."
-        )
-        return
+    total_pages = total_pages_for(total_count, RULES_PER_PAGE)
+    cursor = cursor.at(min(cursor.page, total_pages - 1))
 
-    # Restore state from dict
-    state = PaginationState.from_dict(state_dict)
+    rows = list_rules(
+        user_id, limit=RULES_PER_PAGE, offset=cursor.page * RULES_PER_PAGE
+    )
 
-    # Go to previous page
-    if not state.previous_page():
-        await query.answer("Already at first page")
-        return
+    # Format page with grouped display
+    page_text = _format_rules_page(rows, is_first_page=cursor.page == 0)
 
-    # Format the page
-    page_text = _format_rules_page(state, is_first_page=False)
+    # No pagination needed
+    if total_pages == 1:
+        return page_text, None
 
-    # Get pagination buttons
-    buttons_data, footer = get_pagination_buttons(
-        prefix="rules",
-        current_page=state.current_page,
-        total_pages=state.total_pages,
-        has_previous=state.has_previous,
-        has_next=state.has_next,
-    )
+    button_rows, footer = get_pagination_buttons(cursor, total_pages)
     page_text += f"\n\n{footer}"
 
-    # Build keyboard
-    keyboard = []
-    if buttons_data:
-        button_row = []
-        for label, callback in buttons_data:
-            button_row.append(InlineKeyboardButton(label, callback_data=callback))
-        keyboard.append(button_row)
+    return page_text, _build_keyboard(button_rows)
 
-    reply_markup = InlineKeyboardMarkup(keyboard) if keyboard else None
 
-    # Update the message
-    try:
-        await query.edit_message_text(page_text, reply_markup=reply_markup)
-    except Exception as e:
-        await query.answer(f"Error updating message: {str(e)}")
+def search_cursor(search_id: int) -> PageCursor:
+    """Cursor of the first page of results of a saved search."""
+    return PageCursor(kind="s", scope=str(search_id))
 
-    # Save updated state
-    context.user_data["rules_pagination"] = state.to_dict()
 
-    await query.answer()
+def render_search_page(
+    user_id: int, cursor: PageCursor
+) -> Optional[Tuple[str, InlineKeyboardMarkup | None]]:
+    """
+    Fetch and format the page of search results addressed by `cursor`.
 
+    Results are ordered by bm25 rank, which has to score the whole match set
+    anyway, so pages are addressed by number rather than by an id anchor.
+    Returns None if the search or the page does not exist (anymore).
+    """
+    try:
+        search = get_saved_search(user_id, int(cursor.scope))
+    except ValueError:
+        return None
+    if search is None:
+        return None
+
+    match = build_fts_query([search["terms"]])
+    filters = dict(
+        month_from=search["month_from"] or None,
+        month_to=search["month_to"] or None,
+        category=search["category"] or None,
+    )
 
-async def rules_pagination_next(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Handle Next button click for rules pagination."""
-    query = update.callback_query
+    total_count, total_amount = summarize_search(user_id, match, **filters)
+    if not total_count:
+        return None
 
-    # Get the stored pagination state
-    state_dict = context.user_data.get("rules_pagination", {})
-    if not state_dict:
-        await query.answer(
-            "Pagination state not found. Please refresh by running /rules again."
-        )
-        return
+    total_pages = total_pages_for(total_count, SEARCH_RESULTS_PER_PAGE)
+    cursor = cursor.at(min(cursor.page, total_pages - 1))
 
-    # Restore state from dict
-    state = PaginationState.from_dict(state_dict)
+    rows = search_expenses(
+        user_id,
+        match,
+        limit=SEARCH_RESULTS_PER_PAGE,
+        offset=cursor.page * SEARCH_RESULTS_PER_PAGE,
+        **filters,
+    )
 
-    # Go to next page
-    if not state.next_page():
-        await query.answer("Already at last page")
-        return
+    lines = [
+        SEARCH_MESSAGES["search_summary"].format(
+            title=search_title(
+                search["terms"],
+                filters["month_from"],
+                filters["month_to"],
+                filters["category"],
+            ),
+            count=total_count,
+            total=total_amount,
+            currency=BASE_CURRENCY,
+        ),
+        "",
+    ]
+    lines += [_format_expense_line(r) for r in rows]
 
-    # Format the page
-    page_text = _format_rules_page(state, is_first_page=False)
+    if cursor.page == 0:
+        lines.append("")
+        lines.append(EXPENSES_MESSAGES["expenses_delete_tip"])
 
-    # Get pagination buttons
-    buttons_data, footer = get_pagination_buttons(
-        prefix="rules",
-        current_page=state.current_page,
-        total_pages=state.total_pages,
-        has_previous=state.has_previous,
-        has_next=state.has_next,
-    )
+    page_text = "\n".join(lines)
+
+    button_rows, footer = get_pagination_buttons(cursor, total_pages)
     page_text += f"\n\n{footer}"
 
-    # Build keyboard
-    keyboard = []
-    if buttons_data:
-        button_row = []
-        for label, callback in buttons_data:
-            button_row.append(InlineKeyboardButton(label, callback_data=callback))
-        keyboard.append(button_row)
+    return page_text, _build_keyboard(button_rows)
+
+
+def search_title(
+    terms: str,
+    month_from: str | None,
+    month_to: str | None,
+    category: str | None,
+) -> str:
+    """Heading of a search results page."""
+    if month_from and month_from == month_to:
+        period = f" in {month_from}"
+    elif month_from or month_to:
+        period = f" in {month_from or '…'}..{month_to or '…'}"
+    else:
+        period = ""
+    return SEARCH_MESSAGES["search_title"].format(
+        terms=terms,
+        period=period,
+        category=f' — "{category}"' if category else "",
+    )
 
-    reply_markup = InlineKeyboardMarkup(keyboard) if keyboard else None
 
-    # Update the message
-    try:
-        await query.edit_message_text(page_text, reply_markup=reply_markup)
-    except Exception as e:
-        await query.answer(f"Error updating message: {str(e)}")
-
-    # Save updated state
-    context.user_data["rules_pagination"] = state.to_dict()
+def _format_expense_line(r) -> str:
+    """Format a single expense as a list line."""
+    created = (r.created_at or "")[:19].replace("T", " ")
 
-    await query.answer()
+    if r.currency == BASE_CURRENCY:
+        return f"[{r.id:4d}] [{r.category}] {r.name:<30} {r.chf_amount:>8.2f} {BASE_CURRENCY} ({created})"
+    return f"[{r.id:4d}] [{r.category}] {r.name:<30} {r.original_amount:>8.2f} {r.currency} → {r.chf_amount:>8.2f} {BASE_CURRENCY} ({created})"
 
 
-def _format_expenses_page(state: PaginationState, is_first_page: bool = True) -> str:
+def _format_expenses_page(
+    rows,
+    *,
+    month: str,
+    category: str | None,
+    total_count: int,
+    total_amount: float,
+    is_first_page: bool = True,
+) -> str:
     """
-    Format a single page of expenses from pagination state.
+    Format a single page of expenses.
 
     Args:
-        state: PaginationState with all expenses
+        rows: Expenses on the current page
+        month: Month (YYYY-MM) or day range shown in the title
+        category: Category filter, if any
+        total_count: Number of expenses across all pages
+        total_amount: Sum of expenses across all pages
         is_first_page: Whether this is the first page (shows tips at end)
 
     Returns:
         Formatted page content
     """
-    rows = state.current_page_items
 
     title = EXPENSES_MESSAGES["expenses_title"].format(
-        month=state.filter_month or "current",
-        category=f' — "{state.filter_category}"' if state.filter_category else "",
+        month=month or "current",
+        category=f' — "{category}"' if category else "",
     )
 
     if not rows:
         return EXPENSES_MESSAGES["expenses_no_rows"].format(title=title)
 
     # Calculate per-page total
-    page_total = sum(float(r["chf_amount"]) for r in rows)
+    page_total = sum(r.chf_amount for r in rows)
 
-    # Calculate grand total from all items
-    grand_total = sum(float(r["chf_amount"]) for r in state.items)
+    grand_total = total_amount
 
     lines = [
         EXPENSES_MESSAGES["expenses_summary"].format(
@@ -282,62 +379,46 @@ def _format_expenses_page(state: PaginationState, is_first_page: bool = True) ->
     ]
 
     # Add grand total if there are more items than shown on this page
-    if grand_total != page_total:
+    if total_count > len(rows):
         lines.append(f"📊 Total (all pages): {grand_total:.2f} {BASE_CURRENCY}")
 
     lines.append("")
 
     for r in rows:
-        eid = r["id"]
-        cat = r["category"]
-        name = r["name"]
-        cur = r["currency"]
-        orig = float(r["original_amount"])
-        chf = float(r["chf_amount"])
-        created = (r["created_at"] or "")[:19].replace("T", " ")
-
-        if cur == BASE_CURRENCY:
-            lines.append(
-                f"[{eid:4d}] [{cat}] {name:<30} {chf:>8.2f} {BASE_CURRENCY} ({created})"
-            )
-        else:
-            lines.append(
-                f"[{eid:4d}] [{cat}] {name:<30} {orig:>8.2f} {cur} → {chf:>8.2f} {BASE_CURRENCY} ({created})"
-            )
+        lines.append(_format_expense_line(r))
 
     # Show tips only on first page
     if is_first_page:
         lines.append("")
         lines.append(EXPENSES_MESSAGES["expenses_delete_tip"])
 
-        if state.filter_category is None:
+        if category is None:
             lines.append(EXPENSES_MESSAGES["expenses_filter_tip"])
 
     return "\n".join(lines)
 
 
-def _format_rules_page(state: PaginationState, is_first_page: bool = True) -> str:
+def _format_rules_page(rows, is_first_page: bool = True) -> str:
     """
-    Format a single page of rules from pagination state, grouped by category.
+    Format a single page of rules, grouped by category.
 
     Args:
-        state: PaginationState with all rules
+        rows: Rules on the current page
         is_first_page: Whether this is the first page (shows legend at end)
 
     Returns:
         Formatted page content with rules grouped by category
     """
-    rows = state.current_page_items
     max_name_len = 20  # Cap name length
 
     # Group rules by category
     categories = {}
     for r in rows:
-        cat = r["category"]
+        cat = r.category
         if cat not in categories:
             categories[cat] = {"total": 0, "rules": []}
         categories[cat]["rules"].append(r)
-        categories[cat]["total"] += float(r["amount"])
+        categories[cat]["total"] += r.amount
 
     # Build output
     lines = [RULES_MESSAGES["rules_list_header"], ""]
@@ -347,12 +428,10 @@ def _format_rules_page(state: PaginationState, is_first_page: bool = True) -> st
         lines.append(f"📁 {category} — Total: {cat_data['total']:.2f} {BASE_CURRENCY}")
 
         for r in cat_data["rules"]:
-            period_emoji = get_period_emoji(r["period"])
+            period_emoji = get_period_emoji(r.period)
             # Cap name and pad to max_name_len
-            name = r["name"][:max_name_len].ljust(max_name_len)
-            lines.append(
-                f"[{r['id']:3d}] {name} {float(r['amount']):>8.2f} {period_emoji}"
-            )
+            name = r.name[:max_name_len].ljust(max_name_len)
+            lines.append(f"[{r.id:3d}] {name} {r.amount:>8.2f} {period_emoji}")
         lines.append("")
 
     # Add footer with legend only on first page
@@ -7,6 +7,8 @@ from config import BOT_TOKEN
 from db.db import init_db, shutdown_db_pool
 from handlers.handlers_config import create_handlers_config
 from handlers.command_menu import setup_command_menu
+from handlers.jobs import schedule_jobs
+from utils.charts import shutdown_chart_pool
 
 # Configure logging
 logging.basicConfig(
@@ -80,14 +82,26 @@ def main():
     for pagination_handler in handlers_config.get_pagination_handlers():
         app.add_handler(pagination_handler)
 
+    # Register the other inline button handlers
+    for callback_handler in handlers_config.get_callback_handlers():
+        app.add_handler(callback_handler)
+
+    # Register message handlers (document uploads)
+    for message_handler in handlers_config.get_message_handlers():
+        app.add_handler(message_handler)
+
+    # Scheduled jobs (recurring expenses, nightly anomaly statistics)
+    schedule_jobs(app)
+
     logger.info("🤖 Bot started successfully")
     try:
         app.run_polling()
     except KeyboardInterrupt:
         logger.info("Bot stopped by user (Ctrl+C)")
     finally:
-        # Cleanup database connections on shutdown
+        # Cleanup database connections and chart workers on shutdown
         shutdown_db_pool()
+        shutdown_chart_pool()
         logger.info("Bot shutdown complete")
 
 
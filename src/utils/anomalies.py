@@ -0,0 +1,94 @@
+"""
+Unusual-expense detection for the /add alerts.
+
+category_stats holds the running count, mean and M2 (Welford) of each
+category's expense amounts. Triggers in db/db.py update it in O(1) per
+inserted, edited or deleted expense, so checking a new expense is one
+primary-key lookup and never scans history. recompute_category_stats
+rebuilds the table exactly in SQL, user by user (nightly job), to remove the
+drift of the incremental updates.
+"""
+
+from typing import Dict
+
+import numpy as np
+
+from db.db import db
+from db.records import CategoryStats
+
+ANOMALY_SIGMA = 4.0  # flag expenses this many standard deviations above the mean
+MIN_SAMPLES = 8  # expenses a category needs before it is checked
+
+
+def find_anomalies(
+    stats: Dict[str, CategoryStats], items: list[tuple[str, float]]
+) -> list[tuple[int, float]]:
+    """
+    Scores (category, amount) items against their category statistics from
+    before the items were added. Returns (item index, z-score) of items at
+    least ANOMALY_SIGMA above their category mean.
+    """
+    checked = [
+        (i, stats[c], amount)
+        for i, (c, amount) in enumerate(items)
+        if c in stats and stats[c].n >= MIN_SAMPLES
+    ]
+    if not checked:
+        return []
+    index = np.array([i for i, _, _ in checked])
+    means = np.array([s.mean for _, s, _ in checked])
+    stds = np.array([s.std for _, s, _ in checked])
+    amounts = np.array([a for _, _, a in checked])
+
+    # A category whose amounts never vary (a subscription) has no spread to
+    # measure against
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = np.where(stds > 0, (amounts - means) / stds, 0.0)
+    hits = np.nonzero(z >= ANOMALY_SIGMA)[0]
+    return [(int(index[h]), float(z[h])) for h in hits]
+
+
+_REBUILD_USER_STATS = """
+    INSERT INTO category_stats(user_id, category_id, n, mean, m2)
+    SELECT e.user_id, e.category_id, COUNT(*), a.mean,
+           SUM((e.base_cents / 100.0 - a.mean) * (e.base_cents / 100.0 - a.mean))
+    FROM expenses e
+    JOIN (
+        SELECT category_id, AVG(base_cents / 100.0) AS mean
+        FROM expenses WHERE user_id=:user_id GROUP BY category_id
+    ) a ON a.category_id = e.category_id
+    WHERE e.user_id=:user_id
+    GROUP BY e.category_id
+"""
+
+
+def recompute_category_stats() -> int:
+    """
+    Rebuilds category_stats exactly, one user at a time: each user's rows are
+    replaced by one grouped INSERT ... SELECT over their expenses (two passes,
+    mean first, so M2 does not cancel) in its own short write transaction.
+    The write lock is held for a single user's rows, never for a scan of the
+    whole table, and as each swap is atomic no expense added meanwhile is
+    missed. Returns the number of categories.
+    """
+    conn = db()
+    user_ids = [
+        r[0]
+        for r in conn.execute(
+            "SELECT DISTINCT user_id FROM expenses "
+            "UNION SELECT DISTINCT user_id FROM category_stats"
+        ).fetchall()
+    ]
+    categories = 0
+    for user_id in user_ids:
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM category_stats WHERE user_id=?", (user_id,))
+            categories += conn.execute(
+                _REBUILD_USER_STATS, {"user_id": user_id}
+            ).rowcount
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return categories
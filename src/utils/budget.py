@@ -0,0 +1,120 @@
+"""
+Budget report engine shared by /status, /categories, the /add alerts and
+/export report.
+
+summarize_budget lays a month (or day range) out once as compact
+per-category arrays of planned, spent and over (max(0, spent - planned)), in
+display order: overspend desc, spent desc, name asc. Every metric is a
+reduction over those arrays, and report lines are only materialised for the
+categories a caller actually shows, so no caller walks the categories again.
+The sorted columns are kept as plain lists, converted from NumPy once, so
+full listings build their lines without another round trip per row.
+"""
+
+from dataclasses import dataclass
+from typing import Dict
+
+import numpy as np
+
+
+@dataclass(slots=True)
+class CategoryLine:
+    category: str
+    planned: float
+    spent: float
+    over: float  # max(0, spent - planned)
+
+    @property
+    def remaining(self) -> float:
+        return self.planned - self.spent
+
+    @property
+    def is_planned(self) -> bool:
+        return self.planned > 0.0
+
+
+@dataclass
+class BudgetMetrics:
+    """Container for calculated budget metrics."""
+
+    overall_budget: float
+    planned_total: float
+    spent_total: float
+    overspend_total: float
+    remaining_overall: float
+    unplanned_spent: float
+
+    @property
+    def remaining_tag(self) -> str:
+        """Get the emoji tag for remaining balance."""
+        return "✅" if self.remaining_overall >= 0 else "🚨"
+
+
+@dataclass
+class BudgetSummary:
+    metrics: BudgetMetrics
+    categories: list[str]  # display order
+    planned: list[float]  # per category, display order
+    spent: list[float]
+    over: list[float]
+
+    def __len__(self) -> int:
+        return len(self.categories)
+
+    def __contains__(self, category: str) -> bool:
+        return category in self.categories
+
+    def lines(self, limit: int | None = None) -> list[CategoryLine]:
+        """The first `limit` categories (all if None) in display order."""
+        if limit is None:
+            columns = (self.categories, self.planned, self.spent, self.over)
+        else:
+            columns = (
+                self.categories[:limit],
+                self.planned[:limit],
+                self.spent[:limit],
+                self.over[:limit],
+            )
+        return list(map(CategoryLine, *columns))
+
+    def line(self, category: str) -> CategoryLine | None:
+        if category not in self.categories:
+            return None
+        i = self.categories.index(category)
+        return CategoryLine(category, self.planned[i], self.spent[i], self.over[i])
+
+
+def summarize_budget(
+    planned_by_cat: Dict[str, float],
+    spent_by_cat: Dict[str, float],
+    overall_budget: float = 0.0,
+) -> BudgetSummary:
+    """
+    remaining_overall = overall_budget - planned_total - Σ max(0, spent_c - planned_c)
+    """
+    # Name order first: the stable sort below keeps it among ties
+    cats = sorted(planned_by_cat.keys() | spent_by_cat.keys(), key=str.lower)
+    planned = np.array([planned_by_cat.get(c, 0.0) for c in cats], dtype=float)
+    spent = np.array([spent_by_cat.get(c, 0.0) for c in cats], dtype=float)
+    over = np.maximum(spent - planned, 0.0)
+
+    order = np.lexsort((-spent, -over))
+    planned, spent, over = planned[order], spent[order], over[order]
+
+    planned_total = float(planned.sum())
+    overspend_total = float(over.sum())
+    metrics = BudgetMetrics(
+        overall_budget=overall_budget,
+        planned_total=planned_total,
+        spent_total=float(spent.sum()),
+        overspend_total=overspend_total,
+        remaining_overall=overall_budget - planned_total - overspend_total,
+        unplanned_spent=float(spent[planned == 0.0].sum()),
+    )
+    return BudgetSummary(
+        metrics=metrics,
+        categories=[cats[i] for i in order.tolist()],
+        planned=planned.tolist(),
+        spent=spent.tolist(),
+        over=over.tolist(),
+    )
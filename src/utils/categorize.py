@@ -0,0 +1,137 @@
+"""
+Category prediction for /add without a category.
+
+Each active user gets an in-memory CategoryIndex of how many of their expenses
+went to which category, per payee (the normalised name of db/payees.py) and
+per word of the payee. It is built lazily from one grouped query on the first
+prediction, then kept in step by services: inserts are counted in
+incrementally, anything else that changes past expenses (deletes, imports,
+category renames and merges, recurring expenses) drops the user's index so
+the next prediction rebuilds it. Predicting is a few dict lookups, no
+database access.
+
+Memory is bounded twice: at most CATEGORIZE_USERS indexes are kept (least
+recently used evicted) and each holds at most CATEGORIZE_MAX_PAYEES payees
+(the most used ones when built; new payees are skipped once it is full).
+"""
+
+from collections import Counter
+from typing import Dict, Iterable, Tuple
+
+from db.db import db
+from db.payees import payee_key
+from utils.fx import BoundedLRUCache
+
+UNCATEGORIZED = "Uncategorized"
+NO_NAME = "(no name)"
+
+CATEGORIZE_USERS = 256  # user indexes kept in memory
+CATEGORIZE_MAX_PAYEES = 2000  # payees per user index
+MIN_SHARE = 0.5  # a prediction needs more than this share of the votes
+
+_INDEXES = BoundedLRUCache(max_size=CATEGORIZE_USERS)
+
+
+def _tokens(key: str) -> list[str]:
+    """Words of a payee key that say something about it (no numbers, no single letters)."""
+    return list(dict.fromkeys(t for t in key.split() if len(t) > 1 and not t.isdigit()))
+
+
+def _majority(votes: Dict[str, float]) -> str | None:
+    if not votes:
+        return None
+    category = max(votes, key=votes.__getitem__)
+    return category if votes[category] > MIN_SHARE * sum(votes.values()) else None
+
+
+class CategoryIndex:
+    """Expense counts per (payee key, category) and per (payee word, category)."""
+
+    __slots__ = ("payees", "tokens")
+
+    def __init__(self):
+        self.payees: Dict[str, Counter] = {}
+        self.tokens: Dict[str, Counter] = {}
+
+    def add(self, key: str, category: str, n: int = 1) -> None:
+        if key not in self.payees and len(self.payees) >= CATEGORIZE_MAX_PAYEES:
+            return
+        self.payees.setdefault(key, Counter())[category] += n
+        for token in _tokens(key):
+            self.tokens.setdefault(token, Counter())[category] += n
+
+    def predict(self, key: str) -> str | None:
+        """
+        The category most of the payee's expenses went to; for an unknown payee
+        each known word votes with its category shares ("migros zurich" follows
+        "migros"). None without a clear majority.
+        """
+        counts = self.payees.get(key)
+        if counts:
+            return _majority(counts)
+
+        votes: Dict[str, float] = {}
+        for token in _tokens(key):
+            counts = self.tokens.get(token)
+            if counts:
+                total = sum(counts.values())
+                for category, n in counts.items():
+                    votes[category] = votes.get(category, 0.0) + n / total
+        return _majority(votes)
+
+
+def _load_index(user_id: int) -> CategoryIndex:
+    rows = (
+        db()
+        .execute(
+            """
+            WITH counts AS (
+                SELECT payee_id, category_id, COUNT(*) AS n
+                FROM expenses
+                WHERE user_id=? AND payee_id IS NOT NULL
+                GROUP BY payee_id, category_id
+            )
+            SELECT p.key, c.name AS category, t.n
+            FROM counts t
+            JOIN payees p ON p.id = t.payee_id
+            JOIN categories c ON c.id = t.category_id
+            WHERE c.name <> ? AND p.key <> ?
+            ORDER BY SUM(t.n) OVER (PARTITION BY t.payee_id) DESC, p.key
+            """,
+            (user_id, UNCATEGORIZED, payee_key(NO_NAME)),
+        )
+        .fetchall()
+    )
+    index = CategoryIndex()
+    for r in rows:
+        index.add(r["key"], r["category"], int(r["n"]))
+    return index
+
+
+def predict_category(user_id: int, name: str) -> str | None:
+    """The category the user's past expenses suggest for `name`, if any."""
+    if name == NO_NAME:
+        return None
+    index = _INDEXES.get(user_id)
+    if index is None:
+        index = _load_index(user_id)
+        _INDEXES.put(user_id, index)
+    return index.predict(payee_key(name))
+
+
+def learn_categories(user_id: int, items: Iterable[Tuple[str, str]]) -> None:
+    """Counts newly inserted (category, name) expenses into a loaded index."""
+    index = _INDEXES.get(user_id)
+    if index is None:
+        return  # built from the database, new rows included, when next needed
+    for category, name in items:
+        if category != UNCATEGORIZED and name != NO_NAME:
+            index.add(payee_key(name), category)
+
+
+def forget_category_index(user_id: int | None = None) -> None:
+    """Drops the user's index (every index for None); it is rebuilt on demand."""
+    if user_id is None:
+        _INDEXES.clear()
+    else:
+        _INDEXES.pop(user_id)
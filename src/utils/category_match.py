@@ -0,0 +1,147 @@
+"""
+Fuzzy category names: "did you mean" for /add, /status and /expenses.
+
+Each user's category names are split into trigrams (per word, lower-cased,
+padded like PostgreSQL's pg_trgm: "  f", " fo", "foo", "ood", "od "). A
+CategoryTrigrams index maps every trigram to the names containing it, so a
+lookup only scores the names sharing a trigram with the query, by the Dice
+coefficient of the two trigram sets. Indexes are built from the categories
+table on first use and kept in a bounded LRU; services drop a user's index
+whenever a category is created, renamed, merged or deleted.
+
+Similar is not the same as misspelt ("Food & Drinks" is close to "Food"), so
+category_typo also wants the candidate within a few edits (adjacent
+transpositions count as one) before /add asks about it.
+"""
+
+from typing import Dict, Iterable
+
+from db.db import db
+from utils.fx import BoundedLRUCache
+
+MATCH_USERS = 256  # user indexes kept in memory
+MIN_SIMILARITY = 0.4  # Dice coefficient of the trigram sets
+SUGGESTIONS = 3  # names suggested at most
+TYPO_CHARS_PER_EDIT = 4  # a typo has at most one edit per this many characters
+
+_INDEXES = BoundedLRUCache(max_size=MATCH_USERS)
+
+
+def trigrams(name: str) -> frozenset[str]:
+    """'Food & Drinks' -> {'  f', ' fo', 'foo', 'ood', 'od ', '  &', ' & ', ...}."""
+    grams = set()
+    for word in name.casefold().split():
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+class CategoryTrigrams:
+    """Inverted trigram index over one user's category names."""
+
+    __slots__ = ("names", "known", "sizes", "postings")
+
+    def __init__(self, names: Iterable[str]):
+        self.names: list[str] = list(names)
+        self.known = frozenset(self.names)
+        self.sizes: list[int] = []
+        self.postings: Dict[str, list[int]] = {}
+        for i, name in enumerate(self.names):
+            grams = trigrams(name)
+            self.sizes.append(len(grams))
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(i)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.known
+
+    def match(
+        self, query: str, limit: int = SUGGESTIONS, within=None
+    ) -> list[tuple[str, float]]:
+        """
+        Up to `limit` (name, similarity) pairs at least MIN_SIMILARITY similar
+        to `query`, most similar first (an exact spelling wins ties), only
+        names in `within` when given.
+        """
+        grams = trigrams(query)
+        if not grams:
+            return []
+        shared: Dict[int, int] = {}
+        for gram in grams:
+            for i in self.postings.get(gram, ()):
+                shared[i] = shared.get(i, 0) + 1
+
+        scored = []
+        for i, n in shared.items():
+            name = self.names[i]
+            if within is not None and name not in within:
+                continue
+            score = 2 * n / (len(grams) + self.sizes[i])
+            if score >= MIN_SIMILARITY:
+                scored.append((-score, name != query, name))
+        scored.sort()
+        return [(name, -score) for score, _, name in scored[:limit]]
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance where swapping two adjacent characters is one edit."""
+    prev2, prev = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cur[j] = min(
+                prev[j] + 1,
+                cur[j - 1] + 1,
+                prev[j - 1] + (a[i - 1] != b[j - 1]),
+            )
+            if (
+                prev2 is not None
+                and i > 1
+                and j > 1
+                and a[i - 1] == b[j - 2]
+                and a[i - 2] == b[j - 1]
+            ):
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+def _index(user_id: int) -> CategoryTrigrams:
+    index = _INDEXES.get(user_id)
+    if index is None:
+        rows = db().execute(
+            "SELECT name FROM categories WHERE user_id=? ORDER BY name", (user_id,)
+        )
+        index = CategoryTrigrams(r["name"] for r in rows)
+        _INDEXES.put(user_id, index)
+    return index
+
+
+def suggest_categories(
+    user_id: int, name: str, *, within=None, limit: int = SUGGESTIONS
+) -> list[str]:
+    """The user's category names closest to `name` (only those in `within` if given)."""
+    return [c for c, _ in _index(user_id).match(name, limit, within)]
+
+
+def category_typo(user_id: int, name: str) -> str | None:
+    """
+    The user's category that `name` probably misspells: None if `name` is a
+    category already or nothing is close enough.
+    """
+    index = _index(user_id)
+    if name in index:
+        return None
+    max_edits = max(1, len(name) // TYPO_CHARS_PER_EDIT)
+    for candidate, _ in index.match(name):
+        if edit_distance(name.casefold(), candidate.casefold()) <= max_edits:
+            return candidate
+    return None
+
+
+def forget_category_names(user_id: int | None = None) -> None:
+    """Drops the user's index (every index for None); it is rebuilt on demand."""
+    if user_id is None:
+        _INDEXES.clear()
+    else:
+        _INDEXES.pop(user_id)
@@ -0,0 +1,121 @@
+"""
+PNG charts for /chart, rendered in a process pool.
+
+Drawing a figure takes tens of milliseconds of CPU, which would stall every
+other update on the bot's event loop. render_chart runs the pure drawing
+functions below in worker processes; they take plain lists (picklable, no
+database access) and return PNG bytes. Figures are built through
+matplotlib's object API with the Agg canvas, so workers keep no pyplot state.
+"""
+
+import asyncio
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+CHART_WORKERS = 2
+CHART_DPI = 120
+
+_executor: ProcessPoolExecutor | None = None
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn: forking a process that runs an event loop and DB threads is unsafe
+        _executor = ProcessPoolExecutor(
+            max_workers=CHART_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+async def render_chart(fn, *args) -> bytes:
+    """Runs the drawing function `fn(*args)` in the chart process pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), fn, *args)
+
+
+def shutdown_chart_pool() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(cancel_futures=True)
+        _executor = None
+
+
+def _png(fig) -> bytes:
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=CHART_DPI, bbox_inches="tight")
+    return buf.getvalue()
+
+
+def draw_breakdown(
+    title: str,
+    categories: list[str],
+    planned: list[float],
+    spent: list[float],
+    currency: str,
+) -> bytes:
+    """Horizontal bars of spend per category with the planned amount marked."""
+    from matplotlib.figure import Figure
+
+    n = len(categories)
+    fig = Figure(figsize=(7, 1.2 + 0.4 * n))
+    ax = fig.subplots()
+    y = list(range(n))[::-1]  # first category on top
+    colors = [
+        "#d9534f" if p > 0 and s > p else "#5b9bd5" if p > 0 else "#a0a0a0"
+        for p, s in zip(planned, spent)
+    ]
+    ax.barh(y, spent, color=colors, height=0.6)
+    marked = [(yi, p) for yi, p in zip(y, planned) if p > 0]
+    if marked:
+        ax.scatter(
+            [p for _, p in marked],
+            [yi for yi, _ in marked],
+            marker="|",
+            s=300,
+            color="black",
+            label="planned",
+        )
+        ax.legend(loc="best", frameon=False)
+    ax.set_yticks(y, categories)
+    ax.set_xlabel(currency)
+    ax.set_title(title)
+    ax.grid(axis="x", alpha=0.3)
+    return _png(fig)
+
+
+def draw_spend_curve(
+    title: str,
+    spent_cumulative: list[float],
+    allowance_cumulative: list[float],
+    budget: float | None,
+    currency: str,
+) -> bytes:
+    """
+    Cumulative spend per day (up to the last elapsed day) against the plan
+    prorated over the whole month, with the budget as a horizontal line.
+    """
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(7, 4))
+    ax = fig.subplots()
+    days = range(1, len(allowance_cumulative) + 1)
+    ax.plot(days, allowance_cumulative, "--", color="#808080", label="plan")
+    ax.plot(
+        days[: len(spent_cumulative)],
+        spent_cumulative,
+        color="#5b9bd5",
+        linewidth=2,
+        label="spent",
+    )
+    if budget is not None:
+        ax.axhline(budget, color="#d9534f", linewidth=1, label="budget")
+    ax.set_xlim(1, len(allowance_cumulative))
+    ax.set_ylim(bottom=0)
+    ax.set_xlabel("day")
+    ax.set_ylabel(currency)
+    ax.set_title(title)
+    ax.grid(alpha=0.3)
+    ax.legend(loc="best", frameon=False)
+    return _png(fig)
@@ -2,7 +2,18 @@ import csv
 import io
 
 from db.db import db
+from db.services import (
+    compute_planned_monthly_from_rules,
+    compute_spent_this_month,
+    get_month_budget,
+)
 from config import BASE_CURRENCY
+from utils.budget import summarize_budget
+
+
+def _cents_str(cents: int) -> str:
+    """Integer hundredths -> '12.34'."""
+    return f"{cents / 100:.2f}"
 
 
 def _rows_to_csv_bytes(headers: list[str], rows: list[list[str]]) -> bytes:
@@ -18,17 +29,14 @@ def export_expenses_csv(user_id: int, month: str) -> bytes:
     rows = conn.execute(
         """
         SELECT
-            id, created_at, month, category, name,
-            COALESCE(currency, ?) AS currency,
-            COALESCE(original_amount, COALESCE(chf_amount, amount)) AS original_amount,
-            COALESCE(chf_amount, amount) AS chf_amount,
-            COALESCE(fx_rate, 1.0) AS fx_rate,
-            COALESCE(fx_date, '') AS fx_date
+            id, created_at, month,
+            (SELECT c.name FROM categories c WHERE c.id = category_id) AS category,
+            name, currency, original_cents, base_cents, fx_rate, fx_date
         FROM expenses
         WHERE user_id=? AND month=?
         ORDER BY created_at ASC, id ASC
         """,
-        (BASE_CURRENCY, user_id, month),
+        (user_id, month),
     ).fetchall()
 
     out = []
@@ -41,8 +49,8 @@ def export_expenses_csv(user_id: int, month: str) -> bytes:
                 str(r["category"]),
                 str(r["name"]),
                 str(r["currency"]),
-                f"{float(r['original_amount']):.2f}",
-                f"{float(r['chf_amount']):.2f}",
+                _cents_str(r["original_cents"]),
+                _cents_str(r["base_cents"]),
                 f"{float(r['fx_rate']):.6f}",
                 str(r["fx_date"]),
             ]
@@ -63,11 +71,112 @@ def export_expenses_csv(user_id: int, month: str) -> bytes:
     return _rows_to_csv_bytes(headers, out)
 
 
+def export_expenses_delta_csv(
+    user_id: int, last_expense_id: int, last_seq: int
+) -> tuple[bytes, int, int, int, int]:
+    """
+    Exports only what changed since the cursor (last_expense_id, last_seq):
+    - expenses inserted after last_expense_id (op=insert)
+    - tombstones for expenses the previous exports already delivered (op=delete)
+
+    Returns (csv_bytes, inserted, deleted, new_last_expense_id, new_last_seq).
+    """
+    conn = db()
+    inserted = conn.execute(
+        """
+        SELECT
+            id, created_at, month,
+            (SELECT c.name FROM categories c WHERE c.id = category_id) AS category,
+            name, currency, original_cents, base_cents, fx_rate, fx_date
+        FROM expenses
+        WHERE user_id=? AND id>?
+        ORDER BY id ASC
+        """,
+        (user_id, int(last_expense_id)),
+    ).fetchall()
+
+    tombstones = conn.execute(
+        """
+        SELECT seq, expense_id, month, deleted_at
+        FROM expense_tombstones
+        WHERE user_id=? AND seq>?
+        ORDER BY seq ASC
+        """,
+        (user_id, int(last_seq)),
+    ).fetchall()
+
+    out = []
+    for r in inserted:
+        out.append(
+            [
+                "insert",
+                str(r["id"]),
+                str(r["created_at"]),
+                str(r["month"]),
+                str(r["category"]),
+                str(r["name"]),
+                str(r["currency"]),
+                _cents_str(r["original_cents"]),
+                _cents_str(r["base_cents"]),
+                f"{float(r['fx_rate']):.6f}",
+                str(r["fx_date"]),
+            ]
+        )
+
+    deleted = 0
+    for t in tombstones:
+        # Rows inserted and deleted between two exports were never delivered
+        if int(t["expense_id"]) > last_expense_id:
+            continue
+        out.append(
+            [
+                "delete",
+                str(t["expense_id"]),
+                str(t["deleted_at"]),
+                str(t["month"]),
+                "",
+                "",
+                "",
+                "",
+                "",
+                "",
+                "",
+            ]
+        )
+        deleted += 1
+
+    new_last_expense_id = int(inserted[-1]["id"]) if inserted else last_expense_id
+    new_last_seq = int(tombstones[-1]["seq"]) if tombstones else last_seq
+
+    headers = [
+        "op",
+        "id",
+        "changed_at",
+        "month",
+        "category",
+        "name",
+        "currency",
+        "original_amount",
+        f"{BASE_CURRENCY.lower()}_amount",
+        "fx_rate",
+        "fx_date",
+    ]
+    return (
+        _rows_to_csv_bytes(headers, out),
+        len(inserted),
+        deleted,
+        new_last_expense_id,
+        new_last_seq,
+    )
+
+
 def export_rules_csv(user_id: int) -> bytes:
     conn = db()
     rows = conn.execute(
         """
-        SELECT id, category, name, period, amount
+        SELECT
+            id, (SELECT c.name FROM categories c WHERE c.id = category_id) AS category,
+            name, period, amount
         FROM rules
         WHERE user_id=?
         ORDER BY category, period, name
@@ -116,3 +225,39 @@ def export_budgets_csv(user_id: int) -> bytes:
 
     headers = ["month", "amount", "currency"]
     return _rows_to_csv_bytes(headers, out)
+
+
+def export_report_csv(user_id: int, month: str) -> bytes:
+    """The /status category breakdown of `month`, in the same order."""
+    planned_by_cat, _ = compute_planned_monthly_from_rules(user_id, month)
+    spent_by_cat, _ = compute_spent_this_month(user_id, month)
+    budget = get_month_budget(user_id, month)
+    summary = summarize_budget(planned_by_cat, spent_by_cat, budget or 0.0)
+
+    out = []
+    for line in summary.lines():
+        out.append(
+            [
+                str(line.category),
+                f"{line.planned:.2f}",
+                f"{line.spent:.2f}",
+                f"{line.remaining:.2f}",
+                f"{line.over:.2f}",
+                BASE_CURRENCY,
+            ]
+        )
+
+    metrics = summary.metrics
+    out.append(
+        [
+            "TOTAL",
+            f"{metrics.planned_total:.2f}",
+            f"{metrics.spent_total:.2f}",
+            "" if budget is None else f"{metrics.remaining_overall:.2f}",
+            f"{metrics.overspend_total:.2f}",
+            BASE_CURRENCY,
+        ]
+    )
+
+    headers = ["category", "planned", "spent", "remaining", "overspend", "currency"]
+    return _rows_to_csv_bytes(headers, out)
@@ -0,0 +1,152 @@
+"""
+Month-end spend forecast for /forecast, /status and the /add alerts.
+
+Daily spend of the month is laid out as a (category x day) NumPy array from
+one aggregated query. Each category is projected from its observed run rate
+and its rules:
+- daily and weekly rules set a planned pace; the projection blends it with the
+  observed pace, trusting the observation more as the month goes on
+- monthly and yearly rules are lump sums (rent, insurance): the category is
+  expected to reach its planned amount, but its spend is not extrapolated
+- categories without rules continue at their observed pace
+"""
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict
+
+import numpy as np
+
+from db.services import compute_daily_spent, days_in_month, get_rules_for_month
+
+WEEKS_PER_MONTH = 4.33  # as in compute_planned_monthly_from_rules
+
+
+@dataclass
+class Forecast:
+    month: str
+    days: int  # days in the month
+    today: int  # elapsed days, today included
+    categories: list[str]
+    spent: np.ndarray  # per category, so far
+    projected: np.ndarray  # per category, at month end
+    planned: np.ndarray  # per category, from rules
+    daily_total: np.ndarray  # spend per day of month, 0 for future days
+    budget: float | None
+
+    @property
+    def spent_total(self) -> float:
+        return float(self.spent.sum())
+
+    @property
+    def projected_total(self) -> float:
+        return float(self.projected.sum())
+
+    @property
+    def over_budget(self) -> bool:
+        return self.budget is not None and self.projected_total > self.budget
+
+    def crossing_day(self) -> int | None:
+        """
+        Day of month the budget is expected to be crossed, assuming the
+        remaining projected spend is spread evenly over the remaining days.
+        None if there is no budget or it isn't expected to be crossed.
+        """
+        if self.budget is None:
+            return None
+        curve = np.cumsum(self.daily_total[: self.today])
+        remaining_days = self.days - self.today
+        if remaining_days > 0:
+            per_day = (self.projected_total - self.spent_total) / remaining_days
+            future = self.spent_total + per_day * np.arange(1, remaining_days + 1)
+            curve = np.concatenate([curve, future])
+        over = np.nonzero(curve > self.budget)[0]
+        return int(over[0]) + 1 if over.size else None
+
+    def by_category(self) -> Dict[str, tuple[float, float, float]]:
+        """category -> (spent, projected, planned), largest projection first."""
+        order = np.argsort(-self.projected, kind="stable")
+        return {
+            self.categories[i]: (
+                float(self.spent[i]),
+                float(self.projected[i]),
+                float(self.planned[i]),
+            )
+            for i in order
+        }
+
+
+def build_forecast(
+    month: str, today: int, rules, daily_rows, budget: float | None
+) -> Forecast:
+    """
+    rules: records with category/period/amount (get_rules_for_month);
+    daily_rows: DailySpend records of the month (compute_daily_spent).
+    """
+    days = days_in_month(month)
+    today = min(max(today, 1), days)
+    categories = sorted({r.category for r in rules} | {r.category for r in daily_rows})
+    index = {c: i for i, c in enumerate(categories)}
+    n = len(categories)
+
+    # Planned pace (daily/weekly rules) and lump sums (monthly/yearly), per month
+    pace_planned = np.zeros(n)
+    lump_planned = np.zeros(n)
+    for r in rules:
+        i = index[r.category]
+        if r.period == "daily":
+            pace_planned[i] += r.amount * days
+        elif r.period == "weekly":
+            pace_planned[i] += r.amount * WEEKS_PER_MONTH
+        elif r.period == "monthly":
+            lump_planned[i] += r.amount
+        else:  # yearly
+            lump_planned[i] += r.amount / 12.0
+
+    daily = np.zeros((n, days))
+    if daily_rows:
+        rows = np.array([index[r.category] for r in daily_rows])
+        cols = np.clip([r.day - 1 for r in daily_rows], 0, days - 1)
+        np.add.at(daily, (rows, cols), [r.cents / 100 for r in daily_rows])
+
+    spent = daily.sum(axis=1)
+    observed_rate = daily[:, :today].sum(axis=1) / today
+    remaining_days = days - today
+    weight = today / days
+
+    has_pace = pace_planned > 0
+    has_lump = lump_planned > 0
+    blended = weight * observed_rate + (1 - weight) * pace_planned / days
+    projected = np.where(
+        has_pace,
+        # Lump sums of a paced category are added once, if not yet reached
+        spent + remaining_days * blended + np.maximum(0.0, lump_planned - spent),
+        np.where(
+            has_lump,
+            np.maximum(spent, lump_planned),
+            spent + remaining_days * observed_rate,
+        ),
+    )
+
+    return Forecast(
+        month=month,
+        days=days,
+        today=today,
+        categories=categories,
+        spent=spent,
+        projected=projected,
+        planned=pace_planned + lump_planned,
+        daily_total=daily.sum(axis=0),
+        budget=budget,
+    )
+
+
+def forecast_month(
+    user_id: int, month: str, budget: float | None, today: date | None = None
+) -> Forecast:
+    """Forecast for the current `month` from its rules and daily spend."""
+    today = today or date.today()
+    rules, _ = get_rules_for_month(user_id, month)
+    return build_forecast(
+        month, today.day, rules, compute_daily_spent(user_id, month), budget
+    )
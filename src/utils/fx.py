@@ -56,6 +56,13 @@ class BoundedLRUCache:
         if len(self.cache) > self.max_size:
             self.cache.popitem(last=False)
 
+    def pop(self, key):
+        """Remove and return the value of key (None if absent)."""
+        return self.cache.pop(key, None)
+
+    def clear(self):
+        self.cache.clear()
+
     def __contains__(self, key):
         return key in self.cache
 
@@ -104,10 +111,11 @@ def _is_valid_currency_format(code: str) -> bool:
     )
 
 
-async def get_fx_rate(from_ccy: str, to_ccy: str = BASE_CURRENCY) -> Tuple[str, float]:
-    from_ccy = from_ccy.upper()
-    to_ccy = to_ccy.upper()
-
+async def _check_currency_pair(from_ccy: str, to_ccy: str) -> bool:
+    """
+    Validate both currency codes.
+    Returns False when the API currency list is unavailable (rate falls back to 1.0).
+    """
     # First: validate format (3 uppercase letters)
     if not _is_valid_currency_format(from_ccy):
         raise CurrencyFormatError(
@@ -121,15 +129,24 @@ async def get_fx_rate(from_ccy: str, to_ccy: str = BASE_CURRENCY) -> Tuple[str,
     # Second: validate availability against the API list
     available = await _fetch_available_currencies()
 
-    # If API failed to fetch currencies (empty set), skip validation and return 1.0
+    # If API failed to fetch currencies (empty set), skip validation
     if not available:
-        return today_key(), 1.0
+        return False
 
     # Only validate if we successfully fetched the list from API
     if from_ccy not in available:
         raise CurrencyNotSupportedError(f"Currency not supported: {from_ccy}")
     if to_ccy not in available:
         raise CurrencyNotSupportedError(f"Currency not supported: {to_ccy}")
+    return True
+
+
+async def get_fx_rate(from_ccy: str, to_ccy: str = BASE_CURRENCY) -> Tuple[str, float]:
+    from_ccy = from_ccy.upper()
+    to_ccy = to_ccy.upper()
+
+    if not await _check_currency_pair(from_ccy, to_ccy):
+        return today_key(), 1.0
 
     if from_ccy == to_ccy:
         return today_key(), 1.0
@@ -177,3 +194,59 @@ async def get_fx_rate(from_ccy: str, to_ccy: str = BASE_CURRENCY) -> Tuple[str,
     # Store in memory cache (with LRU eviction)
     _FX_MEM_CACHE.put(mem_key, rate)
     return api_date, rate
+
+
+async def get_fx_rate_on(
+    from_ccy: str, to_ccy: str = BASE_CURRENCY, day: str | None = None
+) -> Tuple[str, float]:
+    """
+    Rate for a past day (YYYY-MM-DD), used when importing old expenses.
+    Cached under the requested day; today and future days use get_fx_rate.
+    """
+    if day is None or day >= today_key():
+        return await get_fx_rate(from_ccy, to_ccy)
+
+    from_ccy = from_ccy.upper()
+    to_ccy = to_ccy.upper()
+
+    if not await _check_currency_pair(from_ccy, to_ccy):
+        return day, 1.0
+
+    if from_ccy == to_ccy:
+        return day, 1.0
+
+    mem_key = (day, from_ccy, to_ccy)
+    cached_rate = _FX_MEM_CACHE.get(mem_key)
+    if cached_rate is not None:
+        return day, cached_rate
+
+    conn = db()
+    row = conn.execute(
+        "SELECT rate FROM fx_rates WHERE fx_date=? AND from_ccy=? AND to_ccy=?",
+        (day, from_ccy, to_ccy),
+    ).fetchone()
+
+    if row:
+        rate = float(row["rate"])
+        _FX_MEM_CACHE.put(mem_key, rate)
+        return day, rate
+
+    # Historical endpoint; weekends/holidays resolve to the previous business day
+    url = f"https://api.frankfurter.dev/v1/{day}"
+    params = {"from": from_ccy, "to": to_ccy}
+
+    async with httpx.AsyncClient(timeout=12) as client:
+        r = await client.get(url, params=params)
+        r.raise_for_status()
+        data = r.json()
+
+    rate = float(data["rates"][to_ccy])
+
+    conn.execute(
+        "INSERT OR REPLACE INTO fx_rates(fx_date, from_ccy, to_ccy, rate) VALUES (?, ?, ?, ?)",
+        (day, from_ccy, to_ccy, rate),
+    )
+    conn.commit()
+
+    _FX_MEM_CACHE.put(mem_key, rate)
+    return day, rate
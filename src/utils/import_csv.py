@@ -0,0 +1,233 @@
+"""
+CSV import parsing for /import.
+
+Reads expense rows from an uploaded CSV (our own /export format or a typical
+bank statement) lazily in chunks, so large files are never materialised as a
+list of rows. Validation reuses utils/validators.py.
+"""
+
+import csv
+import hashlib
+import io
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import BinaryIO, Iterator
+
+from config import BASE_CURRENCY
+from utils.validators import validate_amount, validate_category, validate_name
+
+IMPORT_CHUNK_ROWS = 500  # rows per transaction
+IMPORT_MAX_BYTES = 20 * 1024 * 1024  # Telegram bots can't download larger files
+
+# Accepted header names (lower-case), first match wins
+DATE_COLUMNS = ("date", "created_at", "booking date", "transaction date", "datum")
+AMOUNT_COLUMNS = ("original_amount", "amount", "betrag")
+NAME_COLUMNS = ("name", "description", "payee", "merchant", "text", "beschreibung")
+CATEGORY_COLUMNS = ("category", "kategorie")
+CURRENCY_COLUMNS = ("currency", "währung", "waehrung")
+
+_DATE_FORMATS = ("%Y-%m-%d", "%d.%m.%Y", "%d/%m/%Y")
+
+
+class ImportFormatError(Exception):
+    """Raised when the file can't be read as an expense CSV; carries a message key."""
+
+    def __init__(self, message: str):
+        self.message = message
+        super().__init__(message)
+
+
+class ImportCreditError(ImportFormatError):
+    """Raised for a money-in row (positive amount) of a signed bank statement."""
+
+    def __init__(self):
+        super().__init__("import_credit")
+
+
+@dataclass(slots=True)
+class ImportRow:
+    line: int
+    day: date
+    created_at: str
+    ts: int
+    category: str
+    name: str
+    amount: float
+    currency: str
+
+
+@dataclass(slots=True)
+class ImportColumns:
+    date: str
+    amount: str
+    name: str
+    category: str | None
+    currency: str | None
+    signed: bool = False  # spending is negative, positive rows are credits
+
+
+def _pick(fieldnames: dict[str, str], candidates: tuple[str, ...]) -> str | None:
+    for c in candidates:
+        if c in fieldnames:
+            return fieldnames[c]
+    return None
+
+
+def open_import_reader(data: BinaryIO) -> tuple[csv.DictReader, ImportColumns]:
+    """
+    Wrap the uploaded bytes in a streaming DictReader.
+    The delimiter (`,` or `;`) is sniffed from the first few KB.
+    """
+    text = io.TextIOWrapper(data, encoding="utf-8-sig", newline="")
+    sample = text.read(4096)
+    text.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+
+    reader = csv.DictReader(text, dialect=dialect)
+    fieldnames = {(f or "").strip().lower(): f for f in (reader.fieldnames or [])}
+
+    date_col = _pick(fieldnames, DATE_COLUMNS)
+    amount_col = _pick(fieldnames, AMOUNT_COLUMNS)
+    name_col = _pick(fieldnames, NAME_COLUMNS)
+    if date_col is None or amount_col is None or name_col is None:
+        raise ImportFormatError("import_missing_columns")
+
+    # Our /export files hold positive amounts only; a bank statement is signed
+    # as soon as it has one negative amount
+    signed = False
+    if amount_col.strip().lower() != "original_amount":
+        signed = _has_negative_amount(text, dialect, amount_col)
+        reader = csv.DictReader(text, dialect=dialect)  # the scan rewound the file
+
+    return reader, ImportColumns(
+        date=date_col,
+        amount=amount_col,
+        name=name_col,
+        category=_pick(fieldnames, CATEGORY_COLUMNS),
+        currency=_pick(fieldnames, CURRENCY_COLUMNS),
+        signed=signed,
+    )
+
+
+def _has_negative_amount(text: io.TextIOBase, dialect, amount_col: str) -> bool:
+    """
+    Scans the amount column from the top up to the first negative amount,
+    then rewinds.
+    Unreadable rows end the scan; the import reports them itself.
+    """
+    text.seek(0)
+    try:
+        for record in csv.DictReader(text, dialect=dialect):
+            if (record.get(amount_col) or "").strip().startswith("-"):
+                return True
+        return False
+    except (csv.Error, UnicodeDecodeError):
+        return False
+    finally:
+        text.seek(0)
+
+
+def iter_import_chunks(
+    reader: csv.DictReader, size: int = IMPORT_CHUNK_ROWS
+) -> Iterator[list[tuple[int, dict]]]:
+    """Yield lists of (line_number, record) with at most `size` entries."""
+    chunk: list[tuple[int, dict]] = []
+    for record in reader:
+        chunk.append((reader.line_num, record))
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _parse_import_amount(s: str) -> float:
+    """
+    Accepts 12.50, 12,50, -1'234.50, 1,234.50, 1.234,50 and +2 500,00.
+    Whichever of `.` and `,` comes last is the decimal separator, the other
+    one separates thousands. The sign is kept.
+    """
+    s = s.strip().replace("'", "").replace(" ", "").replace("\u00a0", "")
+    decimal = "," if s.rfind(",") > s.rfind(".") else "."
+    thousands = "." if decimal == "," else ","
+    return float(s.replace(thousands, "").replace(decimal, "."))
+
+
+def _parse_import_datetime(s: str) -> datetime:
+    s = s.strip()
+    try:
+        return datetime.fromisoformat(s).replace(tzinfo=None, microsecond=0)
+    except ValueError:
+        pass
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(s, fmt)
+        except ValueError:
+            continue
+    raise ValueError(s)
+
+
+def parse_import_row(line: int, record: dict, columns: ImportColumns) -> ImportRow:
+    """
+    Parse and validate one CSV record.
+
+    Raises ImportFormatError (message key), ImportCreditError for money
+    coming in on a signed statement, or a validators ValidationError.
+    """
+    try:
+        when = _parse_import_datetime(record.get(columns.date) or "")
+    except ValueError:
+        raise ImportFormatError("import_bad_date")
+
+    try:
+        amount = _parse_import_amount(record.get(columns.amount) or "")
+    except ValueError:
+        raise ImportFormatError("import_bad_amount")
+    if columns.signed:
+        if amount > 0:
+            raise ImportCreditError()
+        amount = -amount
+    amount = validate_amount(amount, field_name="amount")
+
+    name = validate_name(record.get(columns.name) or "", field_name="name")
+
+    category = "Uncategorized"
+    if columns.category and (record.get(columns.category) or "").strip():
+        category = record[columns.category]
+    category = validate_category(category)
+
+    currency = BASE_CURRENCY
+    if columns.currency and (record.get(columns.currency) or "").strip():
+        currency = record[columns.currency].strip().upper()
+
+    return ImportRow(
+        line=line,
+        day=when.date(),
+        created_at=when.isoformat(timespec="seconds"),
+        ts=int(when.timestamp()),
+        category=category,
+        name=name,
+        amount=amount,
+        currency=currency,
+    )
+
+
+def import_hash(row: ImportRow, occurrence: int) -> str:
+    """
+    Dedup key over (date, amount, currency, name).
+    `occurrence` numbers identical rows within one file, so two equal coffees
+    on the same day are both kept while re-importing the file adds nothing.
+    """
+    key = "|".join(
+        (
+            row.day.isoformat(),
+            f"{row.amount:.2f}",
+            row.currency,
+            row.name.casefold(),
+            str(occurrence),
+        )
+    )
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]
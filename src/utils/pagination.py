@@ -1,118 +1,165 @@
 """
 Pagination system for handling large lists of expenses and other items.
 Uses inline buttons for navigation instead of text-based limits.
+
+Pagination is stateless: the cursor of the target page is encoded in each
+button's callback_data and every page is fetched from the database on demand.
 """
 
-from dataclasses import dataclass
-from typing import List, Callable, Any, Optional, Tuple
+import zlib
+from dataclasses import dataclass, replace
+from typing import List, Optional, Tuple
+
+
+# Prefix routing every pagination button to the same callback handler
+CALLBACK_PREFIX = "pg"
+
+# Telegram rejects callback_data longer than 64 bytes
+CALLBACK_DATA_MAX_BYTES = 64
+
+# Callback data of the "page X/Y" indicator button (does nothing)
+CALLBACK_INFO = f"{CALLBACK_PREFIX}:i"
+
+
+def category_token(category: Optional[str]) -> str:
+    """Short, fixed-size stand-in for a category filter inside callback_data."""
+    if not category:
+        return ""
+    return f"{zlib.crc32(category.encode('utf-8')):08x}"
+
+
+def total_pages_for(total_count: int, items_per_page: int) -> int:
+    """Number of pages needed for `total_count` items (at least 1)."""
+    if not total_count:
+        return 1
+    return (total_count + items_per_page - 1) // items_per_page
 
 
 @dataclass
-class PaginationState:
-    """Tracks pagination state for a single list view."""
+class PageCursor:
+    """
+    Position in a paginated list, compact enough to live in callback_data.
 
-    items: List[Any]  # All items
-    current_page: int = 0  # 0-indexed
-    items_per_page: int = 10
-    filter_category: Optional[str] = None
-    filter_month: Optional[str] = None
-    callback_prefix: str = "expenses"  # For callback query routing
+    Nothing about the list is kept server-side: every button carries the
+    cursor of the page it leads to, so buttons on older messages keep
+    working and survive bot restarts.
 
-    @property
-    def total_pages(self) -> int:
-        """Total number of pages."""
-        if not self.items:
-            return 1
-        return (len(self.items) + self.items_per_page - 1) // self.items_per_page
+    Encoded as "pg:<kind>:<page>:<anchor>:<scope>:<category>" where anchor is
+    "<id" (rows older than id), ">id" (rows newer than id) or "" to address
+    the page by number.
+    """
 
-    @property
-    def has_previous(self) -> bool:
-        """Can go to previous page."""
-        return self.current_page > 0
+    kind: str  # "e" for expenses, "r" for rules, "s" for search results
+    page: int = 0  # 0-indexed
+    anchor: str = ""
+    scope: str = ""  # month (YYYY-MM) for expenses, saved search id for search
+    category: str = ""  # category_token() of the filter
 
     @property
-    def has_next(self) -> bool:
-        """Can go to next page."""
-        return self.current_page < self.total_pages - 1
+    def before_id(self) -> Optional[int]:
+        """Fetch rows with an id lower than this (next page)."""
+        return int(self.anchor[1:]) if self.anchor.startswith("<") else None
 
     @property
-    def current_page_items(self) -> List[Any]:
-        """Get items for current page."""
-        start = self.current_page * self.items_per_page
-        end = start + self.items_per_page
-        return self.items[start:end]
-
-    def next_page(self) -> bool:
-        """Go to next page. Returns True if successful."""
-        if self.has_next:
-            self.current_page += 1
-            return True
-        return False
-
-    def previous_page(self) -> bool:
-        """Go to previous page. Returns True if successful."""
-        if self.has_previous:
-            self.current_page -= 1
-            return True
-        return False
-
-    def reset(self) -> None:
-        """Reset to first page."""
-        self.current_page = 0
-
-    def to_dict(self) -> dict:
-        """Convert to dict for storage in context.user_data."""
-        return {
-            "items": self.items,
-            "current_page": self.current_page,
-            "items_per_page": self.items_per_page,
-            "filter_category": self.filter_category,
-            "filter_month": self.filter_month,
-            "callback_prefix": self.callback_prefix,
-        }
+    def after_id(self) -> Optional[int]:
+        """Fetch rows with an id greater than this (previous page)."""
+        return int(self.anchor[1:]) if self.anchor.startswith(">") else None
+
+    def at(self, page: int, anchor: str = "") -> "PageCursor":
+        """Cursor for another page of the same list."""
+        return replace(self, page=page, anchor=anchor)
+
+    def encode(self) -> str:
+        data = ":".join(
+            [
+                CALLBACK_PREFIX,
+                self.kind,
+                str(self.page),
+                self.anchor,
+                self.scope,
+                self.category,
+            ]
+        )
+        if len(data.encode("utf-8")) > CALLBACK_DATA_MAX_BYTES:
+            raise ValueError(f"callback_data too long: {data}")
+        return data
 
     @staticmethod
-    def from_dict(data: dict) -> "PaginationState":
-        """Restore from dict stored in context.user_data."""
-        return PaginationState(
-            items=data.get("items", []),
-            current_page=data.get("current_page", 0),
-            items_per_page=data.get("items_per_page", 10),
-            filter_category=data.get("filter_category"),
-            filter_month=data.get("filter_month"),
-            callback_prefix=data.get("callback_prefix", "expenses"),
+    def decode(data: str) -> Optional["PageCursor"]:
+        """Parse callback_data produced by encode(). Returns None if malformed."""
+        parts = (data or "").split(":")
+        if len(parts) != 6 or parts[0] != CALLBACK_PREFIX:
+            return None
+        _, kind, page, anchor, scope, category = parts
+        try:
+            page_no = int(page)
+            if anchor:
+                int(anchor[1:])
+        except ValueError:
+            return None
+        if page_no < 0 or (anchor and anchor[0] not in "<>"):
+            return None
+        return PageCursor(
+            kind=kind, page=page_no, anchor=anchor, scope=scope, category=category
         )
 
 
+def _jump_pages(current_page: int, total_pages: int, window: int = 1) -> List[int]:
+    """Pages offered as direct jumps: first, last and the neighbours of current."""
+    pages = {0, total_pages - 1}
+    for p in range(current_page - window, current_page + window + 1):
+        if 0 <= p < total_pages:
+            pages.add(p)
+    return sorted(pages)
+
+
 def get_pagination_buttons(
-    prefix: str,
-    current_page: int,
+    cursor: PageCursor,
     total_pages: int,
-    has_previous: bool,
-    has_next: bool,
-) -> Tuple[List[Tuple[str, str]], str]:
+    first_id: Optional[int] = None,
+    last_id: Optional[int] = None,
+) -> Tuple[List[List[Tuple[str, str]]], str]:
     """
     Generate inline button definitions for pagination.
 
+    Previous/Next use the ids of the rows on screen as keyset anchors when
+    they are given; jump buttons address pages by number.
+
     Returns:
-        Tuple of (buttons_data, footer_text)
-        buttons_data: List of (label, callback_data) tuples
+        Tuple of (button_rows, footer_text)
+        button_rows: Rows of (label, callback_data) tuples
         footer_text: "Page X/Y" text
     """
-    buttons = []
+    current_page = cursor.page
+    rows = []
 
-    if has_previous:
-        buttons.append(("⬅️ Previous", f"{prefix}_prev"))
+    nav = []
+    if current_page > 0:
+        anchor = f">{first_id}" if first_id is not None else ""
+        nav.append(("⬅️ Previous", cursor.at(current_page - 1, anchor).encode()))
 
     # Add page indicator
-    buttons.append((f"{current_page + 1}/{total_pages}", f"{prefix}_info"))
-
-    if has_next:
-        buttons.append(("Next ➡️", f"{prefix}_next"))
+    nav.append((f"{current_page + 1}/{total_pages}", CALLBACK_INFO))
+
+    if current_page < total_pages - 1:
+        anchor = f"<{last_id}" if last_id is not None else ""
+        nav.append(("Next ➡️", cursor.at(current_page + 1, anchor).encode()))
+    rows.append(nav)
+
+    # Jump-to-page row, only useful beyond Previous/Next
+    if total_pages > 2:
+        jumps = []
+        for p in _jump_pages(current_page, total_pages):
+            if p == current_page:
+                # Re-rendering the page on screen is rejected as "not modified"
+                jumps.append((f"· {p + 1} ·", CALLBACK_INFO))
+            else:
+                jumps.append((str(p + 1), cursor.at(p).encode()))
+        rows.append(jumps)
 
     footer = f"Page {current_page + 1}/{total_pages}"
 
-    return buttons, footer
+    return rows, footer
 
 
 def format_pagination_footer(
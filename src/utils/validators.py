@@ -200,6 +200,23 @@ def sanitize_name(name: str) -> str:
     return name.strip()
 
 
+def parse_quoted_line(text: Optional[str]) -> List[str]:
+    """
+    Splits a line of text into args supporting quotes (smart quotes included).
+
+    Example:
+      "Food & Drinks" "Taxi to airport" 20 EUR -> ['Food & Drinks', 'Taxi to airport', '20', 'EUR']
+    """
+    if not text:
+        return []
+
+    # normalize smart quotes to ascii quotes
+    for k, v in SMART_QUOTES.items():
+        text = text.replace(k, v)
+
+    return shlex.split(text)
+
+
 def parse_quoted_args(message_text: Optional[str]) -> List[str]:
     """
     Splits Telegram command text into args supporting quotes.
@@ -210,14 +227,7 @@ def parse_quoted_args(message_text: Optional[str]) -> List[str]:
 
     Returns only the arguments (command itself removed).
     """
-    if not message_text:
-        return []
-
-    # normalize smart quotes to ascii quotes
-    for k, v in SMART_QUOTES.items():
-        message_text = message_text.replace(k, v)
-
-    parts = shlex.split(message_text)
+    parts = parse_quoted_line(message_text)
 
     if not parts:
         return []